@@ -1,6 +1,17 @@
 ﻿from django.urls import path
-from catalog.api.views.public import CatalogItemsListView
+from catalog.api.views.aio import AsyncCatalogItemsListView
+from catalog.api.views.public import (
+    CatalogBootstrapView,
+    CatalogItemSubtreeView,
+    CatalogItemsListView,
+    CatalogItemsSearchView,
+)
 
 urlpatterns = [
     path("catalog/items/", CatalogItemsListView.as_view(), name="catalog-items-list"),
+    path("catalog/items/search/", CatalogItemsSearchView.as_view(), name="catalog-items-search"),
+    path("catalog/bootstrap/", CatalogBootstrapView.as_view(), name="catalog-bootstrap"),
+    path("catalog/items/<uuid:item_id>/subtree/", CatalogItemSubtreeView.as_view(), name="catalog-item-subtree"),
+    # Async (ASGI)
+    path("aio/catalog/items/", AsyncCatalogItemsListView.as_view(), name="aio-catalog-items-list"),
 ]
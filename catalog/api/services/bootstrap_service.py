@@ -0,0 +1,66 @@
+# products-backend/catalog/api/services/bootstrap_service.py
+import gzip
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from catalog.api.services.catalog_service import get_enabled_items_by_type
+from common.db.routers import pin_primary
+from ramos.api.services.tree_service import get_roots_presented
+
+# Subir el sufijo si cambia la forma del payload (invalida todo lo cacheado).
+BOOTSTRAP_CACHE_KEY = "catalog:bootstrap:v1:{variant}"
+# El bundle se regenera como mucho cada BOOTSTRAP_TTL. Antes lo invalida
+# `manage.py listen_catalog_changes`: NOTIFY 'catalog_bootstrap_changed' desde triggers
+# de sentencia en catalog.item, ramo.node y ramo.doc_requirement (migración common 0012).
+BOOTSTRAP_TTL = 60 * 60 * 12
+NOTIFY_CHANNEL = "catalog_bootstrap_changed"
+
+
+def _build_bundle(include_ramos: bool) -> Dict[str, Any]:
+    body = json.dumps(
+        {
+            "types": get_enabled_items_by_type(),
+            "ramos": get_roots_presented() if include_ramos else None,
+        },
+        cls=DjangoJSONEncoder,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        sort_keys=True,
+    ).encode("utf-8")
+
+    # La versión depende solo del contenido: si nada cambió, el ETag se mantiene
+    # aunque el bundle se regenere (p.ej. tras expirar el TTL).
+    version = hashlib.sha256(body).hexdigest()[:20]
+    envelope = (
+        b'{"version":"' + version.encode("ascii") + b'","generated_at":"'
+        + timezone.now().isoformat().encode("ascii") + b'","data":' + body + b"}"
+    )
+    return {
+        "etag": f'W/"{version}"',
+        "version": version,
+        "gzip": gzip.compress(envelope, compresslevel=9, mtime=0),
+    }
+
+
+def get_bootstrap_bundle(include_ramos: bool = False) -> Dict[str, Any]:
+    """
+    Devuelve {etag, version, gzip} para el bundle de catálogos.
+    El payload se cachea ya comprimido (bytes), así que un hit no serializa ni comprime nada.
+    """
+    key = BOOTSTRAP_CACHE_KEY.format(variant="ramos" if include_ramos else "base")
+    bundle: Optional[Dict[str, Any]] = cache.get(key)
+    if bundle is None:
+        # Un miss se llena desde el primario: una réplica atrasada dejaría el bundle viejo todo el TTL
+        with pin_primary():
+            bundle = _build_bundle(include_ramos)
+        cache.set(key, bundle, BOOTSTRAP_TTL)
+    return bundle
+
+
+def invalidate_bootstrap() -> None:
+    cache.delete_many([BOOTSTRAP_CACHE_KEY.format(variant=v) for v in ("base", "ramos")])
@@ -1,6 +1,14 @@
 # products-backend/catalog/api/services/catalog_service.py
-from typing import Any, Dict, List, Optional
-from django.db import connection
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from common.db.routers import read_connection
+
+from common.api.pagination import KeysetPagination, keyset_order, keyset_where
+from common.db import aio
+from common.db.query_registry import register_dynamic_query
+
+# Clave estable de orden (ord, name, id). Respaldada por los índices
+# catalog.item_type_ord_name_id_idx / item_parent_ord_name_id_idx.
+CATALOG_SORT_KEY = ("COALESCE((attrs->>'ord')::int, 999)", "name", "id")
 
 
 def _row_to_item(r) -> Dict[str, Any]:
@@ -17,34 +25,29 @@ def _row_to_item(r) -> Dict[str, Any]:
     }
 
 
-def get_catalog_items(
-    item_type: Optional[str] = None,
-    parent_id: Optional[str] = None,
-    enabled: Optional[bool] = True,          # <- default: solo activos
-    include_roots: bool = False,              # <- default: NO raíces
-    limit: int = 200,
-    offset: int = 0
-) -> List[Dict[str, Any]]:
-    """
-    Reglas por defecto (según lo que pediste):
-    - enabled=True si no se especifica.
-    - include_roots=False: filtra (parent_id IS NOT NULL OR depth > 0) por defecto.
-    - Siempre devuelve 'meta' con attrs intacto para leer atributos específicos desde el front.
-    """
-    base = """
-        SELECT id,
-               item_type AS type,
-               code,
-               name,
-               is_active AS enabled,
-               parent_id,
-               depth AS level,
-               attrs AS meta
-          FROM catalog.item
-         WHERE 1=1
-    """
+_BASE_SQL = """
+    SELECT id,
+           item_type AS type,
+           code,
+           name,
+           is_active AS enabled,
+           parent_id,
+           depth AS level,
+           attrs AS meta,
+           COALESCE((attrs->>'ord')::int, 999) AS ord
+      FROM catalog.item
+     WHERE 1=1
+"""
+
+
+def _filters(
+    item_type: Optional[str],
+    parent_id: Optional[str],
+    enabled: Optional[bool],
+    include_roots: bool,
+) -> Tuple[List[str], List[Any]]:
     conds = []
-    params = []
+    params: List[Any] = []
 
     if item_type:
         conds.append("AND item_type = %s")
@@ -64,13 +67,298 @@ def get_catalog_items(
         # Si no piden raíces, aplicamos tu filtro clásico de hojas / con padre
         conds.append("AND (parent_id IS NOT NULL OR depth > 0)")
 
-    order = " ORDER BY COALESCE((attrs->>'ord')::int, 999), name LIMIT %s OFFSET %s"
+    return conds, params
+
+
+def get_catalog_items(
+    item_type: Optional[str] = None,
+    parent_id: Optional[str] = None,
+    enabled: Optional[bool] = True,          # <- default: solo activos
+    include_roots: bool = False,              # <- default: NO raíces
+    limit: int = 200,
+    offset: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    Reglas por defecto (según lo que pediste):
+    - enabled=True si no se especifica.
+    - include_roots=False: filtra (parent_id IS NOT NULL OR depth > 0) por defecto.
+    - Siempre devuelve 'meta' con attrs intacto para leer atributos específicos desde el front.
+    """
+    conds, params = _filters(item_type, parent_id, enabled, include_roots)
+    order = " " + keyset_order(CATALOG_SORT_KEY) + " LIMIT %s OFFSET %s"
     params.extend([limit, offset])
 
-    sql = base + "\n".join([""] + conds) + order
+    sql = _BASE_SQL + "\n".join([""] + conds) + order
 
-    with connection.cursor() as cursor:
+    with read_connection().cursor() as cursor:
         cursor.execute(sql, params)
         rows = cursor.fetchall()
 
     return [_row_to_item(r) for r in rows]
+
+
+def get_enabled_items_by_type() -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Todos los items habilitados (sin raíces), agrupados por tipo, en un solo roundtrip.
+    Mismo orden y mismos filtros por defecto que get_catalog_items(item_type=...).
+    """
+    conds, params = _filters(None, None, True, False)
+    order = ", ".join(("item_type",) + CATALOG_SORT_KEY)
+    sql = _BASE_SQL + "\n".join([""] + conds) + f"\n ORDER BY {order}"
+
+    with read_connection().cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    by_type: Dict[str, List[Dict[str, Any]]] = {}
+    for r in rows:
+        by_type.setdefault(r[1], []).append(_row_to_item(r))
+    return by_type
+
+
+def get_catalog_items_page(
+    item_type: Optional[str] = None,
+    parent_id: Optional[str] = None,
+    enabled: Optional[bool] = True,
+    include_roots: bool = False,
+    limit: int = 200,
+    after: Optional[Sequence[Any]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[List[Any]]]:
+    """
+    Igual que get_catalog_items pero paginado por keyset sobre (ord, name, id):
+    - 'after' es la clave de la última fila de la página anterior (None = primera página).
+    - Devuelve (items, next_key); next_key es None si no hay más filas.
+    - Sin OFFSET ni COUNT(*): cada página es un rango sobre el índice, estable ante ediciones concurrentes.
+    """
+    sql, params = _items_page_sql(item_type, parent_id, enabled, include_roots, limit, after)
+
+    with read_connection().cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    return _items_page(rows, limit)
+
+
+async def aget_catalog_items_page(
+    user_id: Optional[int],
+    item_type: Optional[str] = None,
+    parent_id: Optional[str] = None,
+    enabled: Optional[bool] = True,
+    include_roots: bool = False,
+    limit: int = 200,
+    after: Optional[Sequence[Any]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[List[Any]]]:
+    """Versión async de get_catalog_items_page() para las vistas ASGI (common.db.aio)."""
+    sql, params = _items_page_sql(item_type, parent_id, enabled, include_roots, limit, after)
+    return _items_page(await aio.fetch(sql, params, user_id=user_id), limit)
+
+
+def _items_page_sql(item_type, parent_id, enabled, include_roots, limit, after) -> Tuple[str, List[Any]]:
+    conds, params = _filters(item_type, parent_id, enabled, include_roots)
+
+    where, where_params = keyset_where(CATALOG_SORT_KEY, after)
+    if where:
+        conds.append("AND " + where)
+        params.extend(where_params)
+
+    sql = _BASE_SQL + "\n".join([""] + conds) + "\n " + keyset_order(CATALOG_SORT_KEY) + " LIMIT %s"
+    params.append(limit + 1)
+    return sql, params
+
+
+# Primera página de los dos accesos del listado, con el tipo y el padre más poblados
+# (datos de ejemplo para `manage.py index_advisor`, ver common/db/query_registry.py)
+register_dynamic_query("catalog.items.page_by_type", lambda s: _items_page_sql(
+    s.scalar("SELECT item_type FROM catalog.item GROUP BY item_type ORDER BY count(*) DESC LIMIT 1"),
+    None, True, False, 200, None,
+))
+register_dynamic_query("catalog.items.page_by_parent", lambda s: _items_page_sql(
+    None,
+    s.scalar("SELECT parent_id FROM catalog.item WHERE parent_id IS NOT NULL "
+             "GROUP BY parent_id ORDER BY count(*) DESC LIMIT 1"),
+    True, False, 200, None,
+))
+
+
+def _items_page(rows, limit: int) -> Tuple[List[Dict[str, Any]], Optional[List[Any]]]:
+    page, next_key = KeysetPagination.slice_page(rows, limit, lambda r: (r[8], r[3], r[0]))
+    return [_row_to_item(r) for r in page], next_key
+
+
+# ---------------- Búsqueda (unaccent + pg_trgm) ----------------
+
+# Expresión indexada: ver common/migrations/0002_catalog_search_indexes.py
+_NAME_NORM = "catalog.f_unaccent(lower(name))"
+
+# Por debajo de 3 caracteres los trigramas no filtran: solo se busca por prefijo.
+TRGM_MIN_LEN = 3
+
+
+def _like_escape(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_catalog_items(
+    term: str,
+    item_type: Optional[str] = None,
+    enabled: Optional[bool] = True,
+    limit: int = 20,
+) -> List[Dict[str, Any]]:
+    """
+    Búsqueda rankeada e insensible a acentos/mayúsculas sobre code y name.
+
+    Ranking (desc):
+      3 → code exacto
+      2 → code por prefijo
+      1 → name por prefijo (sin acentos)
+      + word_similarity(term, name) como desempate dentro de cada grupo.
+
+    Todas las ramas del WHERE tienen índice (btree text_pattern_ops para prefijos,
+    GIN gin_trgm_ops para subcadena/similitud), así que no hay seq scan de catalog.item.
+    """
+    term = (term or "").strip()
+    if not term:
+        raise ValueError("q requerido.")
+
+    like_prefix = _like_escape(term.lower()) + "%"
+    use_trgm = len(term) >= TRGM_MIN_LEN
+
+    match = [
+        "lower(code) LIKE %(prefix)s",
+        f"{_NAME_NORM} LIKE catalog.f_unaccent(%(prefix)s)",
+    ]
+    if use_trgm:
+        match += [
+            f"{_NAME_NORM} LIKE '%%' || catalog.f_unaccent(%(escaped)s) || '%%'",
+            f"catalog.f_unaccent(lower(%(term)s)) <%% {_NAME_NORM}",
+        ]
+
+    conds = ["(" + " OR ".join(match) + ")"]
+    params: Dict[str, Any] = {
+        "term": term,
+        "prefix": like_prefix,
+        "escaped": _like_escape(term.lower()),
+        "limit": limit,
+    }
+    if item_type:
+        conds.append("item_type = %(item_type)s")
+        params["item_type"] = item_type
+    if enabled is True:
+        conds.append("is_active = TRUE")
+    elif enabled is False:
+        conds.append("is_active = FALSE")
+
+    sql = f"""
+    SELECT id,
+           item_type AS type,
+           code,
+           name,
+           is_active AS enabled,
+           parent_id,
+           depth AS level,
+           attrs AS meta,
+           CASE
+             WHEN lower(code) = lower(%(term)s) THEN 3
+             WHEN lower(code) LIKE %(prefix)s THEN 2
+             WHEN {_NAME_NORM} LIKE catalog.f_unaccent(%(prefix)s) THEN 1
+             ELSE 0
+           END
+           + word_similarity(catalog.f_unaccent(lower(%(term)s)), {_NAME_NORM}) AS rank
+      FROM catalog.item
+     WHERE {" AND ".join(conds)}
+     ORDER BY rank DESC, name, id
+     LIMIT %(limit)s
+    """
+
+    with read_connection().cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    out = []
+    for r in rows:
+        item = _row_to_item(r)
+        item["rank"] = float(r[8])
+        out.append(item)
+    return out
+
+
+# ---------------- Jerarquía (subárbol) ----------------
+
+# Un solo CTE recursivo. sort_path acumula el rango del nodo entre sus hermanos
+# (ord, name, id), así que ORDER BY sort_path devuelve el subárbol en pre-orden.
+# Cada nivel se resuelve con item_parent_ord_name_id_idx.
+_SUBTREE_SQL = """
+WITH RECURSIVE t AS (
+  SELECT i.id, i.item_type, i.code, i.name, i.is_active, i.parent_id, i.depth, i.attrs,
+         0 AS rel_depth,
+         ARRAY[]::int[] AS sort_path
+    FROM catalog.item i
+   WHERE i.id = %(root_id)s
+  UNION ALL
+  SELECT c.id, c.item_type, c.code, c.name, c.is_active, c.parent_id, c.depth, c.attrs,
+         t.rel_depth + 1,
+         t.sort_path || (row_number() OVER (
+             PARTITION BY c.parent_id
+             ORDER BY COALESCE((c.attrs->>'ord')::int, 999), c.name, c.id
+         ))::int
+    FROM catalog.item c
+    JOIN t ON c.parent_id = t.id
+   WHERE t.rel_depth < %(depth)s
+     {enabled_filter}
+)
+SELECT id, item_type AS type, code, name, is_active AS enabled,
+       parent_id, depth AS level, attrs AS meta, rel_depth
+  FROM t
+ ORDER BY sort_path
+"""
+
+
+def iter_catalog_subtree(
+    root_id: str,
+    depth: int = 3,
+    enabled: Optional[bool] = True,
+    chunk_size: int = 500,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Recorre el subárbol de root_id (incluido) hasta 'depth' niveles por debajo, en pre-orden.
+    Usa cursor del lado del servidor: apto para streaming de catálogos grandes sin
+    materializar todas las filas en memoria.
+    Cada item incluye 'rel_depth' (0 = raíz pedida).
+    """
+    if enabled is True:
+        enabled_filter = "AND c.is_active = TRUE"
+    elif enabled is False:
+        enabled_filter = "AND c.is_active = FALSE"
+    else:
+        enabled_filter = ""
+
+    sql = _SUBTREE_SQL.format(enabled_filter=enabled_filter)
+    with read_connection().chunked_cursor() as cursor:
+        cursor.execute(sql, {"root_id": root_id, "depth": depth})
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            for r in rows:
+                item = _row_to_item(r)
+                item["rel_depth"] = r[8]
+                yield item
+
+
+def get_catalog_subtree(root_id: str, depth: int = 3, enabled: Optional[bool] = True) -> Optional[Dict[str, Any]]:
+    """
+    Subárbol anidado {..., children: [...]} o None si root_id no existe.
+    Se arma en una pasada aprovechando el pre-orden (pila por profundidad).
+    """
+    root: Optional[Dict[str, Any]] = None
+    stack: List[Dict[str, Any]] = []
+    for item in iter_catalog_subtree(root_id, depth=depth, enabled=enabled):
+        item["children"] = []
+        rel = item.pop("rel_depth")
+        del stack[rel:]
+        if stack:
+            stack[-1]["children"].append(item)
+        else:
+            root = item
+        stack.append(item)
+    return root
@@ -0,0 +1,30 @@
+# products-backend/catalog/api/views/aio.py
+from common.api.pagination import KeysetPagination
+from common.api.views.aio import AsyncReadView, error_response, json_response
+from catalog.api.services.catalog_service import aget_catalog_items_page
+from catalog.api.views.public import CATALOG_PAGE_MAX_LIMIT, _parse_bool
+
+
+class AsyncCatalogItemsListView(AsyncReadView):
+    """
+    Variante ASGI de CatalogItemsListView (solo paginación keyset): sin 'offset' legacy ni
+    listado sin tope; limit se recorta a CATALOG_PAGE_MAX_LIMIT y se sigue con next_cursor.
+    """
+
+    async def get(self, request):
+        pager = KeysetPagination(key_size=3, default_limit=200, max_limit=CATALOG_PAGE_MAX_LIMIT)
+        try:
+            limit, after = pager.parse(request)
+        except ValueError as e:
+            return error_response("400.PARAMS_INVALID", str(e), status=400)
+
+        items, next_key = await aget_catalog_items_page(
+            request.user.id,
+            item_type=request.GET.get("type"),
+            parent_id=request.GET.get("parent_id"),
+            enabled=_parse_bool(request.GET.get("enabled"), default=True),
+            include_roots=_parse_bool(request.GET.get("include_roots"), default=False),
+            limit=limit,
+            after=after,
+        )
+        return json_response(pager.get_paginated_data(items, next_key))
@@ -113,52 +113,3 @@ class CatalogItemByIdView(APIView):
         if not row:
             return Response(status=404)
         return Response(row_to_item(row))
-
-
-@extend_schema(
-    tags=["Catalog"],
-    operation_id="catalog_items_search",
-    parameters=[
-        OpenApiParameter("q", str, required=True,
-                         description="Texto a buscar en code/name (ilike)"),
-        OpenApiParameter("type", str, required=False),
-        OpenApiParameter("limit", int, required=False),
-        OpenApiParameter("offset", int, required=False),
-    ],
-    responses={200: OpenApiResponse(description="Resultados de búsqueda")},
-)
-class CatalogItemsSearchView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get(self, request):
-        term = request.GET.get("q", "").strip()
-        if not term:
-            return Response({"detail": "q requerido"}, status=400)
-
-        q = """
-        SELECT id, item_type AS type, code, name, is_active AS enabled,
-               parent_id, depth AS level, attrs AS meta
-        FROM catalog.item
-        WHERE (code ILIKE %s OR name ILIKE %s)
-        """
-        params = [f"%{term}%", f"%{term}%"]
-
-        if (typ := request.GET.get("type")):
-            q += " AND item_type=%s"
-            params.append(typ)
-
-        q += " ORDER BY COALESCE((attrs->>'ord')::int, 999), name"
-
-        try:
-            limit = int(request.GET.get("limit", 100))
-            offset = int(request.GET.get("offset", 0))
-        except ValueError:
-            return Response({"detail": "limit/offset deben ser enteros"}, status=400)
-
-        q += " LIMIT %s OFFSET %s"
-        params += [limit, offset]
-
-        with connection.cursor() as cur:
-            cur.execute(q, params)
-            rows = cur.fetchall()
-        return Response([row_to_item(r) for r in rows])
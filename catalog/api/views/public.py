@@ -1,11 +1,26 @@
 # products-backend/catalog/api/views/public.py
+import gzip
+import itertools
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse, StreamingHttpResponse
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiParameter
 
+from common.api.pagination import KeysetPagination
+from catalog.api.services.bootstrap_service import get_bootstrap_bundle
+
 # Servicio SQL
-from catalog.api.services.catalog_service import get_catalog_items
+from catalog.api.services.catalog_service import (
+    get_catalog_items,
+    get_catalog_items_page,
+    get_catalog_subtree,
+    iter_catalog_subtree,
+    search_catalog_items,
+)
 
 
 def _parse_bool(val, default=None):
@@ -19,6 +34,19 @@ def _parse_bool(val, default=None):
     return default
 
 
+CATALOG_PAGE_MAX_LIMIT = 1000
+
+
+def _legacy_limit(request) -> bool:
+    """Primera página (sin cursor) con limit mayor que el tope keyset."""
+    if request.GET.get("cursor"):
+        return False
+    try:
+        return int(request.GET.get("limit", 0)) > CATALOG_PAGE_MAX_LIMIT
+    except ValueError:
+        return False
+
+
 @extend_schema(
     tags=["Catalog"],
     operation_id="catalog_items_list",
@@ -32,9 +60,13 @@ def _parse_bool(val, default=None):
         OpenApiParameter("include_roots", bool, required=False,
                          description="Incluir raíces (default: false)"),
         OpenApiParameter("limit", int, required=False,
-                         description="Límite (default: 200)"),
+                         description=f"Límite (default: 200). Con cursor el máximo es {CATALOG_PAGE_MAX_LIMIT}; "
+                                     f"sin cursor, un limit mayor se sirve completo por la ruta legacy "
+                                     f"(sin next_cursor), como antes de la paginación keyset"),
+        OpenApiParameter("cursor", str, required=False,
+                         description="Cursor opaco devuelto en next_cursor (paginación keyset)"),
         OpenApiParameter("offset", int, required=False,
-                         description="Offset (default: 0)"),
+                         description="Legacy: si viene, pagina por OFFSET y no devuelve next_cursor"),
     ],
     responses={200: OpenApiResponse(description="Lista de items de catálogo")}
 )
@@ -52,19 +84,184 @@ class CatalogItemsListView(APIView):
         include_roots = _parse_bool(
             request.GET.get("include_roots"), default=False)
 
+        # Legacy: paginación por OFFSET (se mantiene para clientes existentes). También un
+        # limit por encima del tope keyset sin cursor: antes no tenía tope y no se recorta
+        if request.GET.get("offset") not in (None, "") or _legacy_limit(request):
+            try:
+                limit = int(request.GET.get("limit", 200))
+                offset = int(request.GET.get("offset", 0))
+            except Exception:
+                return Response({"code": "400.PARAMS_INVALID", "detail": "limit/offset deben ser enteros."}, status=400)
+
+            items = get_catalog_items(
+                item_type=catalog_type,
+                parent_id=parent_id,
+                enabled=enabled,
+                include_roots=include_roots,
+                limit=limit,
+                offset=offset
+            )
+            # items ya viene en forma de dicts
+            return Response({"items": items})
+
+        # Keyset sobre (ord, name, id): páginas estables y sin COUNT(*)
+        pager = KeysetPagination(key_size=3, default_limit=200, max_limit=CATALOG_PAGE_MAX_LIMIT)
         try:
-            limit = int(request.GET.get("limit", 200))
-            offset = int(request.GET.get("offset", 0))
-        except Exception:
-            return Response({"code": "400.PARAMS_INVALID", "detail": "limit/offset deben ser enteros."}, status=400)
+            limit, after = pager.parse(request)
+        except ValueError as e:
+            return Response({"code": "400.PARAMS_INVALID", "detail": str(e)}, status=400)
 
-        items = get_catalog_items(
+        items, next_key = get_catalog_items_page(
             item_type=catalog_type,
             parent_id=parent_id,
             enabled=enabled,
             include_roots=include_roots,
             limit=limit,
-            offset=offset
+            after=after,
+        )
+        return pager.get_paginated_response(items, next_key)
+
+
+@extend_schema(
+    tags=["Catalog"],
+    operation_id="catalog_items_search",
+    parameters=[
+        OpenApiParameter("q", str, required=True,
+                         description="Texto a buscar en code (prefijo) y name (sin acentos, similitud)"),
+        OpenApiParameter("type", str, required=False,
+                         description="Filtra por tipo (p.ej. RAMO_TAX, ACTUARIO_SUT)"),
+        OpenApiParameter("enabled", bool, required=False,
+                         description="Solo habilitados (default: true)"),
+        OpenApiParameter("limit", int, required=False,
+                         description="Límite (default: 20, máx: 100)"),
+    ],
+    responses={200: OpenApiResponse(description="Resultados rankeados de búsqueda")}
+)
+class CatalogItemsSearchView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        term = (request.GET.get("q") or "").strip()
+        if not term:
+            return Response({"code": "400.MISSING_Q", "detail": "q requerido."}, status=400)
+
+        try:
+            limit = int(request.GET.get("limit", 20))
+        except Exception:
+            return Response({"code": "400.PARAMS_INVALID", "detail": "limit debe ser entero."}, status=400)
+        limit = max(1, min(limit, 100))
+
+        items = search_catalog_items(
+            term,
+            item_type=request.GET.get("type"),
+            enabled=_parse_bool(request.GET.get("enabled"), default=True),
+            limit=limit,
         )
-        # items ya viene en forma de dicts
         return Response({"items": items})
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # Comparación débil (RFC 9110): se ignora el prefijo W/
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = etag.removeprefix("W/")
+    return any(t.strip().removeprefix("W/") == wanted for t in if_none_match.split(","))
+
+
+@extend_schema(
+    tags=["Catalog"],
+    operation_id="catalog_bootstrap",
+    parameters=[
+        OpenApiParameter("include_ramos", bool, required=False,
+                         description="Incluir raíces presentadas de ramos (default: false)"),
+    ],
+    responses={
+        200: OpenApiResponse(description="Todos los catálogos habilitados, agrupados por tipo (gzip)"),
+        304: OpenApiResponse(description="Sin cambios respecto al ETag enviado"),
+    }
+)
+class CatalogBootstrapView(APIView):
+    """
+    Bundle de arranque del front: reemplaza N llamadas a /catalog/items/?type=...
+    El cuerpo se sirve tal cual sale de caché (gzip); con If-None-Match válido responde 304.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        include_ramos = _parse_bool(request.GET.get("include_ramos"), default=False)
+        bundle = get_bootstrap_bundle(include_ramos=include_ramos)
+
+        headers = {
+            "ETag": bundle["etag"],
+            # Revalidar siempre: una visita repetida cuesta un 304 sin cuerpo
+            "Cache-Control": "private, no-cache",
+            "Vary": "Accept-Encoding, Authorization, Cookie",
+        }
+        if _etag_matches(request.META.get("HTTP_IF_NONE_MATCH", ""), bundle["etag"]):
+            return HttpResponse(status=304, headers=headers)
+
+        if "gzip" in request.META.get("HTTP_ACCEPT_ENCODING", ""):
+            body = bundle["gzip"]
+            headers["Content-Encoding"] = "gzip"
+        else:
+            body = gzip.decompress(bundle["gzip"])
+
+        return HttpResponse(body, content_type="application/json", headers=headers)
+
+
+SUBTREE_MAX_DEPTH = 12
+
+
+@extend_schema(
+    tags=["Catalog"],
+    operation_id="catalog_item_subtree",
+    parameters=[
+        OpenApiParameter("depth", int, required=False,
+                         description="Niveles bajo el nodo (default 3, máx 12)"),
+        OpenApiParameter("format", str, required=False,
+                         description="nested (default) | flat: NDJSON en pre-orden, en streaming"),
+        OpenApiParameter("enabled", bool, required=False,
+                         description="Solo descendientes habilitados (default: true)"),
+    ],
+    responses={
+        200: OpenApiResponse(description="Subárbol del item (anidado o plano)"),
+        404: OpenApiResponse(description="Item no encontrado"),
+    }
+)
+class CatalogItemSubtreeView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, item_id):
+        try:
+            depth = int(request.GET.get("depth") or 3)
+        except Exception:
+            return Response({"code": "400.PARAMS_INVALID", "detail": "depth debe ser entero."}, status=400)
+        if depth < 0 or depth > SUBTREE_MAX_DEPTH:
+            return Response({"code": "400.DEPTH_RANGE",
+                             "detail": f"depth debe estar entre 0 y {SUBTREE_MAX_DEPTH}."}, status=400)
+
+        fmt = (request.GET.get("format") or "nested").lower()
+        if fmt not in ("nested", "flat"):
+            return Response({"code": "400.FORMAT_INVALID", "detail": "format debe ser nested|flat."}, status=400)
+
+        enabled = _parse_bool(request.GET.get("enabled"), default=True)
+
+        if fmt == "nested":
+            tree = get_catalog_subtree(str(item_id), depth=depth, enabled=enabled)
+            if tree is None:
+                return Response({"code": "404.ITEM_NOT_FOUND", "detail": "Item no encontrado."}, status=404)
+            return Response({"root": tree})
+
+        # flat: una línea JSON por nodo (pre-orden); el cliente reconstruye con parent_id/rel_depth
+        rows = iter_catalog_subtree(str(item_id), depth=depth, enabled=enabled)
+        first = next(rows, None)
+        if first is None:
+            return Response({"code": "404.ITEM_NOT_FOUND", "detail": "Item no encontrado."}, status=404)
+
+        lines = (
+            json.dumps(item, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+            for item in itertools.chain([first], rows)
+        )
+        return StreamingHttpResponse(lines, content_type="application/x-ndjson")
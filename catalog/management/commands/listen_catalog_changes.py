@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from catalog.api.services.bootstrap_service import NOTIFY_CHANNEL, invalidate_bootstrap
+
+
+class Command(BaseCommand):
+    help = (
+        "Escucha NOTIFY de Postgres (triggers en catalog.item, ramo.node, ramo.doc_requirement) "
+        "e invalida el bundle cacheado de /catalog/bootstrap."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--timeout", type=float, default=30.0,
+                            help="Segundos de espera por lote de notificaciones (keepalive).")
+
+    def handle(self, *args, **opts):
+        connection.ensure_connection()
+        connection.set_autocommit(True)
+        pg = connection.connection  # psycopg 3
+        pg.execute(f"LISTEN {NOTIFY_CHANNEL}")
+        self.stdout.write(self.style.SUCCESS(f"Escuchando '{NOTIFY_CHANNEL}'..."))
+
+        while True:
+            for n in pg.notifies(timeout=opts["timeout"]):
+                invalidate_bootstrap()
+                self.stdout.write(f"invalidado bootstrap ({(n.payload or '').strip()})")
@@ -0,0 +1,27 @@
+# products-backend/catalog/tests/test_async_parity.py
+from unittest.mock import AsyncMock, patch
+
+from catalog.api.views.aio import AsyncCatalogItemsListView
+from catalog.api.views.public import CatalogItemsListView
+from common.tests.parity import AsyncParityTestCase
+
+ITEMS = [{"id": "i1", "type": "MONEDA", "code": "USD", "name": "Dólar", "ord": 1}]
+
+
+class CatalogItemsParityTests(AsyncParityTestCase):
+    def test_mismos_argumentos_y_respuesta(self):
+        params = {"type": "MONEDA", "enabled": "true", "limit": "5"}
+        with patch("catalog.api.views.public.get_catalog_items_page", return_value=(ITEMS, None)) as sync_fn, \
+                patch("catalog.api.views.aio.aget_catalog_items_page",
+                      new=AsyncMock(return_value=(ITEMS, None))) as async_fn:
+            sync = self.sync_json(CatalogItemsListView, "get", "/api/catalog/items/", params)
+            aio = self.async_json(AsyncCatalogItemsListView, "get", "/api/aio/catalog/items/", params)
+
+        self.assertEqual(sync, aio)
+        self.assertEqual(sync_fn.call_args.kwargs, async_fn.await_args.kwargs)
+
+    def test_cursor_invalido(self):
+        params = {"cursor": "no-es-un-cursor"}
+        sync = self.sync_json(CatalogItemsListView, "get", "/api/catalog/items/", params)
+        aio = self.async_json(AsyncCatalogItemsListView, "get", "/api/aio/catalog/items/", params)
+        self.assertEqual(sync, aio)
@@ -0,0 +1,28 @@
+# products-backend/catalog/tests/test_items_list.py
+from unittest.mock import patch
+
+from catalog.api.views.public import CATALOG_PAGE_MAX_LIMIT, CatalogItemsListView
+from common.tests.parity import AsyncParityTestCase
+
+ITEMS = [{"id": "i1", "type": "MONEDA", "code": "USD", "name": "Dólar", "ord": 1}]
+
+
+class CatalogItemsLimitTests(AsyncParityTestCase):
+    def _get(self, params):
+        with patch("catalog.api.views.public.get_catalog_items", return_value=ITEMS) as legacy, \
+                patch("catalog.api.views.public.get_catalog_items_page", return_value=(ITEMS, None)) as page:
+            response = self.sync_json(CatalogItemsListView, "get", "/api/catalog/items/", params)
+        return response, legacy, page
+
+    def test_limit_sobre_el_tope_sin_cursor_no_se_recorta(self):
+        (status, body), legacy, page = self._get({"limit": str(CATALOG_PAGE_MAX_LIMIT + 4000)})
+        self.assertEqual((status, body), (200, {"items": ITEMS}))
+        self.assertEqual(legacy.call_args.kwargs["limit"], CATALOG_PAGE_MAX_LIMIT + 4000)
+        self.assertEqual(legacy.call_args.kwargs["offset"], 0)
+        page.assert_not_called()
+
+    def test_limit_dentro_del_tope_usa_keyset(self):
+        (status, body), legacy, page = self._get({"limit": "50"})
+        self.assertEqual((status, body), (200, {"items": ITEMS, "next_cursor": None}))
+        self.assertEqual(page.call_args.kwargs["limit"], 50)
+        legacy.assert_not_called()
@@ -1,6 +1,119 @@
-﻿from rest_framework.pagination import LimitOffsetPagination
+﻿import base64
+import json
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
 
 
 class DefaultPagination(LimitOffsetPagination):
     default_limit = 50
     max_limit = 200
+
+
+# ---------------------------------------------------------------------------
+# Keyset (cursor) para vistas con SQL directo
+# ---------------------------------------------------------------------------
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Serializa la clave de la última fila (p.ej. [ord, name, id]) en un token opaco.
+    """
+    raw = json.dumps([v if isinstance(v, (int, float, bool)) or v is None else str(v) for v in values],
+                     separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, size: int) -> List[Any]:
+    """
+    Inverso de encode_cursor. Lanza ValueError si el token no corresponde a una clave de 'size' columnas.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except Exception:
+        raise ValueError("cursor inválido.")
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("cursor inválido.")
+    return values
+
+
+def keyset_where(key_sql: Sequence[str], after: Optional[Sequence[Any]], descending: bool = False) -> Tuple[str, List[Any]]:
+    """
+    Condición de fila "(k1, k2, ...) > (%s, %s, ...)" para continuar después de 'after'.
+    La comparación por tupla la resuelve Postgres con un solo rango sobre el índice (k1, k2, ...).
+    """
+    if not after:
+        return "", []
+    cols = ", ".join(key_sql)
+    marks = ", ".join(["%s"] * len(key_sql))
+    op = "<" if descending else ">"
+    return f"({cols}) {op} ({marks})", list(after)
+
+
+def keyset_order(key_sql: Sequence[str], descending: bool = False) -> str:
+    direction = " DESC" if descending else ""
+    return "ORDER BY " + ", ".join(f"{k}{direction}" for k in key_sql)
+
+
+class KeysetPagination:
+    """
+    Paginación por cursor (keyset) reutilizable para APIView con SQL directo.
+
+    - El servicio ordena por una clave estable y única (ej. ord, name, id) y pide limit+1 filas.
+    - La fila extra solo indica que hay página siguiente: no se ejecuta COUNT(*).
+    - El cursor es la clave de la última fila entregada, codificada en base64.
+
+    Uso típico en una vista:
+        pager = KeysetPagination(key_size=3)
+        limit, after = pager.parse(request)        # ValueError → 400
+        rows, next_key = service(..., limit=limit, after=after)
+        return pager.get_paginated_response(rows, next_key)
+    """
+
+    cursor_query_param = "cursor"
+    limit_query_param = "limit"
+    default_limit = 50
+    max_limit = 200
+
+    def __init__(self, key_size: int, default_limit: Optional[int] = None, max_limit: Optional[int] = None):
+        self.key_size = key_size
+        if default_limit is not None:
+            self.default_limit = default_limit
+        if max_limit is not None:
+            self.max_limit = max_limit
+
+    def parse(self, request) -> Tuple[int, Optional[List[Any]]]:
+        raw_limit = request.GET.get(self.limit_query_param)
+        try:
+            limit = int(raw_limit) if raw_limit not in (None, "") else self.default_limit
+        except ValueError:
+            raise ValueError("limit debe ser entero.")
+        if limit < 1:
+            raise ValueError("limit debe ser mayor que 0.")
+        limit = min(limit, self.max_limit)
+
+        token = (request.GET.get(self.cursor_query_param) or "").strip()
+        after = decode_cursor(token, self.key_size) if token else None
+        return limit, after
+
+    @staticmethod
+    def slice_page(rows: List[Any], limit: int, key_of: Callable[[Any], Sequence[Any]]) -> Tuple[List[Any], Optional[List[Any]]]:
+        """
+        Recorta el resultado de una consulta LIMIT limit+1 y devuelve (página, clave_siguiente|None).
+        """
+        if len(rows) > limit:
+            page = rows[:limit]
+            return page, list(key_of(page[-1]))
+        return rows, None
+
+    def get_paginated_data(self, items: List[Any], next_key: Optional[Sequence[Any]], **extra) -> dict:
+        return {
+            "items": items,
+            "next_cursor": encode_cursor(next_key) if next_key else None,
+            **extra,
+        }
+
+    def get_paginated_response(self, items: List[Any], next_key: Optional[Sequence[Any]], **extra) -> Response:
+        return Response(self.get_paginated_data(items, next_key, **extra))
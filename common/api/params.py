@@ -0,0 +1,47 @@
+# products-backend/common/api/params.py
+from datetime import date
+from typing import Optional
+
+from drf_spectacular.utils import OpenApiParameter
+
+from common.db.document_sections import VERSIONS_ALL, VERSIONS_CURRENT
+
+# ---------------------------------------------------------------------------
+# Parámetros de query compartidos por vistas sync y async
+# ---------------------------------------------------------------------------
+# Lanzan ValueError con el mensaje para el cliente; cada vista lo traduce a
+# 400.PARAMS_INVALID con su propio formato de respuesta.
+
+VERSIONS_PARAM = OpenApiParameter(
+    "versions", str, required=False, enum=[VERSIONS_ALL, VERSIONS_CURRENT],
+    description="all (default): todas las versiones por logical_code; "
+                "current: solo la versión vigente (la más alta) de cada logical_code",
+)
+
+
+def int_param(request, name: str, default: int, minimum: int, maximum: int) -> int:
+    raw = request.GET.get(name)
+    try:
+        value = int(raw) if raw not in (None, "") else default
+    except ValueError:
+        raise ValueError(f"{name} debe ser entero.")
+    if value < minimum or value > maximum:
+        raise ValueError(f"{name} debe estar entre {minimum} y {maximum}.")
+    return value
+
+
+def date_param(request, name: str) -> Optional[date]:
+    raw = request.GET.get(name)
+    if raw in (None, ""):
+        return None
+    try:
+        return date.fromisoformat(raw)
+    except ValueError:
+        raise ValueError(f"{name} debe ser una fecha YYYY-MM-DD.")
+
+
+def versions_param(request) -> str:
+    versions = (request.GET.get("versions") or VERSIONS_ALL).strip().lower()
+    if versions not in (VERSIONS_ALL, VERSIONS_CURRENT):
+        raise ValueError(f"versions debe ser '{VERSIONS_ALL}' o '{VERSIONS_CURRENT}'.")
+    return versions
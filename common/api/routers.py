@@ -1,9 +1,13 @@
 ﻿from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
+from common.api.views.slow_queries import SlowQueriesView
+
 # Router vacÃ­o por ahora (evita 404 en include)
 router = DefaultRouter()
 
 urlpatterns = [
     path("", include(router.urls)),
+    # Admin · DB (solo staff)
+    path("admin/db/slow-queries/", SlowQueriesView.as_view(), name="admin-db-slow-queries"),
 ]
@@ -0,0 +1,72 @@
+# products-backend/common/api/views/aio.py
+import json
+from typing import Any
+
+from django.http import HttpResponse, JsonResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+# ---------------------------------------------------------------------------
+# Vistas async (ASGI) de solo lectura
+# ---------------------------------------------------------------------------
+# DRF no soporta handlers async: estas vistas son django.views.View con métodos
+# 'async def' y el mismo formato de errores que la API ({"code", "detail"}).
+#
+# Autenticación sin tocar la base: el JWT se valida con JWTStatelessUserAuthentication
+# (TokenUser: id, actor_id y company_id salen de los claims firmados). Sin Bearer se
+# acepta la sesión de Django vía request.auser().
+
+
+def json_response(data: Any, status: int = 200) -> JsonResponse:
+    return JsonResponse(data, status=status, safe=False, json_dumps_params={"ensure_ascii": False})
+
+
+def error_response(code: str, detail: str, status: int) -> JsonResponse:
+    return json_response({"code": code, "detail": detail}, status=status)
+
+
+class AsyncReadView(View):
+    """Base de las vistas async: exige usuario autenticado (JWT o sesión) y responde JSON."""
+
+    http_method_names = ["get", "post", "options"]
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Igual que APIView: la auth es por token, no por cookie
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def authenticate(self, request):
+        try:
+            result = JWTStatelessUserAuthentication().authenticate(request)
+        except (InvalidToken, AuthenticationFailed) as e:
+            return None, str(e.detail.get("detail", e.detail) if isinstance(e.detail, dict) else e.detail)
+        if result is not None:
+            return result[0], None
+        user = await request.auser() if hasattr(request, "auser") else None
+        if user is not None and user.is_authenticated:
+            return user, None
+        return None, "Las credenciales de autenticación no se proveyeron."
+
+    async def dispatch(self, request, *args, **kwargs):
+        user, detail = await self.authenticate(request)
+        if user is None:
+            return error_response("401.NOT_AUTHENTICATED", detail, status=401)
+        request.user = user
+        return await super().dispatch(request, *args, **kwargs)
+
+    @staticmethod
+    def json_body(request) -> Any:
+        """Cuerpo JSON de la request ({} si viene vacío). ValueError si no es JSON válido."""
+        if not request.body:
+            return {}
+        try:
+            return json.loads(request.body)
+        except json.JSONDecodeError:
+            raise ValueError("El cuerpo debe ser JSON válido.")
+
+
+def bytes_response(body: bytes, status: int = 200) -> HttpResponse:
+    """JSON ya renderizado (p.ej. por Postgres) enviado tal cual."""
+    return HttpResponse(body, status=status, content_type="application/json")
@@ -0,0 +1,39 @@
+# products-backend/common/api/views/slow_queries.py
+from drf_spectacular.utils import OpenApiParameter, OpenApiResponse, extend_schema
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from common.db.slow_queries import recent_entries, summarize
+
+
+@extend_schema(
+    tags=["Admin · DB"],
+    operation_id="admin_db_slow_queries",
+    parameters=[
+        OpenApiParameter("limit", int, required=False, description="Máximo de entradas (default 50, máx 500)"),
+        OpenApiParameter("fingerprint", str, required=False, description="Solo las entradas de este fingerprint"),
+        OpenApiParameter("withPlan", bool, required=False, description="Solo entradas con EXPLAIN capturado"),
+        OpenApiParameter("summary", bool, required=False,
+                         description="Agrupar por fingerprint (veces, ms máx/medio, último plan)"),
+    ],
+    responses={200: OpenApiResponse(description="Consultas lentas recientes (ring buffer)")},
+)
+class SlowQueriesView(APIView):
+    """Consultas lentas capturadas por common.db.slow_queries. Solo staff."""
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        try:
+            limit = min(max(int(request.GET.get("limit", 50)), 1), 500)
+        except ValueError:
+            return Response({"code": "400.PARAMS_INVALID", "detail": "limit debe ser entero."}, status=400)
+        truthy = ("1", "true", "t", "yes", "y")
+        with_plan = str(request.GET.get("withPlan", "")).lower() in truthy
+        entries = recent_entries(limit=limit, fingerprint_=request.GET.get("fingerprint") or None,
+                                 with_plan=with_plan)
+        if str(request.GET.get("summary", "")).lower() in truthy:
+            groups = summarize(entries)
+            return Response({"items": groups, "total": len(groups)})
+        return Response({"items": entries, "total": len(entries)})
@@ -1,12 +1,158 @@
-from django.db import connection
+from contextlib import nullcontext
+from typing import Optional
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+
+# ---------------------------------------------------------------------------
+# Contexto RLS perezoso
+# ---------------------------------------------------------------------------
+# El contexto de Postgres (security.set_context_from_user → app.current_actor_id /
+# app.current_company_id) solo se aplica cuando la request ejecuta SQL de verdad, y
+# viaja en el mismo pipeline que la primera sentencia (un solo roundtrip).
+#
+# Cada conexión física recuerda qué usuario carga (RLS_STATE_ATTR en la conexión psycopg,
+# así el estado viaja con ella y el reset del pool lo limpia al devolverla):
+#   - mismo usuario → no se repite la llamada (conexiones persistentes/pool);
+#   - otro usuario → se reemplaza antes de la primera sentencia;
+#   - request anónima sobre una conexión con contexto → se limpia (no hay fuga).
+# Dentro de una transacción el estado se confirma con on_commit: si la transacción
+# se revierte, set_config también, y la próxima sentencia lo vuelve a aplicar.
+
+RLS_STATE_ATTR = "_rls_state"
+RLS_REQUEST_ATTR = "_rls_context"
+
+_SET_SQL = 'SELECT "security".set_context_from_user(%s)'
+_RESET_SQL = (
+    "SELECT set_config('app.current_actor_id', '', false), "
+    "set_config('app.current_company_id', '', false)"
+)
+
+
+class _TxnMarker:
+    """Callback on_commit que marca el contexto aplicado dentro de una transacción como confirmado."""
+
+    committed = False
+
+    def __call__(self):
+        self.committed = True
+
+
+def _carried_user(conn) -> Optional[int]:
+    """Usuario cuyo contexto carga hoy la conexión física (None = sin contexto)."""
+    state = getattr(conn.connection, RLS_STATE_ATTR, None)
+    if state is None:
+        return None
+    user_id, marker = state
+    if marker is None or marker.committed:
+        return user_id
+    # Aplicado en una transacción aún abierta: vale solo si sigue pendiente de commit
+    if any(func is marker for _, func, _ in conn.run_on_commit):
+        return user_id
+    return None
+
+
+def _record(conn, user_id: Optional[int]) -> None:
+    marker = None
+    if conn.in_atomic_block:
+        marker = _TxnMarker()
+        conn.on_commit(marker)
+    setattr(conn.connection, RLS_STATE_ATTR, (user_id, marker))
+
+
+def forget_rls_state(conn=connection) -> None:
+    """Olvida el contexto recordado (p.ej. al devolver/reciclar la conexión física)."""
+    if conn.connection is not None:
+        setattr(conn.connection, RLS_STATE_ATTR, None)
+
+
+def pipeline(conn=connection, cursor=None):
+    """
+    Modo pipeline de psycopg 3 en la conexión Django 'conn' (las sentencias se envían sin
+    esperar cada respuesta); lo usan el SET del contexto RLS y los planes de escritura.
+    Con otro driver o libpq sin soporte se ejecuta secuencialmente. Los cursores con nombre
+    (server-side, p.ej. chunked_cursor) no se admiten en pipeline: van en dos roundtrips.
+    """
+    raw = conn.connection
+    if getattr(cursor, "name", None) or not hasattr(raw, "pipeline"):
+        return nullcontext()
+    from psycopg import Pipeline
+    return raw.pipeline() if Pipeline.is_supported() else nullcontext()
+
+
+class RlsContext:
+    """
+    execute_wrapper que aplica el contexto RLS del usuario antes de la primera sentencia.
+
+    'user_id' se resuelve perezosamente: con JWT el usuario recién existe cuando DRF
+    autentica en la vista, después de que el middleware instaló el wrapper.
+    """
+
+    def __init__(self, request=None, user_id: Optional[int] = None):
+        self.request = request
+        self.user_id = user_id
+        self._busy = False
+
+    def _desired_user(self) -> Optional[int]:
+        if self.user_id is not None or self.request is None:
+            return self.user_id
+        user = getattr(self.request, "user", None)
+        return user.id if user is not None and user.is_authenticated else None
+
+    def __call__(self, execute, sql, params, many, context):
+        if self._busy:
+            return execute(sql, params, many, context)
+
+        conn = context["connection"]
+        self._busy = True
+        try:
+            desired = self._desired_user()
+        finally:
+            self._busy = False
+        if desired == _carried_user(conn):
+            return execute(sql, params, many, context)
+
+        # El SET/RESET va en un cursor cliente propio: el de la sentencia puede ser un
+        # cursor con nombre (un segundo execute lo declararía otra vez)
+        rls_cursor = conn.connection.cursor()
+        try:
+            with pipeline(conn, context["cursor"].cursor):
+                if desired is None:
+                    rls_cursor.execute(_RESET_SQL)
+                else:
+                    rls_cursor.execute(_SET_SQL, [desired])
+                result = execute(sql, params, many, context)
+        finally:
+            rls_cursor.close()
+        _record(conn, desired)
+        return result
+
+
+def set_db_context_for_user(user_id, using: str = DEFAULT_DB_ALIAS) -> None:
+    """Variante sin request (jobs RQ, comandos): carga el contexto RLS ya, salvo que la conexión lo tenga."""
+    conn = connections[using]
+    if _carried_user(conn) == user_id:
+        return
+    with conn.cursor() as cur:
+        cur.execute(_SET_SQL, [user_id])
+    _record(conn, user_id)
 
 
 def set_db_context_from_request(request) -> None:
     """
-    Establece el contexto en la sesión de Postgres usando la función:
+    Asegura el contexto RLS del usuario de la request:
       security.set_context_from_user(user_id)
     Debe llamarse al inicio de cada View que haga SQL directo.
+
+    Con ActorContextMiddleware instalado no ejecuta SQL: fija el usuario (ya autenticado
+    por DRF, p.ej. JWT) en el RlsContext de la request, que lo aplica junto con la
+    primera sentencia. Sin middleware (tests, scripts) lo aplica en el momento.
     """
     user_id = request.user.id
-    with connection.cursor() as cur:
-        cur.execute('SELECT "security".set_context_from_user(%s)', [user_id])
+    rls = getattr(request, RLS_REQUEST_ATTR, None)
+    if rls is None:
+        # DRF Request envuelve al HttpRequest del middleware
+        rls = getattr(getattr(request, "_request", None), RLS_REQUEST_ATTR, None)
+    if rls is not None:
+        rls.user_id = user_id
+        return
+    set_db_context_for_user(user_id)
@@ -0,0 +1,128 @@
+# products-backend/common/application/idempotency.py
+import json
+from typing import Any, Callable, Dict, Optional
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from redis.exceptions import LockError
+
+# ---------------------------------------------------------------------------
+# Idempotencia con single-flight
+# ---------------------------------------------------------------------------
+# - Redis: resultado por clave (lookup rápido, expira a los IDEMPOTENCY_TTL) y un lock
+#   por clave mientras el primer intento trabaja. Los duplicados concurrentes (doble
+#   click, reintentos) esperan ese lock y devuelven el mismo resultado.
+# - Postgres (common.idempotency): copia durable escrita en la misma transacción que
+#   el trabajo; cubre un Redis vaciado. Se poda con manage.py prune_idempotency.
+# Los resultados se guardan como JSON; nunca se evalúa texto almacenado.
+
+IDEMPOTENCY_TTL = 60 * 60 * 24
+IDEMPOTENCY_RETENTION_DAYS = 7
+# Máximo que un intento retiene la clave (si muere, el lock expira solo). Debe cubrir
+# el peor caso de fn(): si expira antes, un duplicado entra y repite el trabajo. Los
+# jobs RQ pasan su job_timeout (el worker mata el job antes de que el lock expire).
+LOCK_TIMEOUT = 60 * 5
+# Cuánto espera un duplicado a que termine el primero
+LOCK_WAIT = 30
+
+_RESULT_KEY = "idem:result:{key}"
+_LOCK_KEY = "idem:lock:{key}"
+
+
+class IdempotencyInFlight(Exception):
+    """Otro intento con la misma clave sigue en curso y no terminó dentro de LOCK_WAIT."""
+
+
+def _decode(raw) -> Dict[str, Any]:
+    # jsonb llega ya decodificado con psycopg 3; Redis guarda texto
+    return json.loads(raw) if isinstance(raw, (str, bytes)) else raw
+
+
+def _load_db(key: str) -> Optional[Dict[str, Any]]:
+    with connection.cursor() as cur:
+        cur.execute("""
+            SELECT result
+              FROM common.idempotency
+             WHERE request_key = %s
+               AND created_at > now() - make_interval(days => %s)
+        """, [key, IDEMPOTENCY_RETENTION_DAYS])
+        row = cur.fetchone()
+    return _decode(row[0]) if row else None
+
+
+def _store_db(key: str, body: str) -> None:
+    with connection.cursor() as cur:
+        cur.execute("""
+            INSERT INTO common.idempotency (request_key, result, created_at)
+            VALUES (%s, %s::jsonb, now())
+            ON CONFLICT (request_key) DO UPDATE
+               SET result = EXCLUDED.result, created_at = EXCLUDED.created_at
+        """, [key, body])
+
+
+def run_idempotent(key: str, fn: Callable[[], Dict[str, Any]], ttl: int = IDEMPOTENCY_TTL,
+                   lock_timeout: int = LOCK_TIMEOUT) -> Dict[str, Any]:
+    """
+    Ejecuta fn() a lo sumo una vez por clave y devuelve su resultado (dict JSON-serializable).
+
+    fn() corre dentro de una transacción junto con la persistencia del resultado:
+    o quedan ambos o ninguno. Debe llamarse fuera de toda transacción: el resultado se
+    publica en Redis y el lock se libera solo tras el COMMIT real (dentro de otro atomic
+    sería un savepoint y un duplicado podría leer un resultado que luego se revierte).
+    Lanza IdempotencyInFlight si el intento en curso no termina dentro de LOCK_WAIT.
+    """
+    result_key = _RESULT_KEY.format(key=key)
+    raw = cache.get(result_key)
+    if raw is not None:
+        return _decode(raw)
+
+    if connection.in_atomic_block:
+        raise RuntimeError("run_idempotent no puede ejecutarse dentro de una transacción abierta.")
+
+    lock = cache.lock(_LOCK_KEY.format(key=key), timeout=lock_timeout, blocking_timeout=LOCK_WAIT)
+    if not lock.acquire(blocking=True):
+        raise IdempotencyInFlight(key)
+    try:
+        # Quien tenía el lock pudo terminar mientras esperábamos
+        raw = cache.get(result_key)
+        if raw is not None:
+            return _decode(raw)
+
+        result = _load_db(key)
+        if result is None:
+            # durable: el bloque es la transacción externa, su salida es el COMMIT
+            with transaction.atomic(durable=True):
+                result = fn()
+                body = json.dumps(result, cls=DjangoJSONEncoder, separators=(",", ":"))
+                _store_db(key, body)
+        else:
+            body = json.dumps(result, cls=DjangoJSONEncoder, separators=(",", ":"))
+        cache.set(result_key, body, ttl)
+        return _decode(body)
+    finally:
+        try:
+            lock.release()
+        except LockError:
+            # Expiró antes de terminar (fn tardó más que lock_timeout)
+            pass
+
+
+def prune_idempotency(retention_days: int = IDEMPOTENCY_RETENTION_DAYS, batch_size: int = 5000) -> int:
+    """Borra de common.idempotency las filas fuera de retención, por lotes. Devuelve el total borrado."""
+    total = 0
+    while True:
+        with connection.cursor() as cur:
+            cur.execute("""
+                DELETE FROM common.idempotency
+                 WHERE ctid = ANY(ARRAY(
+                    SELECT ctid
+                      FROM common.idempotency
+                     WHERE created_at < now() - make_interval(days => %s)
+                     LIMIT %s
+                 ))
+            """, [retention_days, batch_size])
+            deleted = cur.rowcount
+        total += deleted
+        if deleted < batch_size:
+            return total
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class CommonConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "common"
+
+    def ready(self):
+        from common.db.pool import install_pool_reset, register_pool_metrics
+
+        install_pool_reset()
+        register_pool_metrics()
@@ -0,0 +1,259 @@
+# products-backend/common/benchmarks/concurrency.py
+import json
+import statistics
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from common.benchmarks.harness import _percentile
+from common.db.instrumentation import install_query_metrics, start_request_stats
+
+# ---------------------------------------------------------------------------
+# Arnés de escritura concurrente
+# ---------------------------------------------------------------------------
+# run_concurrent() lanza N 'submitters' (hilos, cada uno con su conexión Django) que
+# ejecutan op(worker, i) a la vez tras una barrera, y reporta por operación:
+#   - sentencias SQL (misma instrumentación que las requests). En modo pipeline varias
+#     sentencias viajan juntas: es el techo de round trips, no el conteo exacto;
+#   - duración de la transacción: desde su primera sentencia hasta el commit (on_commit)
+#     o, si se revierte, hasta el fin de la operación. Sin valor si la operación corre en
+#     autocommit (cada sentencia es su propia transacción);
+#   - esperas de lock: un hilo aparte muestrea pg_stat_activity cada 'sample_interval'
+#     sobre los backends de los submitters (wait_event_type = 'Lock'); el tiempo es una
+#     estimación (muestras × intervalo);
+#   - throughput: operaciones correctas / tiempo de pared de la corrida.
+# Los errores no cortan la corrida: se cuentan por tipo (y SQLSTATE si lo hay).
+# prepare(worker, i), si se pasa, corre antes de cada operación y fuera de la medición.
+
+_SQL_LOCK_WAITS = """
+    SELECT wait_event
+      FROM pg_stat_activity
+     WHERE pid = ANY(%s) AND wait_event_type = 'Lock'
+    """
+
+Op = Callable[[int, int], Any]
+
+
+@dataclass
+class ConcurrentResult:
+    name: str
+    submitters: int
+    ops: int
+    errors: int
+    wall_s: float
+    ops_per_s: float
+    p50_ms: float
+    p95_ms: float
+    max_ms: float
+    queries: float
+    txn_p50_ms: Optional[float]
+    txn_p95_ms: Optional[float]
+    lock_wait_ms: float
+    max_lock_waiters: int
+    distinct_results: int
+    lock_events: Dict[str, int] = field(default_factory=dict)
+    error_kinds: Dict[str, int] = field(default_factory=dict)
+
+
+class _TxnTimer:
+    """execute_wrapper: la primera sentencia dentro de un atomic abre la transacción."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.started: Optional[float] = None
+        self.ended: Optional[float] = None
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.started is None and self.conn.in_atomic_block:
+            self.started = time.perf_counter()
+            self.conn.on_commit(self._committed)
+        return execute(sql, params, many, context)
+
+    def _committed(self) -> None:
+        self.ended = time.perf_counter()
+
+    def take(self) -> Optional[float]:
+        """ms de la transacción de la última operación (None si no hubo) y reinicia."""
+        if self.started is None:
+            return None
+        # Sin commit (rollback o error) el callback no corre: cierra el fin de la operación
+        ms = ((self.ended or time.perf_counter()) - self.started) * 1000
+        self.started = self.ended = None
+        return ms
+
+
+class _LockMonitor(threading.Thread):
+    def __init__(self, pids: List[int], interval: float, alias: str):
+        super().__init__(name="bench-lock-monitor", daemon=True)
+        self.pids = pids
+        self.interval = interval
+        self.alias = alias
+        self.samples = 0
+        self.max_waiters = 0
+        self.events: Counter = Counter()
+        self.error: Optional[str] = None
+        self._done = threading.Event()
+
+    def run(self) -> None:
+        try:
+            with connections[self.alias].cursor() as cur:
+                while not self._done.wait(self.interval):
+                    cur.execute(_SQL_LOCK_WAITS, [self.pids])
+                    events = [r[0] for r in cur.fetchall()]
+                    self.samples += len(events)
+                    self.max_waiters = max(self.max_waiters, len(events))
+                    self.events.update(events)
+        except Exception as e:  # el monitor no debe tumbar la corrida
+            self.error = f"{type(e).__name__}: {e}"
+        finally:
+            connections.close_all()
+
+    def stop(self) -> None:
+        self._done.set()
+        self.join()
+
+
+def _error_kind(e: BaseException) -> str:
+    sqlstate = getattr(e, "sqlstate", None) or getattr(e.__cause__, "sqlstate", None)
+    return f"{type(e).__name__}:{sqlstate}" if sqlstate else type(e).__name__
+
+
+class _Worker(threading.Thread):
+    def __init__(self, index: int, op: Op, ops: int, warmup: int, alias: str, barrier: threading.Barrier,
+                 setup: Optional[Callable[[int], None]], prepare: Optional[Op]):
+        super().__init__(name=f"bench-submitter-{index}", daemon=True)
+        self.index, self.op, self.ops, self.warmup, self.alias = index, op, ops, warmup, alias
+        self.barrier, self.setup, self.prepare = barrier, setup, prepare
+        self.pid: Optional[int] = None
+        self.latencies: List[float] = []
+        self.queries: List[int] = []
+        self.txn_ms: List[float] = []
+        self.results: List[str] = []
+        self.errors: Counter = Counter()
+
+    def run(self) -> None:
+        conn = connections[self.alias]
+        try:
+            try:
+                if self.setup:
+                    self.setup(self.index)
+                with conn.cursor() as cur:
+                    cur.execute("SELECT pg_backend_pid()")
+                    self.pid = cur.fetchone()[0]
+                for i in range(self.warmup):
+                    self._run_op(-1 - i, measured=False)
+            except Exception as e:
+                self.pid = None
+                self.errors[f"setup:{_error_kind(e)}"] += 1
+            finally:
+                # Aunque falle el setup, el hilo libera la barrera
+                self.barrier.wait()
+            if self.pid is None:
+                return
+
+            timer = _TxnTimer(conn)
+            with conn.execute_wrapper(timer), install_query_metrics(capture_slow=False):
+                for i in range(self.ops):
+                    self._run_op(i, measured=True, timer=timer)
+        finally:
+            connections.close_all()
+
+    def _run_op(self, i: int, measured: bool, timer: Optional[_TxnTimer] = None) -> None:
+        if self.prepare:
+            try:
+                self.prepare(self.index, i)
+            except Exception as e:
+                self.errors[f"prepare:{_error_kind(e)}"] += 1
+                return
+            if timer:
+                timer.take()
+        stats = start_request_stats()
+        start = time.perf_counter()
+        try:
+            result = self.op(self.index, i)
+        except Exception as e:
+            if measured:
+                self.errors[_error_kind(e)] += 1
+                timer.take()
+            return
+        if not measured:
+            return
+        self.latencies.append((time.perf_counter() - start) * 1000)
+        self.queries.append(stats.queries)
+        txn = timer.take()
+        if txn is not None:
+            self.txn_ms.append(txn)
+        self.results.append(json.dumps(result, sort_keys=True, default=str))
+
+
+def run_concurrent(name: str, op: Op, submitters: int = 1, ops_per_submitter: int = 10, warmup: int = 1,
+                   setup: Optional[Callable[[int], None]] = None, prepare: Optional[Op] = None,
+                   sample_interval: float = 0.01, alias: str = DEFAULT_DB_ALIAS) -> ConcurrentResult:
+    """
+    Corre op(worker, i) en 'submitters' hilos a la vez ('ops_per_submitter' cada uno, tras
+    'warmup' operaciones no medidas). setup(worker) corre al iniciar cada hilo (p.ej. el
+    contexto RLS de su conexión).
+    """
+    barrier = threading.Barrier(submitters + 1)
+    workers = [_Worker(w, op, ops_per_submitter, warmup, alias, barrier, setup, prepare) for w in range(submitters)]
+    for w in workers:
+        w.start()
+    barrier.wait()
+
+    monitor = _LockMonitor([w.pid for w in workers if w.pid is not None], sample_interval, alias)
+    monitor.start()
+    start = time.perf_counter()
+    for w in workers:
+        w.join()
+    wall = time.perf_counter() - start
+    monitor.stop()
+
+    latencies = [v for w in workers for v in w.latencies]
+    txn = [v for w in workers for v in w.txn_ms]
+    errors: Counter = Counter()
+    for w in workers:
+        errors.update(w.errors)
+    if monitor.error:
+        errors[f"lock_monitor: {monitor.error}"] += 1
+
+    return ConcurrentResult(
+        name=name,
+        submitters=submitters,
+        ops=len(latencies),
+        errors=sum(errors.values()),
+        wall_s=round(wall, 3),
+        ops_per_s=round(len(latencies) / wall, 2) if wall else 0.0,
+        p50_ms=round(_percentile(latencies, 50), 3) if latencies else 0.0,
+        p95_ms=round(_percentile(latencies, 95), 3) if latencies else 0.0,
+        max_ms=round(max(latencies), 3) if latencies else 0.0,
+        queries=statistics.fmean([q for w in workers for q in w.queries]) if latencies else 0.0,
+        txn_p50_ms=round(_percentile(txn, 50), 3) if txn else None,
+        txn_p95_ms=round(_percentile(txn, 95), 3) if txn else None,
+        lock_wait_ms=round(monitor.samples * sample_interval * 1000, 1),
+        max_lock_waiters=monitor.max_waiters,
+        distinct_results=len({r for w in workers for r in w.results}),
+        lock_events=dict(monitor.events),
+        error_kinds=dict(errors),
+    )
+
+
+def format_concurrent_table(results: List[ConcurrentResult]) -> List[str]:
+    lines = [
+        f"{'caso':34} {'subm':>4} {'ops':>5} {'err':>4} {'ops/s':>8} {'p50 ms':>9} {'p95 ms':>9} "
+        f"{'SQL':>6} {'txn p95':>9} {'lock ms':>8} {'max esp':>7}"
+    ]
+    for r in results:
+        txn = f"{r.txn_p95_ms:9.2f}" if r.txn_p95_ms is not None else f"{'-':>9}"
+        lines.append(
+            f"{r.name:34} {r.submitters:4d} {r.ops:5d} {r.errors:4d} {r.ops_per_s:8.2f} {r.p50_ms:9.2f} "
+            f"{r.p95_ms:9.2f} {r.queries:6g} {txn} {r.lock_wait_ms:8.1f} {r.max_lock_waiters:7d}"
+        )
+        if r.lock_events:
+            lines.append(f"{'':34}   locks: " + ", ".join(f"{k}×{v}" for k, v in sorted(r.lock_events.items())))
+        if r.error_kinds:
+            lines.append(f"{'':34}   errores: " + ", ".join(f"{k}×{v}" for k, v in sorted(r.error_kinds.items())))
+    return lines
@@ -0,0 +1,127 @@
+# products-backend/common/benchmarks/harness.py
+import json
+import statistics
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from common.db.instrumentation import install_query_metrics, start_request_stats
+
+# ---------------------------------------------------------------------------
+# Arnés de benchmarks (fuera de la suite de tests)
+# ---------------------------------------------------------------------------
+# measure() llama a una función de servicio N veces y registra latencia y SQL por
+# llamada con la misma instrumentación que las requests (common/db/instrumentation.py):
+# sentencias, filas y tiempo en base.
+#
+# Baselines: JSON versionado junto a cada suite, por suite y por clave de dataset
+# (p.ej. "nodes=10042"). compare() marca regresión si:
+#   - p95 supera la baseline en más de 'tolerance' (relativo) y 'slack_ms' (absoluto), o
+#   - la llamada hace más sentencias SQL que en la baseline (el conteo es determinista).
+# missing_from_baseline() lista los casos sin valores medidos: con --check cuentan como falla.
+#
+# La captura de consultas lentas queda apagada durante la medición: los casos grandes
+# superan DB_SLOW_QUERY_MS a propósito y no deben encolar EXPLAIN ni tocar Redis.
+
+
+@dataclass
+class CaseResult:
+    name: str
+    iterations: int
+    p50_ms: float
+    p95_ms: float
+    max_ms: float
+    mean_ms: float
+    queries: float
+    rows: float
+    db_ms: float
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def measure(name: str, fn: Callable[[], Any], iterations: int = 20, warmup: int = 2) -> CaseResult:
+    for _ in range(warmup):
+        fn()
+
+    latencies: List[float] = []
+    queries: List[int] = []
+    rows: List[int] = []
+    db: List[float] = []
+    for _ in range(iterations):
+        stats = start_request_stats()
+        with install_query_metrics(capture_slow=False):
+            start = time.perf_counter()
+            fn()
+            latencies.append((time.perf_counter() - start) * 1000)
+        queries.append(stats.queries)
+        rows.append(stats.rows)
+        db.append(stats.seconds * 1000)
+
+    return CaseResult(
+        name=name,
+        iterations=iterations,
+        p50_ms=round(_percentile(latencies, 50), 3),
+        p95_ms=round(_percentile(latencies, 95), 3),
+        max_ms=round(max(latencies), 3),
+        mean_ms=round(statistics.fmean(latencies), 3),
+        queries=statistics.fmean(queries),
+        rows=statistics.fmean(rows),
+        db_ms=round(statistics.fmean(db), 3),
+    )
+
+
+def load_baselines(path: Path) -> Dict[str, Dict[str, Any]]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_baseline(path: Path, key: str, results: List[CaseResult]) -> None:
+    baselines = load_baselines(path)
+    # Merge por caso: una corrida con --only no borra los demás casos del dataset
+    baselines.setdefault(key, {}).update({r.name: asdict(r) for r in results})
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(baselines, ensure_ascii=False, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def missing_from_baseline(results: List[CaseResult], baseline: Optional[Dict[str, Any]]) -> List[str]:
+    """Casos sin baseline medida (todos si no hay baseline para el dataset)."""
+    return [r.name for r in results if not (baseline or {}).get(r.name)]
+
+
+def compare(results: List[CaseResult], baseline: Optional[Dict[str, Any]],
+            tolerance: float = 0.20, slack_ms: float = 1.0) -> List[str]:
+    """Regresiones frente a la baseline (lista vacía si no hay baseline o todo está en rango)."""
+    if not baseline:
+        return []
+    out: List[str] = []
+    for r in results:
+        base = baseline.get(r.name)
+        if base is None:
+            continue
+        limit = base["p95_ms"] * (1 + tolerance) + slack_ms
+        if r.p95_ms > limit:
+            out.append(f"{r.name}: p95 {r.p95_ms} ms > {limit:.3f} ms (baseline {base['p95_ms']} ms)")
+        if r.queries > base["queries"]:
+            out.append(f"{r.name}: {r.queries:g} sentencias SQL > baseline {base['queries']:g}")
+    return out
+
+
+def format_table(results: List[CaseResult], baseline: Optional[Dict[str, Any]] = None) -> List[str]:
+    lines = [f"{'caso':40} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'SQL':>7} {'filas':>9} {'db ms':>9}  vs baseline"]
+    for r in results:
+        base = (baseline or {}).get(r.name)
+        delta = ""
+        if base:
+            delta = f"p95 {((r.p95_ms / base['p95_ms']) - 1) * 100:+.0f}%" if base["p95_ms"] else ""
+            if r.queries != base["queries"]:
+                delta += f"  SQL {base['queries']:g}→{r.queries:g}"
+        lines.append(
+            f"{r.name:40} {r.p50_ms:9.2f} {r.p95_ms:9.2f} {r.max_ms:9.2f} {r.queries:7g} {r.rows:9g} {r.db_ms:9.2f}  {delta}"
+        )
+    return lines
@@ -0,0 +1,126 @@
+# products-backend/common/db/aio.py
+import asyncio
+import time
+from contextlib import nullcontext
+from typing import Any, Awaitable, Dict, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db import connections
+
+from common.application.db import _RESET_SQL, _SET_SQL, RLS_STATE_ATTR
+from common.db.instrumentation import caller_function, literal_sql, record_query
+from common.db.routers import aread_alias
+from common.db.slow_queries import submit_slow_query, threshold_seconds
+
+# ---------------------------------------------------------------------------
+# Conexiones psycopg3 async para las vistas ASGI de solo lectura
+# ---------------------------------------------------------------------------
+# Django no ofrece cursores async: las vistas async consultan con un
+# psycopg_pool.AsyncConnectionPool propio por alias (y por event loop).
+# Cada consulta toma su propia conexión, así las consultas independientes de una
+# request corren en paralelo con asyncio.gather().
+#
+# Contexto RLS: fetch() envía en un mismo pipeline
+#   set_context_from_user(user) → consulta → reset de app.current_*
+# (un solo roundtrip) y la conexión vuelve limpia al pool. Si la consulta falla, el
+# pipeline se aborta antes del reset y lo hace el hook 'reset' del pool.
+
+_pools: Dict[Tuple[str, int], Any] = {}
+
+
+def _connect_kwargs(alias: str) -> Dict[str, Any]:
+    """
+    Parámetros de psycopg.connect() para el alias, los mismos que usa Django: todas las
+    OPTIONS (sslmode, sslrootcert, connect_timeout, options...) y sus adaptadores.
+    """
+    params = connections[alias].get_connection_params()
+    # Cada llamador elige su cursor (el pool async usa AsyncClientCursor)
+    params.pop("cursor_factory", None)
+    return params
+
+
+async def _reset_connection(conn) -> None:
+    if getattr(conn, RLS_STATE_ATTR, None) is None:
+        return
+    await conn.execute(_RESET_SQL)
+    setattr(conn, RLS_STATE_ATTR, None)
+
+
+async def get_pool(alias: str):
+    """Pool async del alias para el event loop actual (se abre en el primer uso)."""
+    from psycopg import AsyncClientCursor
+    from psycopg_pool import AsyncConnectionPool
+
+    key = (alias, id(asyncio.get_running_loop()))
+    pool = _pools.get(key)
+    if pool is None:
+        pool = _pools[key] = AsyncConnectionPool(
+            "",
+            min_size=settings.DB_ASYNC_POOL_MIN_SIZE,
+            max_size=settings.DB_ASYNC_POOL_MAX_SIZE,
+            timeout=settings.DB_ASYNC_POOL_TIMEOUT,
+            # Binding del lado del cliente, igual que Django: el mismo SQL sirve en ambas rutas
+            kwargs={**_connect_kwargs(alias), "autocommit": True, "cursor_factory": AsyncClientCursor},
+            reset=_reset_connection,
+            open=False,
+        )
+    await pool.open()
+    return pool
+
+
+def _pipeline(conn):
+    from psycopg import AsyncPipeline
+
+    return conn.pipeline() if AsyncPipeline.is_supported() else nullcontext()
+
+
+def fetch(sql: str, params: Any = None, *, user_id: Optional[int],
+          alias: Optional[str] = None) -> Awaitable[List[Sequence[Any]]]:
+    """
+    Ejecuta una consulta de solo lectura con el contexto RLS de 'user_id' y devuelve las filas.
+    Sin alias, lee de réplica o primario según common.db.routers.aread_alias().
+    """
+    # La función de servicio se resuelve aquí: dentro de la corrutina ya no está en la pila
+    return _fetch(sql, params, user_id, alias, caller_function())
+
+
+async def _fetch(sql, params, user_id, alias, function) -> List[Sequence[Any]]:
+    alias = alias or await aread_alias()
+    pool = await get_pool(alias)
+    start = time.perf_counter()
+    async with pool.connection() as conn:
+        async with _pipeline(conn):
+            if user_id is not None:
+                setattr(conn, RLS_STATE_ATTR, (user_id, None))
+                await conn.execute(_SET_SQL, [user_id])
+            cur = await conn.execute(sql, params)
+            if user_id is not None:
+                await conn.execute(_RESET_SQL)
+            # fetchall() sincroniza el pipeline: set + consulta + reset en un roundtrip
+            rows = await cur.fetchall()
+        setattr(conn, RLS_STATE_ATTR, None)
+        elapsed = time.perf_counter() - start
+        slow = threshold_seconds()
+        is_slow = slow is not None and elapsed >= slow
+        # mogrify es del lado del cliente (AsyncClientCursor): no toca la conexión
+        slow_sql = literal_sql(cur, sql, params) if is_slow else None
+    if is_slow:
+        # Redis (cache.add) y el enqueue RQ son bloqueantes: van al hilo de fondo de
+        # common.db.slow_queries, sin frenar el event loop ni esperar el registro
+        submit_slow_query(
+            alias=alias, literal_sql=slow_sql, sql=sql,
+            seconds=elapsed, rows=len(rows), function=function, user_id=user_id,
+        )
+    record_query(function, len(rows), elapsed)
+    return rows
+
+
+async def fetchone(sql: str, params: Any = None, *, user_id: Optional[int],
+                   alias: Optional[str] = None) -> Optional[Sequence[Any]]:
+    rows = await _fetch(sql, params, user_id, alias, caller_function())
+    return rows[0] if rows else None
+
+
+async def close_pools() -> None:
+    for key in list(_pools):
+        await _pools.pop(key).close()
@@ -0,0 +1,48 @@
+# products-backend/common/db/document_sections.py
+from typing import Optional
+
+# ---------------------------------------------------------------------------
+# Secciones documentales de una versión de producto (CG/CP/ANNEX/FORMAT)
+# ---------------------------------------------------------------------------
+# SQL compartido por el árbol y el ZIP del expediente (expediente.api.services) y por
+# los vínculos de versión de products (products.infrastructure.repositories).
+
+# Secciones documentales: (tabla link, FK en link, tabla core, alias del id, columnas extra)
+SECTIONS = {
+    "CG": ("link.vp_to_cg", "idcg", "core.cg", "cg_id", "d.referencia_normativa"),
+    "CP": ("link.vp_to_cp", "idcp", "core.cp", "cp_id", "c.genera_prima"),
+    "ANNEX": ("link.vp_to_annex", "idannex", "core.annex", "annex_id", "c.genera_prima, c.tipo"),
+    "FORMAT": ("link.vp_to_format", "idformat", "core.format", "format_id", "c.tipo"),
+}
+
+VERSIONS_ALL = "all"
+VERSIONS_CURRENT = "current"
+
+
+def section_sql(section: str, versions: str = VERSIONS_ALL, version_expr: str = "h.version_id",
+                as_of_expr: Optional[str] = None) -> str:
+    """
+    Documentos de una sección vinculados a una versión de producto.
+
+    versions="current" devuelve solo la versión más alta por logical_code (DISTINCT ON),
+    así el cliente no recibe ni filtra historiales completos.
+    as_of_expr (fragmento SQL de tipo date) restringe a los vínculos cuya vigencia
+    contiene esa fecha; lo resuelve el índice GiST (idversionproduct, vigencia).
+    """
+    link, fk, table, id_alias, extra = SECTIONS[section]
+    if versions == VERSIONS_CURRENT:
+        distinct, order = "DISTINCT ON (c.logical_code) ", "c.logical_code, c.version DESC"
+    else:
+        distinct, order = "", "c.logical_code, c.version"
+    as_of = f"AND l.vigencia @> {as_of_expr}" if as_of_expr else ""
+    return f"""
+          SELECT {distinct}l.id link_id, c.id {id_alias}, d.id doc_id, c.logical_code, c.version, l.estado,
+                 l.vigencia::text AS vigencia,
+                 d.nombre, d.mime, d.archivo_url, d.tamano, {extra}
+            FROM {link} l
+            JOIN {table} c ON c.id = l.{fk}
+            JOIN core.documento d ON d.id = c.documento_id
+           WHERE l.idversionproduct = {version_expr}
+             {as_of}
+           ORDER BY {order}
+    """
@@ -0,0 +1,273 @@
+# products-backend/common/db/index_advisor.py
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# ---------------------------------------------------------------------------
+# Análisis de planes EXPLAIN (ANALYZE, BUFFERS, VERBOSE, FORMAT JSON)
+# ---------------------------------------------------------------------------
+# Usado por `manage.py index_advisor` sobre las consultas de common.db.query_registry.
+# Hallazgos:
+#   - seq_scan:   Seq Scan que examina >= min_rows filas (filas devueltas + descartadas
+#                 por el filtro, por cada loop). El filtro, o la condición del Hash Join
+#                 que lo consume (típico en los CTE recursivos por parent_id), da las
+#                 columnas/expresiones a indexar.
+#   - sort_spill: Sort que bajó a disco (Sort Space Type = Disk / external merge).
+#   - sort_scan:  Sort directamente sobre un scan de una tabla que examina >= min_rows
+#                 filas: un índice con (columnas del filtro, claves del sort) evita el Sort.
+# Las propuestas son heurísticas: se descartan las que ya cubre un índice existente
+# (mismas columnas al inicio) y hay que revisarlas antes de versionarlas en una migración.
+
+_SCAN_TYPES = ("Seq Scan", "Index Scan", "Index Only Scan", "Bitmap Heap Scan")
+
+# ((n.attrs ->> 'ord'::text))::integer → (attrs->>'ord')::integer
+_RE_JSON_KEY_CAST = re.compile(r"'([^']*)'::text")
+_RE_SPACES = re.compile(r"\s+")
+
+
+@dataclass
+class IndexProposal:
+    table: str
+    keys: List[str]
+    reason: str
+
+    @property
+    def name(self) -> str:
+        slug = "_".join(re.sub(r"[^a-z0-9]+", "_", k.lower()).strip("_") for k in self.keys)
+        return f"{self.table.split('.')[-1]}_{slug}"[:59] + "_idx"
+
+    def sql(self) -> str:
+        cols = ", ".join(k if _is_plain_column(k) else f"({k})" for k in self.keys)
+        return f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {self.name} ON {self.table} ({cols});"
+
+
+@dataclass
+class Finding:
+    kind: str
+    table: Optional[str]
+    detail: str
+    proposal: Optional[IndexProposal] = None
+
+
+@dataclass
+class PlanReport:
+    execution_ms: Optional[float]
+    shared_hit: int
+    shared_read: int
+    temp_written: int
+    findings: List[Finding] = field(default_factory=list)
+
+
+def _is_plain_column(key: str) -> bool:
+    return re.fullmatch(r"\w+", key) is not None
+
+
+def walk(node: Dict[str, Any], parent: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[Dict, Optional[Dict]]]:
+    yield node, parent
+    for child in node.get("Plans", []) or []:
+        yield from walk(child, node)
+
+
+def clean_expr(expr: str, alias: Optional[str]) -> str:
+    """Texto de EXPLAIN → expresión indexable sin alias ni casts de literales."""
+    s = _RE_SPACES.sub(" ", expr.strip())
+    if alias:
+        s = re.sub(rf"\b{re.escape(alias)}\.", "", s)
+    s = _RE_JSON_KEY_CAST.sub(r"'\1'", s)
+    s = s.replace(" ->> ", "->>").replace(" -> ", "->")
+    # Paréntesis externos redundantes: ((x)) → x
+    while s.startswith("(") and s.endswith(")") and _balanced(s[1:-1]):
+        s = s[1:-1]
+    return s
+
+
+def _balanced(s: str) -> bool:
+    depth = 0
+    for ch in s:
+        depth += ch == "("
+        depth -= ch == ")"
+        if depth < 0:
+            return False
+    return depth == 0
+
+
+def predicate_keys(condition: str, alias: str) -> List[str]:
+    """
+    Columnas/expresiones de 'alias' comparadas en una condición de EXPLAIN VERBOSE.
+    Prioriza expresiones (upper(x->>'k'), (x->>'k')::int, x->>'k') sobre columnas sueltas.
+    """
+    a = re.escape(alias)
+    patterns = [
+        rf"(?:upper|lower)\(\({a}\.\w+ ->> '[^']*'::text\)\)",
+        rf"\(\({a}\.\w+ ->> '[^']*'::text\)\)::\w+",
+        rf"\({a}\.\w+ ->> '[^']*'::text\)",
+        rf"{a}\.\w+",
+    ]
+    keys: List[str] = []
+    taken: List[Tuple[int, int]] = []
+    for pattern in patterns:
+        for m in re.finditer(pattern, condition):
+            if any(s <= m.start() and m.end() <= e for s, e in taken):
+                continue
+            taken.append((m.start(), m.end()))
+            key = clean_expr(m.group(0), alias)
+            if key not in keys:
+                keys.append(key)
+    # Orden de aparición en la condición: igualdades primero en la práctica
+    return sorted(keys, key=lambda k: _first_pos(condition, k, alias))
+
+
+def _first_pos(condition: str, key: str, alias: str) -> int:
+    column = re.search(r"\w+", key).group(0)
+    pos = condition.find(f"{alias}.{column}")
+    return pos if pos >= 0 else len(condition)
+
+
+def _table(node: Dict[str, Any]) -> Optional[str]:
+    relation = node.get("Relation Name")
+    if not relation:
+        return None
+    schema = node.get("Schema")
+    return f"{schema}.{relation}" if schema else relation
+
+
+def _rows_examined(node: Dict[str, Any]) -> float:
+    per_loop = (node.get("Actual Rows") or 0) + (node.get("Rows Removed by Filter") or 0)
+    return per_loop * (node.get("Actual Loops") or 1)
+
+
+def _join_condition(parent: Optional[Dict[str, Any]], parents: Dict[int, Dict]) -> Optional[str]:
+    """Condición del join que consume este scan (el Hash intermedio se salta)."""
+    node = parent
+    while node is not None:
+        for key in ("Hash Cond", "Merge Cond", "Join Filter"):
+            if node.get(key):
+                return node[key]
+        if node.get("Node Type") != "Hash":
+            return None
+        node = parents.get(id(node))
+    return None
+
+
+def analyze_plan(explain: Any, min_rows: int = 1000) -> PlanReport:
+    """Hallazgos de un resultado de EXPLAIN (ANALYZE, BUFFERS, VERBOSE, FORMAT JSON)."""
+    root = explain[0] if isinstance(explain, list) else explain
+    plan = root["Plan"]
+    report = PlanReport(
+        execution_ms=root.get("Execution Time"),
+        shared_hit=plan.get("Shared Hit Blocks", 0),
+        shared_read=plan.get("Shared Read Blocks", 0),
+        temp_written=plan.get("Temp Written Blocks", 0),
+    )
+
+    parents: Dict[int, Dict] = {}
+    for node, parent in walk(plan):
+        if parent is not None:
+            parents[id(node)] = parent
+
+    for node, parent in walk(plan):
+        kind = node.get("Node Type")
+        if kind == "Seq Scan":
+            _seq_scan_finding(report, node, parent, parents, min_rows)
+        elif kind == "Sort":
+            _sort_findings(report, node, min_rows)
+    return report
+
+
+def _seq_scan_finding(report: PlanReport, node, parent, parents, min_rows: int) -> None:
+    examined = _rows_examined(node)
+    if examined < min_rows:
+        return
+    table, alias = _table(node), node.get("Alias")
+    condition = node.get("Filter") or _join_condition(parent, parents)
+    keys = predicate_keys(condition, alias) if condition and alias else []
+    detail = f"Seq Scan sobre {table}: {int(examined)} filas examinadas en {node.get('Actual Loops', 1)} loop(s)"
+    if condition:
+        detail += f"; condición {condition}"
+    proposal = IndexProposal(table, keys[:3], "seq_scan") if table and keys else None
+    report.findings.append(Finding("seq_scan", table, detail, proposal))
+
+
+def _sort_findings(report: PlanReport, node, min_rows: int) -> None:
+    method = node.get("Sort Method") or ""
+    keys = node.get("Sort Key") or []
+    if node.get("Sort Space Type") == "Disk" or "external" in method:
+        report.findings.append(Finding(
+            "sort_spill", None,
+            f"Sort a disco ({method}, {node.get('Sort Space Used')} kB) por {', '.join(keys)}",
+        ))
+
+    children = node.get("Plans") or []
+    if len(children) != 1 or children[0].get("Node Type") not in _SCAN_TYPES:
+        return
+    scan = children[0]
+    if _rows_examined(scan) < min_rows:
+        return
+    table, alias = _table(scan), scan.get("Alias")
+    if not table or not alias:
+        return
+    condition = scan.get("Filter") or scan.get("Index Cond") or scan.get("Recheck Cond") or ""
+    filter_keys = predicate_keys(condition, alias) if condition else []
+    sort_keys = [clean_expr(k, alias) for k in keys if not k.upper().endswith(" DESC")]
+    if not sort_keys:
+        return
+    proposal = IndexProposal(table, (filter_keys[:2] + [k for k in sort_keys if k not in filter_keys])[:4], "sort_scan")
+    report.findings.append(Finding(
+        "sort_scan", table,
+        f"Sort ({method or 'n/d'}) sobre {scan.get('Node Type')} de {table} por {', '.join(keys)}",
+        proposal,
+    ))
+
+
+# ---------------- Índices existentes ----------------
+
+_SQL_INDEXES = """
+    SELECT schemaname || '.' || tablename, indexdef
+    FROM pg_indexes
+    WHERE schemaname || '.' || tablename = ANY(%s)
+    """
+
+
+def _norm_key(text: str) -> str:
+    s = _RE_JSON_KEY_CAST.sub(r"'\1'", text.lower())
+    return re.sub(r"[\s()\"]", "", s)
+
+
+def _index_keys(indexdef: str) -> List[str]:
+    """
+    Claves de un CREATE INDEX ... USING btree (k1, (expr), k2) normalizadas. Solo la lista
+    de claves: INCLUDE (...) y el WHERE de un índice parcial quedan fuera.
+    """
+    m = re.search(r"USING \w+ \(", indexdef)
+    if not m:
+        return []
+    keys, depth, cur = [], 0, ""
+    for ch in indexdef[m.end():]:
+        if ch == ")" and depth == 0:
+            break
+        if ch == "," and depth == 0:
+            keys.append(cur)
+            cur = ""
+            continue
+        depth += ch == "("
+        depth -= ch == ")"
+        cur += ch
+    keys.append(cur)
+    return [_norm_key(re.sub(r"\s+(ASC|DESC|NULLS \w+)\b", "", k, flags=re.I)) for k in keys]
+
+
+def existing_indexes(cursor, tables: Sequence[str]) -> Dict[str, List[List[str]]]:
+    cursor.execute(_SQL_INDEXES, [list(tables)])
+    out: Dict[str, List[List[str]]] = {}
+    for table, indexdef in cursor.fetchall():
+        out.setdefault(table, []).append(_index_keys(indexdef))
+    return out
+
+
+def is_covered(proposal: IndexProposal, indexes: Dict[str, List[List[str]]]) -> bool:
+    """True si un índice de la tabla empieza con las mismas claves de la propuesta."""
+    wanted = [_norm_key(k) for k in proposal.keys]
+    for keys in indexes.get(proposal.table, []):
+        if keys[:len(wanted)] == wanted:
+            return True
+    return False
@@ -0,0 +1,194 @@
+# products-backend/common/db/instrumentation.py
+import sys
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from prometheus_client import Counter, Histogram
+
+from common.application.db import RLS_STATE_ATTR
+from common.db.routers import replica_aliases
+from common.db.slow_queries import submit_slow_query, threshold_seconds
+
+# ---------------------------------------------------------------------------
+# Instrumentación de SQL por request
+# ---------------------------------------------------------------------------
+# Los servicios usan SQL directo (connection.cursor()), así que las métricas de
+# modelos de django_prometheus no ven nada. QueryMetrics es un execute_wrapper que,
+# durante una request, cuenta sentencias, filas y tiempo de base de datos:
+#   - por endpoint (ruta de Django, p.ej. "api/ramos/tree/");
+#   - por función de servicio (primer frame en *.services.*, *.use_cases.*, *.infrastructure.*).
+# Las consultas async (common.db.aio) se registran con record_query().
+#
+# Las sentencias por encima de DB_SLOW_QUERY_MS pasan además a common.db.slow_queries
+# (en un hilo de fondo: submit_slow_query).
+#
+# Un N+1 (p.ej. _ascend_path dentro de un bucle) se ve como un salto en
+# django_db_function_queries_per_request{function="...contable_service._ascend_path"}.
+
+SERVICE_MODULE_MARKERS = (".services.", ".use_cases.", ".infrastructure.", ".repositories")
+UNATTRIBUTED = "<other>"
+_MAX_FRAMES = 40
+
+_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 200, 500, 1000)
+_ROW_BUCKETS = (1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+REQUEST_QUERIES = Histogram(
+    "django_db_request_queries", "Sentencias SQL por request.", ["endpoint"], buckets=_COUNT_BUCKETS)
+REQUEST_ROWS = Histogram(
+    "django_db_request_rows", "Filas devueltas/afectadas por request.", ["endpoint"], buckets=_ROW_BUCKETS)
+REQUEST_DB_SECONDS = Histogram(
+    "django_db_request_seconds", "Tiempo en base de datos por request.", ["endpoint"])
+FUNCTION_QUERIES = Histogram(
+    "django_db_function_queries_per_request", "Sentencias SQL por función de servicio en una request.",
+    ["endpoint", "function"], buckets=_COUNT_BUCKETS)
+FUNCTION_DB_SECONDS = Counter(
+    "django_db_function_seconds", "Tiempo en base de datos por función de servicio.", ["endpoint", "function"])
+
+
+class _FunctionStats:
+    __slots__ = ("queries", "rows", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.rows = 0
+        self.seconds = 0.0
+
+
+class RequestQueryStats:
+    """Acumulado de la request en curso (compartido entre hilo de la vista y tareas async)."""
+
+    def __init__(self):
+        self.queries = 0
+        self.rows = 0
+        self.seconds = 0.0
+        self.functions: Dict[str, _FunctionStats] = {}
+
+    def add(self, function: str, rows: int, seconds: float) -> None:
+        self.queries += 1
+        self.rows += rows
+        self.seconds += seconds
+        fn = self.functions.get(function)
+        if fn is None:
+            fn = self.functions[function] = _FunctionStats()
+        fn.queries += 1
+        fn.rows += rows
+        fn.seconds += seconds
+
+    def observe(self, endpoint: str) -> None:
+        REQUEST_QUERIES.labels(endpoint).observe(self.queries)
+        REQUEST_ROWS.labels(endpoint).observe(self.rows)
+        REQUEST_DB_SECONDS.labels(endpoint).observe(self.seconds)
+        for function, fn in self.functions.items():
+            FUNCTION_QUERIES.labels(endpoint, function).observe(fn.queries)
+            FUNCTION_DB_SECONDS.labels(endpoint, function).inc(fn.seconds)
+
+    def server_timing(self) -> str:
+        parts = [f'db;dur={self.seconds * 1000:.1f};desc="{self.queries} queries, {self.rows} rows"']
+        top = sorted(self.functions.items(), key=lambda kv: kv[1].seconds, reverse=True)[:5]
+        for i, (function, fn) in enumerate(top, start=1):
+            name = function.rsplit(".", 1)[-1]
+            parts.append(f'db{i};dur={fn.seconds * 1000:.1f};desc="{name} x{fn.queries}"')
+        return ", ".join(parts)
+
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar("db_query_stats", default=None)
+
+
+def current_stats() -> Optional[RequestQueryStats]:
+    return _current.get()
+
+
+def start_request_stats() -> RequestQueryStats:
+    stats = RequestQueryStats()
+    _current.set(stats)
+    return stats
+
+
+def caller_function(depth: int = 1) -> str:
+    """'modulo.funcion' del primer frame de servicio por encima del llamador."""
+    frame = sys._getframe(depth + 1)
+    for _ in range(_MAX_FRAMES):
+        if frame is None:
+            break
+        module = frame.f_globals.get("__name__", "")
+        if any(marker in module for marker in SERVICE_MODULE_MARKERS) and not module.startswith("common.db."):
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return UNATTRIBUTED
+
+
+def record_query(function: str, rows: int, seconds: float) -> None:
+    stats = _current.get()
+    if stats is not None:
+        stats.add(function, rows, seconds)
+
+
+def rls_user(raw_connection) -> Optional[int]:
+    """Usuario cuyo contexto RLS lleva la conexión psycopg (None = sin contexto)."""
+    state = getattr(raw_connection, RLS_STATE_ATTR, None)
+    return state[0] if state else None
+
+
+def literal_sql(cursor, sql: str, params) -> Optional[str]:
+    """SQL con los parámetros interpolados (binding del lado del cliente), o None."""
+    try:
+        return cursor.mogrify(sql, params) if params else sql
+    except Exception:
+        return None
+
+
+class QueryMetrics:
+    """execute_wrapper: mide cada sentencia de la conexión y la suma a la request en curso."""
+
+    def __init__(self, capture_slow: bool = True):
+        self.slow_seconds = threshold_seconds() if capture_slow else None
+
+    def __call__(self, execute, sql, params, many, context):
+        stats = _current.get()
+        if stats is None:
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            rows = max(getattr(context["cursor"], "rowcount", 0) or 0, 0)
+            function = caller_function()
+            stats.add(function, rows, elapsed)
+            if self.slow_seconds is not None and elapsed >= self.slow_seconds and not many:
+                self._slow(context["connection"], sql, params, elapsed, rows, function)
+
+    @staticmethod
+    def _slow(connection, sql, params, elapsed, rows, function):
+        from psycopg import ClientCursor
+
+        raw = connection.connection
+        # El SQL literal se compone aquí (necesita la conexión); el registro va a Redis
+        # y corre en segundo plano, sin sumar latencia a la request
+        submit_slow_query(
+            alias=connection.alias,
+            literal_sql=literal_sql(ClientCursor(raw), sql, params) if raw is not None else None,
+            sql=sql, seconds=elapsed, rows=rows, function=function, user_id=rls_user(raw),
+        )
+
+
+def install_query_metrics(capture_slow: bool = True) -> ExitStack:
+    """
+    Instala QueryMetrics en el primario y las réplicas; cerrar el ExitStack lo retira.
+    capture_slow=False solo mide (benchmarks: no encolan EXPLAIN ni llenan el log de lentas).
+    """
+    metrics = QueryMetrics(capture_slow)
+    stack = ExitStack()
+    for alias in (DEFAULT_DB_ALIAS, *replica_aliases()):
+        stack.enter_context(connections[alias].execute_wrapper(metrics))
+    return stack
+
+
+def endpoint_label(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "<unresolved>"
+    return match.route or match.view_name or "<unresolved>"
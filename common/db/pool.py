@@ -0,0 +1,92 @@
+# products-backend/common/db/pool.py
+from django.conf import settings
+from django.db import connections
+
+from common.application.db import _RESET_SQL, RLS_STATE_ATTR
+
+# ---------------------------------------------------------------------------
+# Pool de conexiones (psycopg_pool) con reset del contexto RLS
+# ---------------------------------------------------------------------------
+# Con DB_POOL=True cada alias de Postgres usa un psycopg_pool.ConnectionPool
+# (OPTIONS["pool"] de Django). Al devolver una conexión al pool se limpian
+# app.current_actor_id / app.current_company_id y el estado que recuerda RlsContext:
+# la próxima request que la tome nunca hereda el contexto de otro usuario.
+#
+# Métricas (registradas en /metrics vía el REGISTRY de prometheus_client):
+#   django_db_pool_connections_in_use{alias}          conexiones prestadas ahora
+#   django_db_pool_connections_idle{alias}            conexiones libres en el pool
+#   django_db_pool_requests_waiting{alias}            clientes esperando una conexión
+#   django_db_pool_checkouts_total{alias}             conexiones pedidas al pool
+#   django_db_pool_checkout_wait_seconds_total{alias} tiempo total esperando checkout
+#   django_db_pool_checkout_errors_total{alias}       checkouts fallidos (timeout)
+# Latencia media de checkout = rate(wait_seconds_total) / rate(checkouts_total).
+
+
+def reset_pooled_connection(conn) -> None:
+    """Hook 'reset' del pool: deja la conexión sin contexto RLS antes de volver a prestarla."""
+    conn.execute(_RESET_SQL)
+    if not conn.autocommit:
+        conn.commit()
+    setattr(conn, RLS_STATE_ATTR, None)
+
+
+def pooled_aliases():
+    return [alias for alias, cfg in settings.DATABASES.items() if cfg.get("OPTIONS", {}).get("pool")]
+
+
+def install_pool_reset() -> None:
+    """Agrega el hook de reset a OPTIONS["pool"] de cada alias (antes de que Django cree el pool)."""
+    for alias in pooled_aliases():
+        options = settings.DATABASES[alias]["OPTIONS"]
+        if options["pool"] is True:
+            options["pool"] = {}
+        options["pool"].setdefault("reset", reset_pooled_connection)
+
+
+class PoolCollector:
+    """Collector de prometheus_client: lee pool.get_stats() de cada alias en cada scrape."""
+
+    def collect(self):
+        from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+        in_use = GaugeMetricFamily("django_db_pool_connections_in_use",
+                                   "Conexiones del pool prestadas.", labels=["alias"])
+        idle = GaugeMetricFamily("django_db_pool_connections_idle",
+                                 "Conexiones libres en el pool.", labels=["alias"])
+        waiting = GaugeMetricFamily("django_db_pool_requests_waiting",
+                                    "Clientes esperando una conexión del pool.", labels=["alias"])
+        checkouts = CounterMetricFamily("django_db_pool_checkouts",
+                                        "Conexiones pedidas al pool.", labels=["alias"])
+        wait = CounterMetricFamily("django_db_pool_checkout_wait_seconds",
+                                   "Tiempo total esperando el checkout de una conexión.", labels=["alias"])
+        errors = CounterMetricFamily("django_db_pool_checkout_errors",
+                                     "Checkouts fallidos (timeout del pool).", labels=["alias"])
+
+        for alias in pooled_aliases():
+            # Solo pools ya creados: el scrape no debe abrir conexiones
+            pool = connections[alias]._connection_pools.get(alias)
+            if pool is None:
+                continue
+            stats = pool.get_stats()
+            size, available = stats.get("pool_size", 0), stats.get("pool_available", 0)
+            in_use.add_metric([alias], size - available)
+            idle.add_metric([alias], available)
+            waiting.add_metric([alias], stats.get("requests_waiting", 0))
+            checkouts.add_metric([alias], stats.get("requests_num", 0))
+            wait.add_metric([alias], stats.get("requests_wait_ms", 0) / 1000.0)
+            errors.add_metric([alias], stats.get("requests_errors", 0))
+
+        yield from (in_use, idle, waiting, checkouts, wait, errors)
+
+
+_collector = None
+
+
+def register_pool_metrics() -> None:
+    global _collector
+    if _collector is not None or not pooled_aliases():
+        return
+    from prometheus_client import REGISTRY
+
+    _collector = PoolCollector()
+    REGISTRY.register(_collector)
@@ -0,0 +1,109 @@
+# products-backend/common/db/query_registry.py
+import importlib
+import pkgutil
+import sys
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from django.apps import apps
+
+# ---------------------------------------------------------------------------
+# Registro de consultas de servicio con nombre
+# ---------------------------------------------------------------------------
+# Los servicios declaran su SQL directo como constantes de módulo; register_query()
+# las anota con un nombre estable y una función que arma parámetros de ejemplo a
+# partir de los datos de la base (Samples). El SQL se devuelve tal cual:
+#
+#   _SQL_CHILDREN = register_query(
+#       "ramos.tree.children", """SELECT ... WHERE parent_id = %s ...""",
+#       sample=lambda s: [s.scalar("SELECT parent_id FROM ramo.node WHERE parent_id IS NOT NULL LIMIT 1")],
+#   )
+#
+# Para SQL armado en tiempo de ejecución (filtros opcionales, keyset) se registra un
+# builder que devuelve (sql, params) con register_dynamic_query().
+#
+# `manage.py index_advisor` recorre el registro (ver common/db/index_advisor.py).
+
+
+class Samples:
+    """Valores de ejemplo leídos de la base, memoizados por consulta."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._cache: Dict[Tuple[str, Tuple], Any] = {}
+
+    def row(self, sql: str, params: Sequence[Any] = ()) -> Optional[Sequence[Any]]:
+        key = (sql, tuple(params))
+        if key not in self._cache:
+            self._cursor.execute(sql, list(params))
+            self._cache[key] = self._cursor.fetchone()
+        return self._cache[key]
+
+    def scalar(self, sql: str, params: Sequence[Any] = ()) -> Any:
+        """Primera columna de la primera fila; LookupError si la consulta no devuelve nada."""
+        row = self.row(sql, params)
+        if row is None:
+            raise LookupError(f"Sin datos de ejemplo para: {sql}")
+        value = row[0]
+        return str(value) if isinstance(value, uuid.UUID) else value
+
+
+@dataclass(frozen=True)
+class RegisteredQuery:
+    name: str
+    module: str
+    sql: Optional[str]
+    sample: Callable[[Samples], Any]
+    dynamic: bool = False
+
+    def bind(self, samples: Samples) -> Tuple[str, Any]:
+        """(sql, params) listos para ejecutar con los datos de ejemplo."""
+        if self.dynamic:
+            return self.sample(samples)
+        return self.sql, self.sample(samples)
+
+
+_REGISTRY: Dict[str, RegisteredQuery] = {}
+
+
+def _add(entry: RegisteredQuery) -> None:
+    existing = _REGISTRY.get(entry.name)
+    if existing is not None and existing.module != entry.module:
+        raise ValueError(f"Consulta '{entry.name}' ya registrada en {existing.module}.")
+    _REGISTRY[entry.name] = entry
+
+
+def register_query(name: str, sql: str, sample: Callable[[Samples], Any]) -> str:
+    """Registra 'sql' con nombre y parámetros de ejemplo; devuelve el SQL sin cambios."""
+    _add(RegisteredQuery(name=name, module=_caller_module(), sql=sql, sample=sample))
+    return sql
+
+
+def register_dynamic_query(name: str, build: Callable[[Samples], Tuple[str, Any]]) -> None:
+    """Registra SQL armado en runtime: 'build' devuelve (sql, params) con datos de ejemplo."""
+    _add(RegisteredQuery(name=name, module=_caller_module(), sql=None, sample=build, dynamic=True))
+
+
+def _caller_module() -> str:
+    return sys._getframe(2).f_globals.get("__name__", "")
+
+
+def registered_queries(prefix: Optional[str] = None) -> List[RegisteredQuery]:
+    """Consultas registradas (ordenadas por nombre), importando antes los servicios."""
+    autodiscover()
+    items = sorted(_REGISTRY.values(), key=lambda q: q.name)
+    if prefix:
+        items = [q for q in items if q.name.startswith(prefix)]
+    return items
+
+
+def autodiscover() -> None:
+    """Importa <app>.api.services.* de cada app instalada: ahí se registran las consultas."""
+    for config in apps.get_app_configs():
+        try:
+            package = importlib.import_module(f"{config.name}.api.services")
+        except ModuleNotFoundError:
+            continue
+        for info in pkgutil.iter_modules(package.__path__):
+            importlib.import_module(f"{package.__name__}.{info.name}")
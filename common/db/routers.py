@@ -1 +1,146 @@
-﻿# DB routers/signals (stub)
+﻿# common/db/routers.py
+import asyncio
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# ---------------------------------------------------------------------------
+# Réplicas de lectura
+# ---------------------------------------------------------------------------
+# Los servicios de solo lectura con SQL directo (árbol de ramos, comisiones, catálogo,
+# árbol del expediente) toman su conexión con read_connection(); el ORM pasa por
+# PrimaryReplicaRouter. Se lee del primario (default) cuando:
+#   - no hay réplicas configuradas (DB_REPLICA_URLS vacío);
+#   - no hay una request en curso (jobs RQ, comandos: escriben y fijan su contexto RLS
+#     solo en el primario);
+#   - la request escribe (método no seguro) o hay una transacción abierta en el primario;
+#   - el usuario escribió hace menos de DB_REPLICA_STICKY_SECONDS (read-your-writes:
+#     la réplica puede ir atrasada respecto de lo que acaba de confirmar).
+# Las escrituras y las llamadas que mutan el contexto RLS siempre van al primario.
+
+STICKY_CACHE_KEY = "db:sticky:u{user_id}"
+
+_routing: ContextVar[Optional["RequestRouting"]] = ContextVar("db_routing", default=None)
+
+
+def replica_aliases() -> List[str]:
+    return list(getattr(settings, "DATABASE_REPLICAS", ()))
+
+
+class RequestRouting:
+    """Decisión de enrutamiento de una request; el usuario se resuelve perezosamente (JWT en la vista)."""
+
+    def __init__(self, request):
+        self.request = request
+        self.pinned = request.method not in ("GET", "HEAD", "OPTIONS")
+        self._sticky_checked = False
+        self._sticky_lookup = None
+
+    def _user_id(self) -> Optional[int]:
+        user = getattr(self.request, "user", None)
+        return user.id if user is not None and user.is_authenticated else None
+
+    def use_primary(self) -> bool:
+        if self.pinned:
+            return True
+        if not self._sticky_checked:
+            user_id = self._user_id()
+            if user_id is not None:
+                # Una sola consulta a la caché por request, ya con el usuario autenticado
+                self._sticky_checked = True
+                self.pinned = bool(cache.get(STICKY_CACHE_KEY.format(user_id=user_id)))
+        return self.pinned
+
+    async def ause_primary(self) -> bool:
+        """use_primary() para vistas async: la consulta a la caché no bloquea el event loop."""
+        if self.pinned or self._sticky_checked:
+            return self.pinned
+        user_id = self._user_id()
+        if user_id is None:
+            return False
+        # Las consultas concurrentes de la request comparten una sola lectura a la caché
+        if self._sticky_lookup is None:
+            self._sticky_lookup = asyncio.ensure_future(cache.aget(STICKY_CACHE_KEY.format(user_id=user_id)))
+        sticky = await self._sticky_lookup
+        self._sticky_checked = True
+        self.pinned = self.pinned or bool(sticky)
+        return self.pinned
+
+    def mark_write(self) -> None:
+        """Tras una escritura confirmada: el usuario lee del primario por un rato."""
+        user_id = self._user_id()
+        if user_id is not None:
+            cache.set(STICKY_CACHE_KEY.format(user_id=user_id), 1, settings.DB_REPLICA_STICKY_SECONDS)
+
+
+@contextmanager
+def request_routing(request):
+    token = _routing.set(RequestRouting(request))
+    try:
+        yield _routing.get()
+    finally:
+        _routing.reset(token)
+
+
+@contextmanager
+def pin_primary():
+    """Fuerza lecturas al primario dentro del bloque (p.ej. leer justo después de escribir)."""
+    routing = _routing.get()
+    if routing is None:
+        yield
+        return
+    previous, routing.pinned = routing.pinned, True
+    try:
+        yield
+    finally:
+        routing.pinned = previous
+
+
+def read_alias() -> str:
+    replicas = replica_aliases()
+    routing = _routing.get()
+    if not replicas or routing is None or routing.use_primary():
+        return DEFAULT_DB_ALIAS
+    if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return DEFAULT_DB_ALIAS
+    return random.choice(replicas)
+
+
+async def aread_alias() -> str:
+    replicas = replica_aliases()
+    routing = _routing.get()
+    if not replicas or routing is None or await routing.ause_primary():
+        return DEFAULT_DB_ALIAS
+    return random.choice(replicas)
+
+
+def read_connection():
+    """Conexión para SQL de solo lectura: una réplica si corresponde, si no el primario."""
+    return connections[read_alias()]
+
+
+class PrimaryReplicaRouter:
+    """Router del ORM: lecturas según read_alias(), escrituras y migraciones en el primario."""
+
+    def db_for_read(self, model, **hints):
+        return read_alias()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplicas y primario tienen los mismos datos
+        dbs = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if obj1._state.db in dbs and obj2._state.db in dbs:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replica_aliases():
+            return False
+        return None
@@ -0,0 +1,244 @@
+# products-backend/common/db/slow_queries.py
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import django_rq
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from prometheus_client import Counter
+
+from common.application.db import set_db_context_for_user
+
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------------------------
+# Captura de consultas lentas con EXPLAIN (ANALYZE, BUFFERS) muestreado
+# ---------------------------------------------------------------------------
+# QueryMetrics (common/db/instrumentation.py) y common.db.aio avisan con
+# capture_slow_query() cuando una sentencia supera DB_SLOW_QUERY_MS. Aquí:
+#   1) se normaliza el SQL (literales y placeholders → ?, listas IN colapsadas) y se
+#      calcula su fingerprint: el mismo SQL con otros parámetros cae en el mismo grupo;
+#   2) se muestrea (DB_SLOW_QUERY_SAMPLE_RATE) y, como mucho una vez por fingerprint
+#      cada DB_SLOW_QUERY_EXPLAIN_INTERVAL segundos, se encola en RQ un EXPLAIN
+#      (ANALYZE, BUFFERS) del SQL con sus parámetros literales;
+#   3) el job lo ejecuta en la conexión del worker, en una transacción READ ONLY con
+#      statement_timeout y el contexto RLS del usuario original, y hace rollback;
+#   4) el resultado va a un ring buffer en Redis (LPUSH + LTRIM) que leen el endpoint
+#      /api/admin/db/slow-queries/ y el comando `manage.py slow_queries`.
+#
+# Los pasos 1-2 (cache.add, LPUSH y el enqueue RQ van a Redis) corren fuera de la
+# request: submit_slow_query() los pasa a un hilo de fondo; si se acumulan más de
+# _MAX_PENDING se descartan (cuentan en django_db_slow_queries_dropped_total).
+#
+# Solo se explican SELECT / WITH: ANALYZE ejecuta la sentencia, y la transacción
+# READ ONLY rechaza cualquier escritura que se cuele (queda como plan_error).
+
+SLOW_QUERIES = Counter(
+    "django_db_slow_queries_total", "Sentencias por encima de DB_SLOW_QUERY_MS.", ["function"])
+SLOW_QUERIES_DROPPED = Counter(
+    "django_db_slow_queries_dropped_total", "Consultas lentas no registradas por cola de fondo llena.")
+
+RING_KEY = "db:slowq:ring"
+_EXPLAIN_LOCK_KEY = "db:slowq:explain:{fingerprint}"
+EXPLAIN_QUEUE = "low"
+_MAX_SQL_CHARS = 20_000
+
+_RE_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_RE_STRING = re.compile(r"(?:E|e)?'(?:[^']|'')*'")
+_RE_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+")
+_RE_NUMBER = re.compile(r"(?<![\w.\"])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_RE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_RE_ARRAY = re.compile(r"ARRAY\s*\[\s*\?(?:\s*,\s*\?)*\s*\]", re.I)
+_RE_SPACES = re.compile(r"\s+")
+_RE_EXPLAINABLE = re.compile(r"^\s*(?:\(\s*)*(SELECT|WITH)\b", re.I)
+
+
+def normalize_sql(sql: str) -> str:
+    """SQL sin literales ni parámetros, para agrupar ejecuciones de la misma consulta."""
+    s = _RE_COMMENT.sub(" ", sql)
+    s = _RE_STRING.sub("?", s)
+    s = _RE_PLACEHOLDER.sub("?", s)
+    s = _RE_NUMBER.sub("?", s)
+    s = _RE_LIST.sub("(...)", s)
+    s = _RE_ARRAY.sub("ARRAY[...]", s)
+    return _RE_SPACES.sub(" ", s).strip()
+
+
+def fingerprint(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def is_explainable(sql: str) -> bool:
+    return bool(_RE_EXPLAINABLE.match(sql))
+
+
+def threshold_seconds() -> Optional[float]:
+    """Umbral de consulta lenta; None si la captura está apagada (DB_SLOW_QUERY_MS=0)."""
+    ms = settings.DB_SLOW_QUERY_MS
+    return ms / 1000.0 if ms > 0 else None
+
+
+def capture_slow_query(*, alias: str, literal_sql: Optional[str], sql: str, seconds: float,
+                       rows: int, function: str, user_id: Optional[int]) -> None:
+    """
+    Registra una sentencia lenta. 'literal_sql' es el SQL con los parámetros ya
+    interpolados (mogrify) o None si no se pudo componer.
+    Nunca propaga errores: un Redis caído no debe romper la request.
+    """
+    SLOW_QUERIES.labels(function).inc()
+    if random.random() >= settings.DB_SLOW_QUERY_SAMPLE_RATE:
+        return
+
+    normalized = normalize_sql(sql)
+    entry = {
+        "fingerprint": fingerprint(normalized),
+        "query": normalized[:_MAX_SQL_CHARS],
+        "sql": (literal_sql or sql)[:_MAX_SQL_CHARS],
+        "ms": round(seconds * 1000, 2),
+        "rows": rows,
+        "function": function,
+        "alias": alias,
+        "user_id": user_id,
+        "at": datetime.now(timezone.utc).isoformat(),
+        "plan": None,
+        "plan_error": None,
+    }
+    try:
+        if literal_sql and settings.DB_SLOW_QUERY_EXPLAIN and is_explainable(sql) and _claim_explain(entry):
+            django_rq.get_queue(EXPLAIN_QUEUE).enqueue(
+                explain_slow_query_job, entry, job_timeout=settings.DB_SLOW_QUERY_EXPLAIN_TIMEOUT_MS // 1000 + 30,
+            )
+        else:
+            push_entry(entry)
+    except Exception:
+        logger.warning("No se pudo registrar la consulta lenta %s", entry["fingerprint"], exc_info=True)
+
+
+_MAX_PENDING = 100
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-queries")
+_pending = threading.BoundedSemaphore(_MAX_PENDING)
+
+
+def submit_slow_query(**kwargs) -> None:
+    """capture_slow_query(**kwargs) en el hilo de fondo; no bloquea ni propaga errores."""
+    if not _pending.acquire(blocking=False):
+        SLOW_QUERIES_DROPPED.inc()
+        return
+    try:
+        _executor.submit(_capture_and_release, kwargs)
+    except RuntimeError:
+        # Executor cerrado (apagado del intérprete)
+        _pending.release()
+
+
+def _capture_and_release(kwargs: Dict[str, Any]) -> None:
+    try:
+        capture_slow_query(**kwargs)
+    finally:
+        _pending.release()
+
+
+def _claim_explain(entry: Dict[str, Any]) -> bool:
+    """Un EXPLAIN por fingerprint y ventana: cache.add es atómico entre workers."""
+    key = _EXPLAIN_LOCK_KEY.format(fingerprint=entry["fingerprint"])
+    return cache.add(key, 1, timeout=settings.DB_SLOW_QUERY_EXPLAIN_INTERVAL)
+
+
+def explain_slow_query_job(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Job RQ: EXPLAIN (ANALYZE, BUFFERS) del SQL literal en una transacción READ ONLY y rollback."""
+    alias = entry["alias"]
+    try:
+        with transaction.atomic(using=alias):
+            with connections[alias].cursor() as cur:
+                cur.execute("SET TRANSACTION READ ONLY")
+                cur.execute("SELECT set_config('statement_timeout', %s, true)",
+                            [str(settings.DB_SLOW_QUERY_EXPLAIN_TIMEOUT_MS)])
+            if entry["user_id"] is not None:
+                set_db_context_for_user(entry["user_id"], using=alias)
+            with connections[alias].cursor() as cur:
+                # SQL ya literal: sin parámetros, los '%' no se interpretan
+                cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + entry["sql"])
+                plan = cur.fetchone()[0]
+            # ANALYZE ejecuta la consulta: nada de lo que haga debe quedar
+            transaction.set_rollback(True, using=alias)
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        entry["plan"] = plan[0] if isinstance(plan, list) and plan else plan
+    except Exception as e:
+        entry["plan_error"] = f"{type(e).__name__}: {e}"[:2000]
+    entry["explained_at"] = datetime.now(timezone.utc).isoformat()
+    push_entry(entry)
+    return {"fingerprint": entry["fingerprint"], "explained": entry["plan"] is not None}
+
+
+def _redis():
+    from django_redis import get_redis_connection
+
+    return get_redis_connection("default")
+
+
+def push_entry(entry: Dict[str, Any]) -> None:
+    pipe = _redis().pipeline()
+    pipe.lpush(RING_KEY, json.dumps(entry, ensure_ascii=False, default=str))
+    pipe.ltrim(RING_KEY, 0, settings.DB_SLOW_QUERY_BUFFER_SIZE - 1)
+    pipe.execute()
+
+
+def recent_entries(limit: int = 50, fingerprint_: Optional[str] = None,
+                   with_plan: bool = False) -> List[Dict[str, Any]]:
+    """Entradas más recientes primero (filtrables por fingerprint o solo con plan)."""
+    raw = _redis().lrange(RING_KEY, 0, settings.DB_SLOW_QUERY_BUFFER_SIZE - 1)
+    items = []
+    for value in raw:
+        entry = json.loads(value)
+        if fingerprint_ and entry["fingerprint"] != fingerprint_:
+            continue
+        if with_plan and entry.get("plan") is None:
+            continue
+        items.append(entry)
+        if len(items) >= limit:
+            break
+    return items
+
+
+def summarize(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Agrupa por fingerprint: veces vista, ms máximo/medio y la última entrada con plan."""
+    groups: Dict[str, Dict[str, Any]] = {}
+    for entry in entries:
+        g = groups.get(entry["fingerprint"])
+        if g is None:
+            g = groups[entry["fingerprint"]] = {
+                "fingerprint": entry["fingerprint"],
+                "query": entry["query"],
+                "function": entry["function"],
+                "count": 0,
+                "max_ms": 0.0,
+                "total_ms": 0.0,
+                "last_at": entry["at"],
+                "plan": None,
+            }
+        g["count"] += 1
+        g["total_ms"] += entry["ms"]
+        g["max_ms"] = max(g["max_ms"], entry["ms"])
+        if g["plan"] is None and entry.get("plan") is not None:
+            g["plan"] = entry["plan"]
+    out = []
+    for g in groups.values():
+        g["avg_ms"] = round(g.pop("total_ms") / g["count"], 2)
+        out.append(g)
+    return sorted(out, key=lambda g: g["max_ms"], reverse=True)
+
+
+def clear_entries() -> int:
+    r = _redis()
+    n = r.llen(RING_KEY)
+    r.delete(RING_KEY)
+    return n
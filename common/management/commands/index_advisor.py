@@ -0,0 +1,128 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, transaction
+
+from common.application.db import set_db_context_for_user
+from common.db.index_advisor import analyze_plan, existing_indexes, is_covered
+from common.db.query_registry import Samples, registered_queries
+
+
+class Command(BaseCommand):
+    help = (
+        "Ejecuta con EXPLAIN (ANALYZE, BUFFERS) las consultas registradas de los servicios "
+        "(common.db.query_registry) y reporta seq scans, sorts a disco e índices faltantes. "
+        "Pensado para correr contra una base con datos sintéticos antes de desplegar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--prefix", help="Solo consultas cuyo nombre empieza así (p.ej. 'ramos.tree').")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument("--user-id", type=int, help="Ejecutar con el contexto RLS de este usuario.")
+        parser.add_argument("--min-rows", type=int, default=1000,
+                            help="Filas examinadas a partir de las que un Seq Scan se reporta (default 1000).")
+        parser.add_argument("--timeout-ms", type=int, default=10000, help="statement_timeout por consulta.")
+        parser.add_argument("--list", action="store_true", help="Solo listar las consultas registradas.")
+        parser.add_argument("--json", action="store_true", help="Salida JSON.")
+        parser.add_argument("--fail-on-findings", action="store_true",
+                            help="Terminar con error si hay hallazgos o índices propuestos (CI).")
+
+    def handle(self, *args, **opts):
+        queries = registered_queries(opts["prefix"])
+        if opts["list"]:
+            for q in queries:
+                self.stdout.write(f"{q.name:45} {q.module}")
+            return
+        if not queries:
+            raise CommandError("No hay consultas registradas con ese prefijo.")
+
+        connection = connections[opts["database"]]
+        if opts["user_id"] is not None:
+            set_db_context_for_user(opts["user_id"], using=connection.alias)
+        with connection.cursor() as cur:
+            samples = Samples(cur)
+            results = [self._explain(connection, cur, samples, q, opts) for q in queries]
+
+            proposals = {}
+            for result in results:
+                for finding in result.get("findings", []):
+                    if finding["proposal"]:
+                        proposals.setdefault(finding["proposal"].sql(), finding["proposal"])
+            indexes = existing_indexes(cur, sorted({p.table for p in proposals.values()})) if proposals else {}
+
+        missing = [p for p in proposals.values() if not is_covered(p, indexes)]
+        if opts["json"]:
+            self._write_json(results, missing)
+        else:
+            self._write_text(results, missing)
+
+        if opts["fail_on_findings"] and (missing or any(r.get("findings") for r in results)):
+            raise CommandError("El index advisor encontró planes a revisar.")
+
+    def _explain(self, connection, cur, samples, query, opts):
+        result = {"name": query.name, "module": query.module}
+        try:
+            sql, params = query.bind(samples)
+        except (LookupError, DatabaseError) as e:
+            result["skipped"] = str(e).strip()
+            return result
+
+        try:
+            with transaction.atomic(using=connection.alias):
+                cur.execute("SET TRANSACTION READ ONLY")
+                cur.execute("SELECT set_config('statement_timeout', %s, true)", [str(opts["timeout_ms"])])
+                cur.execute("EXPLAIN (ANALYZE, BUFFERS, VERBOSE, FORMAT JSON) " + sql, params)
+                plan = cur.fetchone()[0]
+                # ANALYZE ejecuta la consulta: nada de lo que haga debe quedar
+                transaction.set_rollback(True, using=connection.alias)
+        except DatabaseError as e:
+            result["error"] = str(e).strip()
+            return result
+
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        report = analyze_plan(plan, min_rows=opts["min_rows"])
+        result.update({
+            "execution_ms": report.execution_ms,
+            "shared_hit": report.shared_hit,
+            "shared_read": report.shared_read,
+            "temp_written": report.temp_written,
+            "findings": [
+                {"kind": f.kind, "table": f.table, "detail": f.detail, "proposal": f.proposal}
+                for f in report.findings
+            ],
+        })
+        return result
+
+    def _write_text(self, results, missing):
+        for r in results:
+            if "skipped" in r:
+                self.stdout.write(f"{r['name']:45} omitida: {r['skipped']}")
+                continue
+            if "error" in r:
+                self.stdout.write(self.style.ERROR(f"{r['name']:45} error: {r['error']}"))
+                continue
+            head = (f"{r['name']:45} {r['execution_ms']:.2f} ms  "
+                    f"hit {r['shared_hit']} / read {r['shared_read']} / temp {r['temp_written']}")
+            self.stdout.write(self.style.WARNING(head) if r["findings"] else head)
+            for f in r["findings"]:
+                self.stdout.write(f"    ! {f['kind']}: {f['detail']}")
+                if f["proposal"]:
+                    self.stdout.write(f"      → {f['proposal'].sql()}")
+
+        if missing:
+            self.stdout.write(self.style.WARNING("\nÍndices propuestos (no cubiertos por índices existentes):"))
+            for p in missing:
+                self.stdout.write(f"  {p.sql()}")
+            self.stdout.write("Revisar y versionar como RunSQL en common/migrations (atomic = False).")
+        else:
+            self.stdout.write(self.style.SUCCESS("\nSin índices faltantes."))
+
+    def _write_json(self, results, missing):
+        for r in results:
+            for f in r.get("findings", []):
+                f["proposal"] = f["proposal"].sql() if f["proposal"] else None
+        self.stdout.write(json.dumps(
+            {"queries": results, "missing_indexes": [p.sql() for p in missing]},
+            ensure_ascii=False, indent=2, default=str,
+        ))
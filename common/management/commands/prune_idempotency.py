@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from common.application.idempotency import IDEMPOTENCY_RETENTION_DAYS, prune_idempotency
+
+
+class Command(BaseCommand):
+    help = "Borra de common.idempotency los resultados más antiguos que la retención (por lotes)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=IDEMPOTENCY_RETENTION_DAYS,
+                            help=f"Días de retención (default {IDEMPOTENCY_RETENTION_DAYS}).")
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **opts):
+        deleted = prune_idempotency(retention_days=opts["days"], batch_size=opts["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"{deleted} filas borradas."))
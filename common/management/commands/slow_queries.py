@@ -0,0 +1,54 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from common.db.slow_queries import clear_entries, recent_entries, summarize
+
+
+class Command(BaseCommand):
+    help = "Muestra las consultas lentas capturadas (ring buffer de common.db.slow_queries)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=50)
+        parser.add_argument("--fingerprint", help="Solo las entradas de este fingerprint.")
+        parser.add_argument("--with-plan", action="store_true", help="Solo entradas con EXPLAIN capturado.")
+        parser.add_argument("--summary", action="store_true", help="Agrupar por fingerprint.")
+        parser.add_argument("--plan", action="store_true", help="Imprimir el plan (JSON) de cada entrada.")
+        parser.add_argument("--json", action="store_true", help="Salida JSON cruda.")
+        parser.add_argument("--clear", action="store_true", help="Vaciar el ring buffer.")
+
+    def handle(self, *args, **opts):
+        if opts["clear"]:
+            self.stdout.write(self.style.SUCCESS(f"{clear_entries()} entradas borradas."))
+            return
+
+        entries = recent_entries(limit=opts["limit"], fingerprint_=opts["fingerprint"],
+                                 with_plan=opts["with_plan"])
+        items = summarize(entries) if opts["summary"] else entries
+        if opts["json"]:
+            self.stdout.write(json.dumps(items, ensure_ascii=False, indent=2, default=str))
+            return
+        if not items:
+            self.stdout.write("Sin consultas lentas registradas.")
+            return
+
+        for item in items:
+            if opts["summary"]:
+                head = (f"{item['fingerprint']}  x{item['count']}  max {item['max_ms']} ms  "
+                        f"avg {item['avg_ms']} ms  {item['function']}")
+            else:
+                head = (f"{item['at']}  {item['fingerprint']}  {item['ms']} ms  {item['rows']} filas  "
+                        f"{item['function']} [{item['alias']}]")
+            self.stdout.write(self.style.WARNING(head))
+            self.stdout.write(f"  {item['query'][:500]}")
+            plan = item.get("plan")
+            if plan is not None:
+                top = plan.get("Plan", {})
+                self.stdout.write(
+                    f"  plan: {top.get('Node Type')}  exec {plan.get('Execution Time')} ms  "
+                    f"shared hit/read {top.get('Shared Hit Blocks')}/{top.get('Shared Read Blocks')}"
+                )
+                if opts["plan"]:
+                    self.stdout.write(json.dumps(plan, ensure_ascii=False, indent=2))
+            elif item.get("plan_error"):
+                self.stdout.write(f"  plan_error: {item['plan_error']}")
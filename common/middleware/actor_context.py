@@ -1,17 +1,79 @@
 ﻿# common/middleware/actor_context.py
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.conf import settings
-from django.db import connection
-from django.utils.deprecation import MiddlewareMixin
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from common.application.db import RLS_REQUEST_ATTR, RlsContext
+from common.db.routers import replica_aliases
+from security.infrastructure.actor_cache import CLAIM_ACTOR_ID, CLAIM_COMPANY_ID, get_actor_context
+
+# Rutas de infraestructura: no necesitan actor ni contexto RLS
+EXEMPT_PATH_PREFIXES = ("/metrics", "/health", "/static/", "/media/")
 
 
-class ActorContextMiddleware(MiddlewareMixin):
+class ActorContextMiddleware:
     header_actor = "HTTP_X_ACTOR_ID"
     header_company = "HTTP_X_COMPANY_ID"
 
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.process_request(request)
+        if request.path.startswith(EXEMPT_PATH_PREFIXES):
+            return self.get_response(request)
+
+        with self._install_rls(request):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        # Sin sesión Django (JWT) process_request no hace I/O
+        if request.path.startswith(EXEMPT_PATH_PREFIXES) or self._bearer_claims(request) is not None:
+            self.process_request(request)
+        else:
+            await sync_to_async(self.process_request)(request)
+        if request.path.startswith(EXEMPT_PATH_PREFIXES):
+            return await self.get_response(request)
+
+        # Las vistas sync corren en el hilo de la request (ThreadSensitiveContext de
+        # Django): el wrapper se instala y se retira en ese mismo hilo.
+        stack = await sync_to_async(self._install_rls)(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+
+    @staticmethod
+    def _install_rls(request) -> ExitStack:
+        # Contexto RLS perezoso: se aplica con la primera sentencia SQL de la request
+        # (y solo si la conexión no lo carga ya para el mismo usuario).
+        # Las réplicas de lectura reciben el mismo contexto que el primario.
+        # Las vistas async (common/db/aio.py) aplican el contexto en sus propias conexiones.
+        rls = RlsContext(request)
+        setattr(request, RLS_REQUEST_ATTR, rls)
+        stack = ExitStack()
+        for alias in (DEFAULT_DB_ALIAS, *replica_aliases()):
+            stack.enter_context(connections[alias].execute_wrapper(rls))
+        return stack
+
     def process_request(self, request):
         request.actor_id = None
         request.company_id = None
 
+        if request.path.startswith(EXEMPT_PATH_PREFIXES):
+            return None
+
         # 0) Headers de prueba solo en DEBUG
         if getattr(settings, "DEBUG", False):
             aid = request.META.get(self.header_actor)
@@ -21,29 +83,33 @@ class ActorContextMiddleware(MiddlewareMixin):
             if cid:
                 request.company_id = cid
 
-        # 1) Si el usuario está autenticado: setear contexto RLS y resolver actor/company
+        # 1) JWT: actor/company vienen firmados en el token (sin SQL).
+        #    El usuario lo autentica DRF en la vista; RlsContext lo toma de request.user.
+        claims = self._bearer_claims(request)
+        if claims is not None:
+            request.actor_id = claims.get(CLAIM_ACTOR_ID) or request.actor_id
+            request.company_id = claims.get(CLAIM_COMPANY_ID) or request.company_id
+            return None
+
+        # 2) Sesión Django: actor/company desde caché por usuario
         user = getattr(request, "user", None)
         if not (user and user.is_authenticated):
             return None
 
-        with connection.cursor() as cur:
-            # Cargar contexto de sesión para RLS/funciones
-            cur.execute('SELECT "security".set_context_from_user(%s)', [user.id])
-
-            # Resolver actor y compañía en un solo roundtrip
-            cur.execute(
-                """
-                SELECT a.id::text, a.company_id::text
-                FROM "security".user_link ul
-                JOIN "security".actor a ON a.id = ul.actor_id
-                WHERE ul.user_id = %s
-                LIMIT 1
-            """,
-                [user.id],
-            )
-            row = cur.fetchone()
-
-        if row:
-            request.actor_id, request.company_id = row[0], row[1]
+        actor_id, company_id = get_actor_context(user.id)
+        if actor_id:
+            request.actor_id, request.company_id = actor_id, company_id
 
         return None
+
+    @staticmethod
+    def _bearer_claims(request):
+        auth = request.META.get("HTTP_AUTHORIZATION", "")
+        parts = auth.split()
+        if len(parts) != 2 or parts[0] not in settings.SIMPLE_JWT.get("AUTH_HEADER_TYPES", ("Bearer",)):
+            return None
+        try:
+            return AccessToken(parts[1])
+        except TokenError:
+            # Token inválido/expirado: DRF responderá 401 en la vista
+            return None
@@ -0,0 +1,56 @@
+# common/middleware/db_metrics.py
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+
+from common.db.instrumentation import endpoint_label, install_query_metrics, start_request_stats
+from common.middleware.actor_context import EXEMPT_PATH_PREFIXES
+
+
+class QueryMetricsMiddleware:
+    """
+    Mide el SQL de cada request (ver common/db/instrumentation.py) y lo exporta a Prometheus
+    por endpoint. Con DB_SERVER_TIMING (por defecto en DEBUG) agrega el header Server-Timing.
+    Va antes de ActorContextMiddleware: su wrapper envuelve al de RLS y mide también ese roundtrip.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if request.path.startswith(EXEMPT_PATH_PREFIXES):
+            return self.get_response(request)
+
+        stats = start_request_stats()
+        with install_query_metrics():
+            response = self.get_response(request)
+        return self._finish(request, response, stats)
+
+    async def __acall__(self, request):
+        if request.path.startswith(EXEMPT_PATH_PREFIXES):
+            return await self.get_response(request)
+
+        stats = start_request_stats()
+        # Igual que ActorContextMiddleware: el wrapper vive en el hilo de la request
+        stack = await sync_to_async(install_query_metrics)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self._finish(request, response, stats)
+
+    @staticmethod
+    def _finish(request, response, stats):
+        stats.observe(endpoint_label(request))
+        if settings.DB_SERVER_TIMING:
+            timing = stats.server_timing()
+            if response.has_header("Server-Timing"):
+                timing = f'{response["Server-Timing"]}, {timing}'
+            response["Server-Timing"] = timing
+        return response
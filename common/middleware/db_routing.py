@@ -0,0 +1,45 @@
+# common/middleware/db_routing.py
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
+from common.db.routers import replica_aliases, request_routing
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Abre el contexto de enrutamiento a réplicas de la request (ver common/db/routers.py).
+    Si la request escribió con éxito, marca al usuario para leer del primario
+    durante DB_REPLICA_STICKY_SECONDS (read-your-writes).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not replica_aliases():
+            return self.get_response(request)
+
+        with request_routing(request) as routing:
+            writes = routing.pinned
+            response = self.get_response(request)
+            if writes and response.status_code < 400:
+                routing.mark_write()
+        return response
+
+    async def __acall__(self, request):
+        if not replica_aliases():
+            return await self.get_response(request)
+
+        # El ContextVar se copia al hilo de las vistas sync y a las tareas de asyncio.gather
+        with request_routing(request) as routing:
+            writes = routing.pinned
+            response = await self.get_response(request)
+            if writes and response.status_code < 400:
+                await sync_to_async(routing.mark_write)()
+        return response
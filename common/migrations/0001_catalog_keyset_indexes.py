@@ -0,0 +1,33 @@
+# DDL de soporte para consultas SQL directas.
+# Los esquemas (catalog, core, link, workflow, ...) no los gestiona el ORM
+# (MIGRATION_MODULES = None en la mayoría de apps), así que los índices que
+# necesitan los servicios se versionan aquí como RunSQL.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY no puede ir dentro de una transacción
+    atomic = False
+
+    dependencies = []
+
+    operations = [
+        # Keyset (ord, name, id) para /api/catalog/items/?type=...
+        migrations.RunSQL(
+            sql="""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS item_type_ord_name_id_idx
+                ON catalog.item (item_type, (COALESCE((attrs->>'ord')::int, 999)), name, id);
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS catalog.item_type_ord_name_id_idx;",
+        ),
+        # Keyset (ord, name, id) para /api/catalog/items/?parent_id=...
+        migrations.RunSQL(
+            sql="""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS item_parent_ord_name_id_idx
+                ON catalog.item (parent_id, (COALESCE((attrs->>'ord')::int, 999)), name, id);
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS catalog.item_parent_ord_name_id_idx;",
+        ),
+    ]
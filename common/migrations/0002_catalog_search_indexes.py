@@ -0,0 +1,50 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("common", "0001_catalog_keyset_indexes"),
+    ]
+
+    operations = [
+        # unaccent() es STABLE; el wrapper IMMUTABLE (diccionario fijo) permite indexarlo.
+        migrations.RunSQL(
+            sql="""
+            CREATE EXTENSION IF NOT EXISTS unaccent;
+            CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+            CREATE OR REPLACE FUNCTION catalog.f_unaccent(text)
+              RETURNS text
+              LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+            AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$;
+            """,
+            reverse_sql="DROP FUNCTION IF EXISTS catalog.f_unaccent(text);",
+        ),
+        # Prefijo de code (LIKE 'abc%')
+        migrations.RunSQL(
+            sql="""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS item_code_lower_prefix_idx
+                ON catalog.item (lower(code) text_pattern_ops);
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS catalog.item_code_lower_prefix_idx;",
+        ),
+        # Prefijo de name normalizado
+        migrations.RunSQL(
+            sql="""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS item_name_norm_prefix_idx
+                ON catalog.item (catalog.f_unaccent(lower(name)) text_pattern_ops);
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS catalog.item_name_norm_prefix_idx;",
+        ),
+        # Subcadena / similitud de name normalizado
+        migrations.RunSQL(
+            sql="""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS item_name_norm_trgm_idx
+                ON catalog.item USING gin (catalog.f_unaccent(lower(name)) gin_trgm_ops);
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS catalog.item_name_norm_trgm_idx;",
+        ),
+    ]
@@ -0,0 +1,29 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("common", "0002_catalog_search_indexes"),
+    ]
+
+    operations = [
+        # Timeline keyset: (case_id, created_at DESC, id DESC)
+        migrations.RunSQL(
+            sql="""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS receipt_case_created_id_idx
+                ON workflow.receipt (case_id, created_at DESC, id DESC);
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS workflow.receipt_case_created_id_idx;",
+        ),
+        # Casos de un expediente
+        migrations.RunSQL(
+            sql="""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS case_product_case_idx
+                ON workflow."case" (product_case_id);
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS workflow.case_product_case_idx;",
+        ),
+    ]
@@ -0,0 +1,91 @@
+from django.db import migrations
+
+# Notifica por 'expediente_tree_changed' el product_case_id afectado por cualquier
+# escritura que cambie el árbol del expediente. Lo consume
+# `manage.py listen_case_tree_changes` para invalidar la caché.
+# pg_notify deduplica payloads idénticos dentro de una misma transacción.
+
+FORWARD = """
+CREATE OR REPLACE FUNCTION workflow.notify_case_tree_changed() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+  r record := COALESCE(NEW, OLD);
+  pc uuid;
+BEGIN
+  IF TG_TABLE_SCHEMA = 'workflow' AND TG_TABLE_NAME = 'receipt' THEN
+    FOR pc IN SELECT wc.product_case_id FROM workflow."case" wc WHERE wc.id = r.case_id LOOP
+      PERFORM pg_notify('expediente_tree_changed', pc::text);
+    END LOOP;
+
+  ELSIF TG_TABLE_SCHEMA = 'link' THEN
+    FOR pc IN
+      SELECT pc2.id
+        FROM core.version_product v
+        JOIN core.product_case pc2 ON pc2.product_id = v.idproduct
+       WHERE v.id = r.idversionproduct
+    LOOP
+      PERFORM pg_notify('expediente_tree_changed', pc::text);
+    END LOOP;
+
+  ELSIF TG_TABLE_SCHEMA = 'core' AND TG_TABLE_NAME = 'documento' THEN
+    FOR pc IN
+      SELECT DISTINCT pc2.id
+        FROM (
+          SELECT l.idversionproduct FROM core.cg x JOIN link.vp_to_cg l ON l.idcg = x.id WHERE x.documento_id = r.id
+          UNION
+          SELECT l.idversionproduct FROM core.cp x JOIN link.vp_to_cp l ON l.idcp = x.id WHERE x.documento_id = r.id
+          UNION
+          SELECT l.idversionproduct FROM core.annex x JOIN link.vp_to_annex l ON l.idannex = x.id WHERE x.documento_id = r.id
+          UNION
+          SELECT l.idversionproduct FROM core.format x JOIN link.vp_to_format l ON l.idformat = x.id WHERE x.documento_id = r.id
+        ) vps
+        JOIN core.version_product v ON v.id = vps.idversionproduct
+        JOIN core.product_case pc2 ON pc2.product_id = v.idproduct
+    LOOP
+      PERFORM pg_notify('expediente_tree_changed', pc::text);
+    END LOOP;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS case_tree_changed ON link.vp_to_cg;
+CREATE TRIGGER case_tree_changed AFTER INSERT OR UPDATE OR DELETE ON link.vp_to_cg
+  FOR EACH ROW EXECUTE FUNCTION workflow.notify_case_tree_changed();
+DROP TRIGGER IF EXISTS case_tree_changed ON link.vp_to_cp;
+CREATE TRIGGER case_tree_changed AFTER INSERT OR UPDATE OR DELETE ON link.vp_to_cp
+  FOR EACH ROW EXECUTE FUNCTION workflow.notify_case_tree_changed();
+DROP TRIGGER IF EXISTS case_tree_changed ON link.vp_to_annex;
+CREATE TRIGGER case_tree_changed AFTER INSERT OR UPDATE OR DELETE ON link.vp_to_annex
+  FOR EACH ROW EXECUTE FUNCTION workflow.notify_case_tree_changed();
+DROP TRIGGER IF EXISTS case_tree_changed ON link.vp_to_format;
+CREATE TRIGGER case_tree_changed AFTER INSERT OR UPDATE OR DELETE ON link.vp_to_format
+  FOR EACH ROW EXECUTE FUNCTION workflow.notify_case_tree_changed();
+DROP TRIGGER IF EXISTS case_tree_changed ON core.documento;
+CREATE TRIGGER case_tree_changed AFTER UPDATE OR DELETE ON core.documento
+  FOR EACH ROW EXECUTE FUNCTION workflow.notify_case_tree_changed();
+DROP TRIGGER IF EXISTS case_tree_changed ON workflow.receipt;
+CREATE TRIGGER case_tree_changed AFTER INSERT OR UPDATE OR DELETE ON workflow.receipt
+  FOR EACH ROW EXECUTE FUNCTION workflow.notify_case_tree_changed();
+"""
+
+REVERSE = """
+DROP TRIGGER IF EXISTS case_tree_changed ON link.vp_to_cg;
+DROP TRIGGER IF EXISTS case_tree_changed ON link.vp_to_cp;
+DROP TRIGGER IF EXISTS case_tree_changed ON link.vp_to_annex;
+DROP TRIGGER IF EXISTS case_tree_changed ON link.vp_to_format;
+DROP TRIGGER IF EXISTS case_tree_changed ON core.documento;
+DROP TRIGGER IF EXISTS case_tree_changed ON workflow.receipt;
+DROP FUNCTION IF EXISTS workflow.notify_case_tree_changed();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0003_workflow_timeline_indexes"),
+    ]
+
+    operations = [
+        migrations.RunSQL(sql=FORWARD, reverse_sql=REVERSE),
+    ]
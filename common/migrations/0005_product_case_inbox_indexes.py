@@ -0,0 +1,54 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("common", "0004_case_tree_notify_triggers"),
+    ]
+
+    operations = [
+        # Bandeja sin filtros: keyset (created_at DESC, id DESC)
+        migrations.RunSQL(
+            sql="""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS product_case_created_id_idx
+                ON core.product_case (created_at DESC, id DESC);
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS core.product_case_created_id_idx;",
+        ),
+        # Bandeja por empresa
+        migrations.RunSQL(
+            sql="""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS product_case_company_created_id_idx
+                ON core.product_case (sr_company_id, created_at DESC, id DESC);
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS core.product_case_company_created_id_idx;",
+        ),
+        # Última versión por producto (LATERAL ... ORDER BY created_at DESC LIMIT 1)
+        migrations.RunSQL(
+            sql="""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS version_product_product_created_idx
+                ON core.version_product (idproduct, created_at DESC);
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS core.version_product_product_created_idx;",
+        ),
+        # Contadores por sección
+        migrations.RunSQL(
+            sql="CREATE INDEX CONCURRENTLY IF NOT EXISTS vp_to_cg_version_idx ON link.vp_to_cg (idversionproduct);",
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS link.vp_to_cg_version_idx;",
+        ),
+        migrations.RunSQL(
+            sql="CREATE INDEX CONCURRENTLY IF NOT EXISTS vp_to_cp_version_idx ON link.vp_to_cp (idversionproduct);",
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS link.vp_to_cp_version_idx;",
+        ),
+        migrations.RunSQL(
+            sql="CREATE INDEX CONCURRENTLY IF NOT EXISTS vp_to_annex_version_idx ON link.vp_to_annex (idversionproduct);",
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS link.vp_to_annex_version_idx;",
+        ),
+        migrations.RunSQL(
+            sql="CREATE INDEX CONCURRENTLY IF NOT EXISTS vp_to_format_version_idx ON link.vp_to_format (idversionproduct);",
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS link.vp_to_format_version_idx;",
+        ),
+    ]
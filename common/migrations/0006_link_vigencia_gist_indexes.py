@@ -0,0 +1,37 @@
+from django.db import migrations
+
+# Consultas as-of: "padre = X AND vigencia @> fecha" en un único índice GiST.
+# btree_gist aporta los operadores de igualdad para la columna uuid del padre.
+_LINKS = (
+    ("vp_to_cg", "idversionproduct"),
+    ("vp_to_cp", "idversionproduct"),
+    ("vp_to_annex", "idversionproduct"),
+    ("vp_to_format", "idversionproduct"),
+    ("ra_to_cp", "idra"),
+    ("ra_to_annex", "idra"),
+)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("common", "0005_product_case_inbox_indexes"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="CREATE EXTENSION IF NOT EXISTS btree_gist;",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ] + [
+        migrations.RunSQL(
+            sql=f"""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS {table}_vigencia_gist_idx
+                ON link.{table} USING gist ({parent}, vigencia);
+            """,
+            reverse_sql=f"DROP INDEX CONCURRENTLY IF EXISTS link.{table}_vigencia_gist_idx;",
+        )
+        for table, parent in _LINKS
+    ]
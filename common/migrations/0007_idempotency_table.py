@@ -0,0 +1,25 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0006_link_vigencia_gist_indexes"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+            CREATE TABLE IF NOT EXISTS common.idempotency (
+                request_key text PRIMARY KEY,
+                result      jsonb NOT NULL
+            );
+            ALTER TABLE common.idempotency
+                ADD COLUMN IF NOT EXISTS created_at timestamptz NOT NULL DEFAULT now();
+            -- Poda por antigüedad (prune_idempotency)
+            CREATE INDEX IF NOT EXISTS idempotency_created_at_idx
+                ON common.idempotency (created_at);
+            """,
+            reverse_sql="DROP INDEX IF EXISTS common.idempotency_created_at_idx;",
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0007_idempotency_table"),
+    ]
+
+    operations = [
+        # Clave del objeto en storage (subidas prefirmadas) y hash del contenido.
+        # tamano y mime ya existen; los completa el job de metadatos.
+        migrations.RunSQL(
+            sql="""
+            ALTER TABLE core.documento ADD COLUMN IF NOT EXISTS storage_key text;
+            ALTER TABLE core.documento ADD COLUMN IF NOT EXISTS sha256 text;
+            """,
+            reverse_sql="""
+            ALTER TABLE core.documento DROP COLUMN IF EXISTS sha256;
+            ALTER TABLE core.documento DROP COLUMN IF EXISTS storage_key;
+            """,
+        ),
+    ]
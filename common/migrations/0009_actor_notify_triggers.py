@@ -0,0 +1,58 @@
+from django.db import migrations
+
+# NOTIFY 'security_actor_changed' con el user_id afectado cuando cambia su vínculo
+# o su actor (p.ej. company_id). Lo consume manage.py listen_actor_changes.
+# SECURITY DEFINER con search_path fijo: la búsqueda en user_link no depende del
+# contexto RLS de quien escribe (los usuarios de un actor que no ve igual se avisan).
+_SQL = """
+CREATE OR REPLACE FUNCTION "security".notify_actor_changed() RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = pg_catalog, pg_temp
+AS $$
+DECLARE
+  uid bigint;
+BEGIN
+  IF TG_TABLE_NAME = 'user_link' THEN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+      PERFORM pg_notify('security_actor_changed', OLD.user_id::text);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+      PERFORM pg_notify('security_actor_changed', NEW.user_id::text);
+    END IF;
+  ELSE
+    FOR uid IN SELECT ul.user_id FROM "security".user_link ul WHERE ul.actor_id = OLD.id LOOP
+      PERFORM pg_notify('security_actor_changed', uid::text);
+    END LOOP;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS user_link_actor_changed ON "security".user_link;
+CREATE TRIGGER user_link_actor_changed
+  AFTER INSERT OR UPDATE OR DELETE ON "security".user_link
+  FOR EACH ROW EXECUTE FUNCTION "security".notify_actor_changed();
+
+DROP TRIGGER IF EXISTS actor_changed ON "security".actor;
+CREATE TRIGGER actor_changed
+  AFTER UPDATE OF company_id OR DELETE ON "security".actor
+  FOR EACH ROW EXECUTE FUNCTION "security".notify_actor_changed();
+"""
+
+_REVERSE = """
+DROP TRIGGER IF EXISTS actor_changed ON "security".actor;
+DROP TRIGGER IF EXISTS user_link_actor_changed ON "security".user_link;
+DROP FUNCTION IF EXISTS "security".notify_actor_changed();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0008_documento_storage_metadata"),
+    ]
+
+    operations = [
+        migrations.RunSQL(sql=_SQL, reverse_sql=_REVERSE),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("common", "0009_actor_notify_triggers"),
+    ]
+
+    operations = [
+        # /expediente/files/<key>: verificación de acceso por storage_key
+        migrations.RunSQL(
+            sql="""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS documento_storage_key_idx
+                ON core.documento (storage_key) WHERE storage_key IS NOT NULL;
+            """,
+            reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS core.documento_storage_key_idx;",
+        ),
+    ]
@@ -0,0 +1,114 @@
+from importlib import import_module
+
+from django.db import migrations
+
+# Amplía 0004 (NOTIFY 'expediente_tree_changed'):
+#   - Header del árbol: core.product (nombre) y core.version_product (la última versión
+#     por created_at: alta/baja y cambios de estado/version).
+#   - Columnas de sección en core.cg/cp/annex/format (logical_code, version, documento,
+#     genera_prima, tipo). referencia_normativa vive en core.documento: ya la cubre 0004.
+#   - UPDATE en link.* / workflow.receipt que mueve la fila: se notifican OLD y NEW.
+#   - SECURITY DEFINER con search_path fijo: las búsquedas del trigger no dependen del
+#     contexto RLS de quien escribe (un expediente oculto para él igual se invalida).
+
+_SECTION_COLUMNS = {
+    "cg": "logical_code, version, documento_id",
+    "cp": "logical_code, version, documento_id, genera_prima",
+    "annex": "logical_code, version, documento_id, genera_prima, tipo",
+    "format": "logical_code, version, documento_id, tipo",
+}
+
+_FUNCTION = """
+CREATE OR REPLACE FUNCTION workflow.notify_case_tree_changed() RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = pg_catalog, pg_temp
+AS $$
+DECLARE
+  r record := COALESCE(NEW, OLD);
+  vps uuid[] := ARRAY[]::uuid[];
+  products uuid[] := ARRAY[]::uuid[];
+  cases uuid[] := ARRAY[]::uuid[];
+  pc uuid;
+BEGIN
+  IF TG_TABLE_SCHEMA = 'workflow' AND TG_TABLE_NAME = 'receipt' THEN
+    IF TG_OP <> 'INSERT' THEN cases := cases || OLD.case_id; END IF;
+    IF TG_OP <> 'DELETE' THEN cases := cases || NEW.case_id; END IF;
+
+  ELSIF TG_TABLE_SCHEMA = 'link' THEN
+    IF TG_OP <> 'INSERT' THEN vps := vps || OLD.idversionproduct; END IF;
+    IF TG_OP <> 'DELETE' THEN vps := vps || NEW.idversionproduct; END IF;
+
+  ELSIF TG_TABLE_SCHEMA = 'core' AND TG_TABLE_NAME = 'documento' THEN
+    SELECT COALESCE(array_agg(DISTINCT vps_.idversionproduct), ARRAY[]::uuid[]) INTO vps
+      FROM (
+        SELECT l.idversionproduct FROM core.cg x JOIN link.vp_to_cg l ON l.idcg = x.id WHERE x.documento_id = r.id
+        UNION
+        SELECT l.idversionproduct FROM core.cp x JOIN link.vp_to_cp l ON l.idcp = x.id WHERE x.documento_id = r.id
+        UNION
+        SELECT l.idversionproduct FROM core.annex x JOIN link.vp_to_annex l ON l.idannex = x.id WHERE x.documento_id = r.id
+        UNION
+        SELECT l.idversionproduct FROM core.format x JOIN link.vp_to_format l ON l.idformat = x.id WHERE x.documento_id = r.id
+      ) vps_;
+
+  ELSIF TG_TABLE_SCHEMA = 'core' AND TG_TABLE_NAME IN ('cg', 'cp', 'annex', 'format') THEN
+    EXECUTE format('SELECT COALESCE(array_agg(l.idversionproduct), ARRAY[]::uuid[]) FROM link.%I l WHERE l.%I = $1',
+                   'vp_to_' || TG_TABLE_NAME, 'id' || TG_TABLE_NAME)
+       INTO vps USING r.id;
+
+  ELSIF TG_TABLE_SCHEMA = 'core' AND TG_TABLE_NAME = 'version_product' THEN
+    IF TG_OP <> 'INSERT' THEN products := products || OLD.idproduct; END IF;
+    IF TG_OP <> 'DELETE' THEN products := products || NEW.idproduct; END IF;
+
+  ELSIF TG_TABLE_SCHEMA = 'core' AND TG_TABLE_NAME = 'product' THEN
+    products := ARRAY[r.id];
+  END IF;
+
+  FOR pc IN
+    SELECT wc.product_case_id FROM workflow."case" wc WHERE wc.id = ANY(cases)
+    UNION
+    SELECT pc2.id
+      FROM core.version_product v
+      JOIN core.product_case pc2 ON pc2.product_id = v.idproduct
+     WHERE v.id = ANY(vps)
+    UNION
+    SELECT pc2.id FROM core.product_case pc2 WHERE pc2.product_id = ANY(products)
+  LOOP
+    PERFORM pg_notify('expediente_tree_changed', pc::text);
+  END LOOP;
+  RETURN NULL;
+END;
+$$;
+"""
+
+_TRIGGERS = """
+DROP TRIGGER IF EXISTS case_tree_changed ON core.product;
+CREATE TRIGGER case_tree_changed AFTER UPDATE OF nombre ON core.product
+  FOR EACH ROW EXECUTE FUNCTION workflow.notify_case_tree_changed();
+DROP TRIGGER IF EXISTS case_tree_changed ON core.version_product;
+CREATE TRIGGER case_tree_changed
+  AFTER INSERT OR UPDATE OF idproduct, estado, version, created_at OR DELETE ON core.version_product
+  FOR EACH ROW EXECUTE FUNCTION workflow.notify_case_tree_changed();
+""" + "".join(
+    f"""DROP TRIGGER IF EXISTS case_tree_changed ON core.{t};
+CREATE TRIGGER case_tree_changed AFTER UPDATE OF {cols} ON core.{t}
+  FOR EACH ROW EXECUTE FUNCTION workflow.notify_case_tree_changed();
+"""
+    for t, cols in _SECTION_COLUMNS.items()
+)
+
+_REVERSE = "".join(
+    f"DROP TRIGGER IF EXISTS case_tree_changed ON core.{t};\n"
+    for t in ("product", "version_product", *_SECTION_COLUMNS)
+) + import_module("common.migrations.0004_case_tree_notify_triggers").FORWARD
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0010_documento_storage_key_index"),
+    ]
+
+    operations = [
+        migrations.RunSQL(sql=_FUNCTION + _TRIGGERS, reverse_sql=_REVERSE),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations
+
+# NOTIFY 'catalog_bootstrap_changed' ante cualquier escritura en las tablas que arman
+# el bundle de /catalog/bootstrap (items y raíces presentadas de ramos con uniformDocs).
+# Trigger por sentencia: un UPDATE masivo notifica una vez. El payload es la tabla.
+# Lo consume manage.py listen_catalog_changes → invalidate_bootstrap().
+_TABLES = ("catalog.item", "ramo.node", "ramo.doc_requirement")
+
+_SQL = """
+CREATE OR REPLACE FUNCTION catalog.notify_bootstrap_changed() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+  PERFORM pg_notify('catalog_bootstrap_changed', TG_TABLE_SCHEMA || '.' || TG_TABLE_NAME);
+  RETURN NULL;
+END;
+$$;
+""" + "".join(
+    f"""
+DROP TRIGGER IF EXISTS catalog_bootstrap_changed ON {t};
+CREATE TRIGGER catalog_bootstrap_changed
+  AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {t}
+  FOR EACH STATEMENT EXECUTE FUNCTION catalog.notify_bootstrap_changed();
+"""
+    for t in _TABLES
+)
+
+_REVERSE = "".join(f"DROP TRIGGER IF EXISTS catalog_bootstrap_changed ON {t};\n" for t in _TABLES) + """
+DROP FUNCTION IF EXISTS catalog.notify_bootstrap_changed();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0011_case_tree_notify_header_triggers"),
+    ]
+
+    operations = [
+        migrations.RunSQL(sql=_SQL, reverse_sql=_REVERSE),
+    ]
@@ -0,0 +1,37 @@
+# products-backend/common/tests/parity.py
+import json
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, SimpleTestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+class AsyncParityTestCase(SimpleTestCase):
+    """Misma request contra la vista sync (DRF) y su variante ASGI: mismos argumentos y JSON."""
+
+    def setUp(self):
+        self.user = get_user_model()(pk=5, username="bench")
+        self.token = AccessToken.for_user(self.user)
+        # El claim de empresa viaja en el JWT: la variante ASGI lo ve en TokenUser
+        self.token["company_id"] = "00000000-0000-4000-8000-0000000000c1"
+
+    def sync_json(self, view, method, path, data=None, **view_kwargs):
+        factory = APIRequestFactory()
+        request = getattr(factory, method)(path, data, format="json")
+        force_authenticate(request, user=self.user, token=self.token)
+        response = view.as_view()(request, **view_kwargs)
+        if hasattr(response, "render"):
+            response.render()
+        return response.status_code, json.loads(response.content)
+
+    def async_json(self, view, method, path, data=None, **view_kwargs):
+        factory = RequestFactory()
+        kwargs = {"HTTP_AUTHORIZATION": f"Bearer {self.token}"}
+        if method == "post":
+            request = factory.post(path, json.dumps(data), content_type="application/json", **kwargs)
+        else:
+            request = factory.get(path, data, **kwargs)
+        response = async_to_sync(view.as_view())(request, **view_kwargs)
+        return response.status_code, json.loads(response.content)
@@ -0,0 +1,42 @@
+# products-backend/common/tests/test_benchmark_harness.py
+import json
+import tempfile
+from contextlib import ExitStack
+from pathlib import Path
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from common.benchmarks.harness import CaseResult, compare, measure, missing_from_baseline, save_baseline
+
+
+def _result(name, p95=10.0, queries=3.0):
+    return CaseResult(name=name, iterations=1, p50_ms=p95, p95_ms=p95, max_ms=p95, mean_ms=p95,
+                      queries=queries, rows=1.0, db_ms=1.0)
+
+
+class HarnessTests(SimpleTestCase):
+    def test_missing_from_baseline(self):
+        results = [_result("a"), _result("b")]
+        self.assertEqual(missing_from_baseline(results, None), ["a", "b"])
+        self.assertEqual(missing_from_baseline(results, {}), ["a", "b"])
+        self.assertEqual(missing_from_baseline(results, {"a": {"p95_ms": 10.0, "queries": 3.0}}), ["b"])
+
+    def test_compare(self):
+        baseline = {"a": {"p95_ms": 10.0, "queries": 3.0}}
+        self.assertEqual(compare([_result("a", p95=12.0)], baseline), [])
+        self.assertEqual(len(compare([_result("a", p95=20.0, queries=4.0)], baseline)), 2)
+
+    def test_save_baseline_mezcla_casos(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "b.json"
+            save_baseline(path, "nodes=1000", [_result("a"), _result("b")])
+            save_baseline(path, "nodes=1000", [_result("a", p95=5.0)])
+            data = json.loads(path.read_text(encoding="utf-8"))
+        self.assertEqual(sorted(data["nodes=1000"]), ["a", "b"])
+        self.assertEqual(data["nodes=1000"]["a"]["p95_ms"], 5.0)
+
+    def test_measure_sin_captura_de_lentas(self):
+        with patch("common.benchmarks.harness.install_query_metrics", return_value=ExitStack()) as install:
+            measure("noop", lambda: None, iterations=2, warmup=0)
+        install.assert_called_with(capture_slow=False)
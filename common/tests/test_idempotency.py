@@ -0,0 +1,80 @@
+# products-backend/common/tests/test_idempotency.py
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from common.application import idempotency
+
+
+class FakeLock:
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.released = False
+
+    def acquire(self, blocking=True):
+        return True
+
+    def release(self):
+        self.released = True
+
+
+class FakeCache:
+    def __init__(self):
+        self.data = {}
+        self.locks = []
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ttl):
+        self.data[key] = value
+
+    def lock(self, key, timeout, blocking_timeout):
+        lock = FakeLock(timeout)
+        self.locks.append(lock)
+        return lock
+
+
+class RunIdempotentTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = FakeCache()
+        patcher = mock.patch.object(idempotency, "cache", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_rejects_open_transaction(self):
+        fn = mock.Mock()
+        with mock.patch.object(idempotency, "connection") as conn:
+            conn.in_atomic_block = True
+            with self.assertRaises(RuntimeError):
+                idempotency.run_idempotent("k", fn)
+        fn.assert_not_called()
+        self.assertEqual(self.cache.locks, [])
+
+    def test_publishes_after_outer_commit_and_uses_lock_timeout(self):
+        events = []
+
+        class Atomic:
+            def __init__(self, durable=False):
+                assert durable
+            def __enter__(self):
+                events.append("begin")
+            def __exit__(self, *exc):
+                events.append("commit")
+
+        def fn():
+            events.append("fn")
+            return {"id": 1}
+
+        with mock.patch.object(idempotency, "connection") as conn, \
+                mock.patch.object(idempotency.transaction, "atomic", Atomic), \
+                mock.patch.object(idempotency, "_load_db", return_value=None), \
+                mock.patch.object(idempotency, "_store_db", side_effect=lambda k, b: events.append("store")):
+            conn.in_atomic_block = False
+            result = idempotency.run_idempotent("k", fn, lock_timeout=900)
+
+        self.assertEqual(result, {"id": 1})
+        self.assertEqual(events, ["begin", "fn", "store", "commit"])
+        self.assertIn("idem:result:k", self.cache.data)
+        self.assertEqual(self.cache.locks[0].timeout, 900)
+        self.assertTrue(self.cache.locks[0].released)
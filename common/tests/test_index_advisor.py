@@ -0,0 +1,176 @@
+# products-backend/common/tests/test_index_advisor.py
+from django.test import SimpleTestCase
+
+from common.db.index_advisor import (
+    IndexProposal,
+    _index_keys,
+    analyze_plan,
+    clean_expr,
+    is_covered,
+    predicate_keys,
+)
+
+# Planes con la forma de EXPLAIN (ANALYZE, BUFFERS, VERBOSE, FORMAT JSON) de PostgreSQL,
+# recortados a las claves que lee el advisor.
+
+# ramos.tree.subtree sin índice por parent_id: el paso recursivo hace Hash Join contra
+# un Seq Scan de ramo.node en cada iteración
+PLAN_HASH_JOIN_SEQ_SCAN = [{
+    "Plan": {
+        "Node Type": "CTE Scan", "Alias": "t", "Actual Rows": 341, "Actual Loops": 1,
+        "Shared Hit Blocks": 1180, "Shared Read Blocks": 42, "Temp Written Blocks": 0,
+        "Plans": [{
+            "Node Type": "Recursive Union", "Parent Relationship": "InitPlan",
+            "Actual Rows": 341, "Actual Loops": 1,
+            "Plans": [
+                {
+                    "Node Type": "Index Scan", "Parent Relationship": "Outer",
+                    "Index Name": "node_pkey", "Relation Name": "node", "Schema": "ramo", "Alias": "node",
+                    "Actual Rows": 1, "Actual Loops": 1,
+                    "Index Cond": "(node.id = '6f1c0a52-6a43-4c55-9a8b-0d2f3f6d7f11'::uuid)",
+                },
+                {
+                    "Node Type": "Hash Join", "Parent Relationship": "Inner", "Join Type": "Inner",
+                    "Actual Rows": 85, "Actual Loops": 4,
+                    "Hash Cond": "(n.parent_id = t_1.id)",
+                    "Plans": [
+                        {
+                            "Node Type": "WorkTable Scan", "Parent Relationship": "Outer",
+                            "Alias": "t_1", "Actual Rows": 85, "Actual Loops": 4,
+                            "Filter": "(t_1.d < 4)",
+                        },
+                        {
+                            "Node Type": "Hash", "Parent Relationship": "Inner",
+                            "Actual Rows": 48210, "Actual Loops": 4,
+                            "Plans": [{
+                                "Node Type": "Seq Scan", "Parent Relationship": "Outer",
+                                "Relation Name": "node", "Schema": "ramo", "Alias": "n",
+                                "Actual Rows": 48210, "Actual Loops": 4,
+                            }],
+                        },
+                    ],
+                },
+            ],
+        }],
+    },
+    "Planning Time": 0.412,
+    "Execution Time": 96.871,
+}]
+
+# Listado de expedientes ordenado por fecha con work_mem chico: Sort externo sobre Seq Scan
+PLAN_SORT_SPILL = [{
+    "Plan": {
+        "Node Type": "Limit", "Actual Rows": 50, "Actual Loops": 1,
+        "Shared Hit Blocks": 310, "Shared Read Blocks": 9120, "Temp Written Blocks": 2464,
+        "Plans": [{
+            "Node Type": "Sort", "Parent Relationship": "Outer", "Actual Rows": 50, "Actual Loops": 1,
+            "Sort Key": ["c.created_at", "c.id"],
+            "Sort Method": "external merge", "Sort Space Used": 19712, "Sort Space Type": "Disk",
+            "Plans": [{
+                "Node Type": "Seq Scan", "Parent Relationship": "Outer",
+                "Relation Name": "case", "Schema": "workflow", "Alias": "c",
+                "Actual Rows": 183402, "Actual Loops": 1, "Rows Removed by Filter": 16598,
+                "Filter": "((c.status = 'OPEN'::text) AND (c.company_id = '0b9e1f6e-1d0c-4d5e-9c3a-2f1a0e5b7c44'::uuid))",
+            }],
+        }],
+    },
+    "Execution Time": 412.05,
+}]
+
+# Búsqueda por código en mayúsculas: Seq Scan con filtro sobre una expresión jsonb
+PLAN_EXPRESSION_FILTER = [{
+    "Plan": {
+        "Node Type": "Seq Scan", "Relation Name": "item", "Schema": "catalog", "Alias": "i",
+        "Actual Rows": 1, "Actual Loops": 1, "Rows Removed by Filter": 24999,
+        "Filter": "(upper((i.attrs ->> 'code'::text)) = 'INC-001'::text)",
+        "Shared Hit Blocks": 890, "Shared Read Blocks": 0, "Temp Written Blocks": 0,
+    },
+    "Execution Time": 8.3,
+}]
+
+
+class CleanExprTests(SimpleTestCase):
+    def test_quita_alias_casts_y_parentesis(self):
+        self.assertEqual(clean_expr("(n.parent_id)", "n"), "parent_id")
+        self.assertEqual(clean_expr("((n.attrs ->> 'ord'::text))::integer", "n"), "((attrs->>'ord'))::integer")
+        self.assertEqual(clean_expr("upper((i.attrs  ->>  'code'::text))", "i"), "upper((attrs->>'code'))")
+
+    def test_no_quita_parentesis_no_redundantes(self):
+        self.assertEqual(clean_expr("(x.a) + (x.b)", "x"), "(a) + (b)")
+
+
+class PredicateKeysTests(SimpleTestCase):
+    def test_solo_el_alias_y_expresiones_primero(self):
+        condition = ("((((n.attrs ->> 'ord'::text))::integer > 3) AND (n.kind = 'RAMO'::text) "
+                     "AND (n.parent_id = p.id))")
+        self.assertEqual(predicate_keys(condition, "n"), ["((attrs->>'ord'))::integer", "kind", "parent_id"])
+        self.assertEqual(predicate_keys(condition, "p"), ["id"])
+
+    def test_expresion_completa_sin_columna_suelta(self):
+        keys = predicate_keys("(upper((i.attrs ->> 'code'::text)) = 'X'::text)", "i")
+        self.assertEqual(keys, ["upper((attrs->>'code'))"])
+
+
+class IndexKeysTests(SimpleTestCase):
+    def test_columnas_y_orden(self):
+        self.assertEqual(
+            _index_keys('CREATE INDEX c_idx ON workflow."case" USING btree (status, created_at DESC NULLS LAST)'),
+            ["status", "created_at"])
+
+    def test_expresiones(self):
+        self.assertEqual(
+            _index_keys("CREATE INDEX node_ord_idx ON ramo.node USING btree "
+                        "(((attrs ->> 'ord'::text))::integer, name)"),
+            ["attrs->>'ord'::integer", "name"])
+
+    def test_include_y_parcial_fuera_de_las_claves(self):
+        self.assertEqual(_index_keys("CREATE INDEX x ON t USING btree (a, lower(b)) INCLUDE (c)"), ["a", "lowerb"])
+        self.assertEqual(_index_keys("CREATE INDEX x ON t USING gist (vigencia) WHERE (x > 1)"), ["vigencia"])
+
+
+class IsCoveredTests(SimpleTestCase):
+    def test_prefijo_de_un_indice_existente(self):
+        indexes = {"workflow.case": [["status", "company_id", "created_at"]]}
+        self.assertTrue(is_covered(IndexProposal("workflow.case", ["status", "company_id"], "seq_scan"), indexes))
+        self.assertFalse(is_covered(IndexProposal("workflow.case", ["company_id"], "seq_scan"), indexes))
+        self.assertFalse(is_covered(IndexProposal("workflow.other", ["status"], "seq_scan"), indexes))
+
+
+class AnalyzePlanTests(SimpleTestCase):
+    def test_hash_join_sobre_seq_scan(self):
+        report = analyze_plan(PLAN_HASH_JOIN_SEQ_SCAN)
+        self.assertEqual((report.execution_ms, report.shared_hit, report.shared_read), (96.871, 1180, 42))
+        [finding] = report.findings
+        self.assertEqual((finding.kind, finding.table), ("seq_scan", "ramo.node"))
+        self.assertIn("192840 filas examinadas en 4 loop(s)", finding.detail)
+        # La condición sale del Hash Join (saltando el Hash intermedio)
+        self.assertEqual(finding.proposal.keys, ["parent_id"])
+        self.assertEqual(finding.proposal.sql(),
+                         "CREATE INDEX CONCURRENTLY IF NOT EXISTS node_parent_id_idx ON ramo.node (parent_id);")
+
+    def test_bajo_el_umbral_no_reporta(self):
+        self.assertEqual(analyze_plan(PLAN_HASH_JOIN_SEQ_SCAN, min_rows=10 ** 6).findings, [])
+
+    def test_sort_a_disco(self):
+        report = analyze_plan(PLAN_SORT_SPILL)
+        self.assertEqual(report.temp_written, 2464)
+        kinds = [f.kind for f in report.findings]
+        self.assertEqual(kinds, ["sort_spill", "sort_scan", "seq_scan"])
+        spill, sort_scan, seq_scan = report.findings
+        self.assertIn("external merge, 19712 kB", spill.detail)
+        self.assertIsNone(spill.proposal)
+        # Filtro (igualdades) + claves del sort: el índice evita el Sort
+        self.assertEqual(sort_scan.proposal.keys, ["status", "company_id", "created_at", "id"])
+        self.assertEqual(seq_scan.proposal.keys, ["status", "company_id"])
+
+    def test_indice_de_expresion_ya_cubierto(self):
+        [finding] = analyze_plan(PLAN_EXPRESSION_FILTER).findings
+        self.assertEqual(finding.proposal.keys, ["upper((attrs->>'code'))"])
+        self.assertEqual(finding.proposal.sql(),
+                         "CREATE INDEX CONCURRENTLY IF NOT EXISTS item_upper_attrs_code_idx "
+                         "ON catalog.item ((upper((attrs->>'code'))));")
+        existing = {"catalog.item": [
+            _index_keys("CREATE INDEX item_code_upper_idx ON catalog.item USING btree (upper((attrs ->> 'code'::text)))"),
+        ]}
+        self.assertTrue(is_covered(finding.proposal, existing))
+        self.assertFalse(is_covered(finding.proposal, {"catalog.item": [["attrs"]]}))
@@ -0,0 +1,168 @@
+# products-backend/common/tests/test_rls_context.py
+from contextlib import contextmanager
+
+from django.test import SimpleTestCase
+
+from common.application.db import (
+    _RESET_SQL,
+    _SET_SQL,
+    RLS_STATE_ATTR,
+    RlsContext,
+    _carried_user,
+    _record,
+    forget_rls_state,
+)
+
+
+class FakeRawCursor:
+    def __init__(self, log, name=None):
+        self.log = log
+        self.name = name
+        self.closed = False
+
+    def execute(self, sql, params=None):
+        self.log.append(("execute", self.name, sql, params))
+
+    def close(self):
+        self.closed = True
+
+
+class FakeRawConnection:
+    """Conexión psycopg mínima: registra cursores, sentencias y pipelines."""
+
+    def __init__(self):
+        self.log = []
+        self.cursors = []
+
+    def cursor(self):
+        cur = FakeRawCursor(self.log)
+        self.cursors.append(cur)
+        return cur
+
+    @contextmanager
+    def pipeline(self):
+        self.log.append(("pipeline", "enter"))
+        yield
+        self.log.append(("pipeline", "exit"))
+
+
+class FakeConnection:
+    """DatabaseWrapper mínimo: on_commit / run_on_commit como Django."""
+
+    def __init__(self):
+        self.connection = FakeRawConnection()
+        self.in_atomic_block = False
+        self.run_on_commit = []
+
+    def on_commit(self, func):
+        self.run_on_commit.append((set(), func, False))
+
+    def commit(self):
+        callbacks, self.run_on_commit = self.run_on_commit, []
+        for _, func, _ in callbacks:
+            func()
+
+    def rollback(self):
+        self.run_on_commit = []
+
+
+class FakeCursorWrapper:
+    def __init__(self, raw_cursor):
+        self.cursor = raw_cursor
+
+
+class CarriedUserTests(SimpleTestCase):
+    def setUp(self):
+        self.conn = FakeConnection()
+
+    def test_sin_estado(self):
+        self.assertIsNone(_carried_user(self.conn))
+
+    def test_autocommit_queda_aplicado(self):
+        _record(self.conn, 7)
+        self.assertEqual(_carried_user(self.conn), 7)
+
+    def test_reemplazo_de_usuario(self):
+        _record(self.conn, 7)
+        _record(self.conn, 8)
+        self.assertEqual(_carried_user(self.conn), 8)
+
+    def test_limpieza(self):
+        _record(self.conn, 7)
+        _record(self.conn, None)
+        self.assertIsNone(_carried_user(self.conn))
+
+    def test_transaccion_pendiente_y_commit(self):
+        self.conn.in_atomic_block = True
+        _record(self.conn, 7)
+        self.assertEqual(_carried_user(self.conn), 7)
+        self.conn.commit()
+        self.conn.in_atomic_block = False
+        self.assertEqual(_carried_user(self.conn), 7)
+
+    def test_rollback_descarta_el_contexto(self):
+        self.conn.in_atomic_block = True
+        _record(self.conn, 7)
+        self.conn.rollback()
+        self.conn.in_atomic_block = False
+        self.assertIsNone(_carried_user(self.conn))
+
+    def test_forget(self):
+        _record(self.conn, 7)
+        forget_rls_state(self.conn)
+        self.assertIsNone(getattr(self.conn.connection, RLS_STATE_ATTR))
+        self.assertIsNone(_carried_user(self.conn))
+
+
+class RlsContextTests(SimpleTestCase):
+    def setUp(self):
+        self.conn = FakeConnection()
+        self.log = self.conn.connection.log
+
+    def _run(self, rls, cursor_name=None):
+        statement_cursor = FakeRawCursor(self.log, name=cursor_name)
+
+        def execute(sql, params, many, context):
+            statement_cursor.execute(sql, params)
+            return "ok"
+
+        context = {"connection": self.conn, "cursor": FakeCursorWrapper(statement_cursor)}
+        return rls(execute, "SELECT 1", None, False, context)
+
+    def _statements(self):
+        return [entry[2] for entry in self.log if entry[0] == "execute"]
+
+    def test_set_en_cursor_propio_y_pipeline(self):
+        self.assertEqual(self._run(RlsContext(user_id=7)), "ok")
+        self.assertEqual(self.log[0], ("pipeline", "enter"))
+        self.assertEqual(self.log[1], ("execute", None, _SET_SQL, [7]))
+        self.assertEqual(self.log[-1], ("pipeline", "exit"))
+        self.assertTrue(self.conn.connection.cursors[0].closed)
+        self.assertEqual(_carried_user(self.conn), 7)
+
+    def test_cursor_con_nombre_sin_pipeline(self):
+        self._run(RlsContext(user_id=7), cursor_name="_django_curs_1")
+        self.assertNotIn(("pipeline", "enter"), self.log)
+        # El SET no pasa por el cursor con nombre: la sentencia se declara una sola vez
+        self.assertEqual(self.log[0], ("execute", None, _SET_SQL, [7]))
+        self.assertEqual([e for e in self.log if e[1] == "_django_curs_1"],
+                         [("execute", "_django_curs_1", "SELECT 1", None)])
+
+    def test_mismo_usuario_no_repite(self):
+        _record(self.conn, 7)
+        self._run(RlsContext(user_id=7))
+        self.assertEqual(self._statements(), ["SELECT 1"])
+
+    def test_anonimo_limpia_contexto_heredado(self):
+        _record(self.conn, 7)
+        self._run(RlsContext())
+        self.assertEqual(self._statements(), [_RESET_SQL, "SELECT 1"])
+        self.assertIsNone(_carried_user(self.conn))
+
+    def test_rollback_reaplica(self):
+        self.conn.in_atomic_block = True
+        self._run(RlsContext(user_id=7))
+        self.conn.rollback()
+        self.conn.in_atomic_block = False
+        self._run(RlsContext(user_id=7))
+        self.assertEqual(self._statements(), [_SET_SQL, "SELECT 1", _SET_SQL, "SELECT 1"])
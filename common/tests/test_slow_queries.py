@@ -0,0 +1,47 @@
+# products-backend/common/tests/test_slow_queries.py
+import threading
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from common.db import slow_queries
+
+ENTRY = dict(alias="default", literal_sql="SELECT 1", sql="SELECT 1", seconds=1.2,
+             rows=1, function="ramos.api.services.tree_service.get_tree", user_id=5)
+
+
+class SubmitSlowQueryTests(SimpleTestCase):
+    def test_registra_en_otro_hilo(self):
+        done = threading.Event()
+        seen = {}
+
+        def capture(**kwargs):
+            seen["thread"] = threading.current_thread()
+            seen["kwargs"] = kwargs
+            done.set()
+
+        with patch.object(slow_queries, "capture_slow_query", capture):
+            slow_queries.submit_slow_query(**ENTRY)
+            self.assertTrue(done.wait(5))
+
+        self.assertIsNot(seen["thread"], threading.current_thread())
+        self.assertEqual(seen["kwargs"], ENTRY)
+
+    def test_cola_llena_descarta_sin_bloquear(self):
+        release = threading.Event()
+        calls = []
+
+        def capture(**kwargs):
+            calls.append(kwargs)
+            release.wait(5)
+
+        with patch.object(slow_queries, "capture_slow_query", capture), \
+                patch.object(slow_queries, "_pending", threading.BoundedSemaphore(1)), \
+                patch.object(slow_queries.SLOW_QUERIES_DROPPED, "inc") as dropped:
+            slow_queries.submit_slow_query(**ENTRY)
+            slow_queries.submit_slow_query(**ENTRY)
+            release.set()
+            slow_queries._executor.submit(lambda: None).result(5)
+
+        self.assertEqual(len(calls), 1)
+        dropped.assert_called_once_with()
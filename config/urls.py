@@ -11,6 +11,7 @@ urlpatterns = [
     path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
     path("api/docs/", SpectacularSwaggerView.as_view(url_name="schema")),
     # API v1 por dominio (routers vacíos por ahora: no 404)
+    path("api/", include("common.api.routers")),
     path("api/", include("security.api.routers")),
     path("api/", include("catalog.api.routers")),
     path("api/", include("ramos.api.routers")),
@@ -1,11 +1,58 @@
 ﻿from django.urls import path
 
-from expediente.api.views.tree import CaseTreeView
+from expediente.api.views.aio import AsyncCaseTreeView
+from expediente.api.views.documents import CaseDocumentsZipView
+from expediente.api.views.inbox import CaseInboxView
+from expediente.api.views.tree import CaseTimelineView, CaseTreeBatchView, CaseTreeView
+from expediente.api.views.uploads import (
+    FileDownloadView,
+    LocalUploadView,
+    UploadCompleteView,
+    UploadCreateView,
+)
 
 urlpatterns = [
+    path("expediente/inbox", CaseInboxView.as_view(), name="case-inbox"),
     path(
         "expediente/<uuid:product_case_id>/tree",
         CaseTreeView.as_view(),
         name="case-tree",
     ),
+    path(
+        "expediente/<uuid:product_case_id>/timeline",
+        CaseTimelineView.as_view(),
+        name="case-timeline",
+    ),
+    path(
+        "expediente/<uuid:product_case_id>/documents.zip",
+        CaseDocumentsZipView.as_view(),
+        name="case-documents-zip",
+    ),
+    path(
+        "expediente/tree/batch",
+        CaseTreeBatchView.as_view(),
+        name="case-tree-batch",
+    ),
+    # Async (ASGI): secciones y timeline en paralelo
+    path(
+        "aio/expediente/<uuid:product_case_id>/tree",
+        AsyncCaseTreeView.as_view(),
+        name="aio-case-tree",
+    ),
+    path("expediente/uploads", UploadCreateView.as_view(), name="expediente-upload-create"),
+    path(
+        "expediente/uploads/complete",
+        UploadCompleteView.as_view(),
+        name="expediente-upload-complete",
+    ),
+    path(
+        "expediente/uploads/local/<str:token>",
+        LocalUploadView.as_view(),
+        name="expediente-upload-local",
+    ),
+    path(
+        "expediente/files/<path:key>",
+        FileDownloadView.as_view(),
+        name="expediente-file",
+    ),
 ]
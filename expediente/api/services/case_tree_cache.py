@@ -0,0 +1,103 @@
+# products-backend/expediente/api/services/case_tree_cache.py
+from datetime import date
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+
+from common.db.document_sections import VERSIONS_ALL
+from common.db.routers import pin_primary
+from expediente.api.services.case_tree_service import aget_case_tree_json, get_case_tree_json
+
+# ---------------------------------------------------------------------------
+# Caché del árbol del expediente
+# ---------------------------------------------------------------------------
+# Clave: (product_case_id, generación, scope RLS, timeline_limit, modo de versiones, as_of).
+#
+# - Scope RLS: el contexto de la sesión lo fija security.set_context_from_user(user_id),
+#   así que el user_id determina por completo qué filas ve la consulta. Nunca se
+#   comparte una entrada entre usuarios distintos.
+# - Generación: contador por expediente. Invalidar = incrementarlo; todas las
+#   entradas anteriores (de cualquier usuario) quedan huérfanas y expiran por TTL.
+#
+# Invalidación:
+#   - Postgres NOTIFY 'expediente_tree_changed' (triggers en link.vp_to_*, core.documento,
+#     core.product, core.version_product, core.cg/cp/annex/format y workflow.receipt;
+#     migraciones common 0004 y 0011) → manage.py listen_case_tree_changes → invalidate_case_tree().
+#   - Escritores de la app pueden llamar invalidate_case_tree() vía transaction.on_commit.
+# El TTL acota la desactualización si el listener no está corriendo.
+#
+# Un miss se llena leyendo del primario: una réplica atrasada guardaría un árbol viejo
+# bajo la generación nueva durante todo el TTL.
+
+CASE_TREE_TTL = 60 * 10
+NOTIFY_CHANNEL = "expediente_tree_changed"
+
+_GEN_KEY = "expediente:tree:gen:{pc}"
+_TREE_KEY = "expediente:tree:{pc}:g{gen}:u{user}:t{tl}:v{versions}:d{as_of}"
+
+
+def _generation(product_case_id: str) -> int:
+    return cache.get(_GEN_KEY.format(pc=product_case_id)) or 0
+
+
+def _tree_key(pc: str, gen: int, user_id: int, timeline_limit: int, versions: str, as_of: Optional[date]) -> str:
+    return _TREE_KEY.format(pc=pc, gen=gen, user=user_id, tl=timeline_limit, versions=versions,
+                            as_of=as_of.isoformat() if as_of else "-")
+
+
+def get_case_tree_cached(product_case_id: str, user_id: int, timeline_limit: int,
+                         load_context=None, versions: str = VERSIONS_ALL,
+                         as_of: Optional[date] = None) -> Optional[bytes]:
+    """
+    Árbol (bytes JSON) desde caché o, si no está, desde Postgres.
+    'load_context' se invoca solo en un miss, antes de consultar (carga del contexto RLS):
+    un hit no toca la base de datos.
+    """
+    pc = str(product_case_id)
+    key = _tree_key(pc, _generation(pc), user_id, timeline_limit, versions, as_of)
+
+    body = cache.get(key)
+    if body is not None:
+        return body
+
+    if load_context is not None:
+        load_context()
+    with pin_primary():
+        body = get_case_tree_json(pc, timeline_limit=timeline_limit, versions=versions, as_of=as_of)
+    if body is not None:
+        cache.set(key, body, CASE_TREE_TTL)
+    return body
+
+
+async def aget_case_tree_cached(product_case_id: str, user_id: int, timeline_limit: int,
+                                versions: str = VERSIONS_ALL, as_of: Optional[date] = None) -> Optional[bytes]:
+    """Versión async de get_case_tree_cached() (misma clave; el contexto RLS lo aplica common.db.aio)."""
+    pc = str(product_case_id)
+    gen = await cache.aget(_GEN_KEY.format(pc=pc)) or 0
+    key = _tree_key(pc, gen, user_id, timeline_limit, versions, as_of)
+
+    body = await cache.aget(key)
+    if body is not None:
+        return body
+
+    with pin_primary():
+        body = await aget_case_tree_json(pc, user_id, timeline_limit=timeline_limit, versions=versions, as_of=as_of)
+    if body is not None:
+        await cache.aset(key, body, CASE_TREE_TTL)
+    return body
+
+
+def invalidate_case_tree(product_case_id: str) -> None:
+    key = _GEN_KEY.format(pc=str(product_case_id))
+    # add() no pisa un contador existente; incr() es atómico en Redis
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # La clave expiró/desalojó entre add() e incr(): arrancar una generación nueva
+        cache.set(key, 1, None)
+
+
+def invalidate_case_trees(product_case_ids: Iterable[str]) -> None:
+    for pc in set(map(str, product_case_ids)):
+        invalidate_case_tree(pc)
@@ -0,0 +1,173 @@
+# products-backend/expediente/api/services/case_tree_service.py
+import asyncio
+from datetime import date
+from typing import List, Optional
+
+from common.db import aio
+from common.db.document_sections import SECTIONS, VERSIONS_ALL, VERSIONS_CURRENT, section_sql
+from common.db.routers import read_connection
+
+from expediente.api.services.timeline_service import SQL_CURSOR_EXPR, latest_receipts_sql
+
+# Recibos del timeline embebidos en el árbol; el resto se pide a /timeline con el cursor.
+TREE_TIMELINE_LIMIT = 20
+
+# ---------------------------------------------------------------------------
+# Árbol del expediente renderizado por Postgres
+# ---------------------------------------------------------------------------
+# Todo el árbol (header + secciones + timeline) se arma con json_build_object /
+# json_agg en una sola sentencia. El resultado sale como texto JSON y se envía
+# tal cual: Python no construye dicts por fila ni vuelve a serializar.
+#
+# Contrato (igual al de la versión anterior de CaseTreeView):
+#   {"header": {...}, "sections": {"CG": [...], "CP": [...], "ANNEX": [...], "FORMAT": [...]},
+#    "timeline": [...últimos N...], "timeline_next_cursor": "..." | null}
+
+# Cabecera del expediente (CTE "h") para los ids en %(ids)s; base de todas las consultas por expediente
+CASE_HEADER_CTE = """
+WITH h AS (
+  SELECT pc.id AS product_case_id,
+         p.id AS product_id,
+         vp.id AS version_id,
+         p.nombre,
+         vp.estado,
+         vp.version
+    FROM core.product_case pc
+    JOIN core.product p ON p.id = pc.product_id
+    LEFT JOIN LATERAL (
+      SELECT v.id, v.estado, v.version
+        FROM core.version_product v
+       WHERE v.idproduct = p.id
+       ORDER BY v.created_at DESC
+       LIMIT 1
+    ) vp ON TRUE
+   WHERE pc.id = ANY(%(ids)s::uuid[])
+)
+"""
+
+
+def _section_json(name: str, versions: str, as_of: bool, version_expr: str = "h.version_id") -> str:
+    return f"""COALESCE((
+      SELECT json_agg(x ORDER BY x.logical_code, x.version)
+        FROM ({section_sql(name, versions, version_expr, "%(as_of)s::date" if as_of else None)}) x
+    ), '[]'::json)"""
+
+
+_HEADER_JSON = """json_build_object(
+    'product_id', h.product_id,
+    'version_id', h.version_id,
+    'nombre', h.nombre,
+    'estado', h.estado,
+    'nro_version', h.version
+  )"""
+
+# Pares clave/valor del timeline dentro de un json_build_object; usan h.product_case_id
+_TIMELINE_FIELDS = """'timeline', COALESCE((
+    SELECT json_agg(r ORDER BY r.created_at DESC, r.id DESC)
+      FROM ({latest}) r
+  ), '[]'::json),
+  -- Cursor = clave del último recibo embebido, solo si hay al menos uno más
+  'timeline_next_cursor', (
+    SELECT {cursor}
+      FROM (
+        SELECT r.created_at, r.id,
+               row_number() OVER (ORDER BY r.created_at DESC, r.id DESC) AS rn,
+               count(*) OVER () AS total
+          FROM ({latest_plus_one}) r
+      ) k
+     WHERE k.rn = %(tl_limit)s AND k.total > %(tl_limit)s
+  )""".format(
+    latest=latest_receipts_sql("h.product_case_id", "%(tl_limit)s"),
+    latest_plus_one=latest_receipts_sql("h.product_case_id", "%(tl_limit)s + 1"),
+    cursor=SQL_CURSOR_EXPR.format(cols="k.created_at, k.id"),
+)
+
+
+def _tree_json(versions: str, as_of: bool) -> str:
+    sections = ",\n".join(f"    '{name}', {_section_json(name, versions, as_of)}" for name in SECTIONS)
+    return f"""
+json_build_object(
+  'header', {_HEADER_JSON},
+  'sections', json_build_object(
+{sections}
+  ),
+  {_TIMELINE_FIELDS}
+)
+"""
+
+
+_TREE_JSON = {
+    (v, a): _tree_json(v, a) for v in (VERSIONS_ALL, VERSIONS_CURRENT) for a in (False, True)
+}
+
+
+def get_case_tree_json(product_case_id: str, timeline_limit: int = TREE_TIMELINE_LIMIT,
+                       versions: str = VERSIONS_ALL, as_of: Optional[date] = None) -> Optional[bytes]:
+    """
+    Árbol de un expediente como bytes JSON listos para la respuesta, o None si no existe.
+    Un solo roundtrip. El timeline trae solo los 'timeline_limit' recibos más recientes.
+    Con 'as_of', las secciones muestran solo lo vinculado (vigente) en esa fecha.
+    """
+    sql = CASE_HEADER_CTE + f"SELECT ({_TREE_JSON[versions, as_of is not None]})::text FROM h"
+    with read_connection().cursor() as cur:
+        cur.execute(sql, {"ids": [str(product_case_id)], "tl_limit": timeline_limit, "as_of": as_of})
+        row = cur.fetchone()
+    return row[0].encode("utf-8") if row else None
+
+
+def get_case_trees_json(product_case_ids: List[str], timeline_limit: int = TREE_TIMELINE_LIMIT,
+                        versions: str = VERSIONS_ALL, as_of: Optional[date] = None) -> bytes:
+    """
+    Variante por lotes: {"items": {"<product_case_id>": <árbol>, ...}} en un solo roundtrip.
+    Los ids inexistentes (o no visibles por RLS) simplemente no aparecen en 'items'.
+    """
+    sql = (
+        CASE_HEADER_CTE
+        + f"SELECT COALESCE(json_object_agg(h.product_case_id, {_TREE_JSON[versions, as_of is not None]}), '{{}}'::json)::text FROM h"
+    )
+    with read_connection().cursor() as cur:
+        cur.execute(sql, {"ids": [str(x) for x in product_case_ids], "tl_limit": timeline_limit, "as_of": as_of})
+        row = cur.fetchone()
+    return b'{"items":' + row[0].encode("utf-8") + b"}"
+
+
+# ---------------------------------------------------------------------------
+# Variante async (vistas ASGI)
+# ---------------------------------------------------------------------------
+# Mismo JSON que get_case_tree_json(), pero en lugar de una sola sentencia: el header
+# primero (da la versión vigente) y luego las cuatro secciones y el timeline como
+# consultas independientes en paralelo, cada una en su conexión (common.db.aio).
+
+_ASYNC_HEADER_SQL = CASE_HEADER_CTE + f"SELECT h.version_id, ({_HEADER_JSON})::text FROM h"
+_ASYNC_TIMELINE_SQL = (
+    f"SELECT json_build_object({_TIMELINE_FIELDS})::text "
+    "FROM (SELECT %(pc)s::uuid AS product_case_id) h"
+)
+
+
+async def aget_case_tree_json(product_case_id: str, user_id: Optional[int],
+                              timeline_limit: int = TREE_TIMELINE_LIMIT, versions: str = VERSIONS_ALL,
+                              as_of: Optional[date] = None) -> Optional[bytes]:
+    """Versión async de get_case_tree_json(): None si el expediente no existe (o RLS)."""
+    pc = str(product_case_id)
+    header = await aio.fetchone(_ASYNC_HEADER_SQL, {"ids": [pc]}, user_id=user_id)
+    if header is None:
+        return None
+
+    params = {"version_id": header[0], "pc": pc, "tl_limit": timeline_limit, "as_of": as_of}
+    *sections, timeline = await asyncio.gather(
+        *(
+            aio.fetchone(f"SELECT ({_section_json(name, versions, as_of is not None, '%(version_id)s::uuid')})::text",
+                         params, user_id=user_id)
+            for name in SECTIONS
+        ),
+        aio.fetchone(_ASYNC_TIMELINE_SQL, params, user_id=user_id),
+    )
+
+    parts = [b'{"header":', header[1].encode("utf-8"), b',"sections":{']
+    for i, (name, row) in enumerate(zip(SECTIONS, sections)):
+        parts += [b"," if i else b"", b'"' + name.encode("ascii") + b'":', row[0].encode("utf-8")]
+    # El objeto del timeline se empalma sin su '{' inicial
+    parts += [b"},", timeline[0].encode("utf-8").lstrip()[1:]]
+    return b"".join(parts)
+
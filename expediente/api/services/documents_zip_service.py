@@ -0,0 +1,133 @@
+# products-backend/expediente/api/services/documents_zip_service.py
+import os
+import re
+import zipfile
+from datetime import date
+from typing import Any, Dict, Iterator, List, Optional
+
+from django.db import connection
+
+from common.db.document_sections import SECTIONS, VERSIONS_ALL, section_sql
+from expediente.api.services.case_tree_service import CASE_HEADER_CTE
+from expediente.api.services.upload_service import open_storage_chunks
+
+# ---------------------------------------------------------------------------
+# ZIP del expediente en streaming
+# ---------------------------------------------------------------------------
+# El ZIP se escribe sobre un buffer no posicionable: zipfile usa data descriptors
+# (tamaños/CRC después de cada archivo) y no necesita volver atrás. Cada chunk leído
+# del storage se comprime y se entrega enseguida al response; en memoria solo vive
+# el chunk en curso, nunca un archivo ni el ZIP completo. En S3 los chunks salen del
+# Body de get_object (open_storage_chunks), no de default_storage.open().
+#
+# Documentos sin storage_key (cargados solo con URL externa) no se descargan: el
+# servidor no sigue URLs del cliente. Se listan con su archivo_url en FALTANTES.txt.
+
+ZIP_READ_CHUNK = 256 * 1024
+# Nivel bajo: la mayoría son PDF ya comprimidos; prima el throughput
+ZIP_COMPRESSLEVEL = 1
+
+_SAFE_NAME = re.compile(r"[^\w.\- ]+", re.UNICODE)
+
+
+class _StreamBuffer:
+    """Destino de zipfile sin seek(): acumula lo escrito hasta que el generador lo vacía."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._pos = 0
+
+    def write(self, data: bytes) -> int:
+        if data:
+            self._chunks.append(bytes(data))
+            self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        out = b"".join(self._chunks)
+        self._chunks.clear()
+        return out
+
+
+def list_case_documents(product_case_id: str, versions: str = VERSIONS_ALL,
+                        as_of: Optional[date] = None) -> Optional[List[Dict[str, Any]]]:
+    """Documentos de la última versión del expediente; None si el expediente no existe (o RLS)."""
+    as_of_expr = "%(as_of)s::date" if as_of else None
+    parts = " UNION ALL ".join(
+        f"SELECT '{name}' AS section, x.doc_id, x.logical_code, x.version, x.nombre "
+        f"FROM ({section_sql(name, versions, as_of_expr=as_of_expr)}) x"
+        for name in SECTIONS
+    )
+    sql = CASE_HEADER_CTE + f"""
+    SELECT s.section, s.doc_id, s.logical_code, s.version, s.nombre, d.storage_key, d.archivo_url
+      FROM h
+      LEFT JOIN LATERAL ({parts}) s ON TRUE
+      LEFT JOIN core.documento d ON d.id = s.doc_id
+     ORDER BY s.section, s.logical_code, s.version
+    """
+    with connection.cursor() as cur:
+        cur.execute(sql, {"ids": [str(product_case_id)], "as_of": as_of})
+        rows = cur.fetchall()
+    if not rows:
+        return None
+    return [
+        {"section": r[0], "doc_id": r[1], "logical_code": r[2], "version": r[3],
+         "nombre": r[4], "storage_key": r[5], "archivo_url": r[6]}
+        for r in rows if r[0] is not None
+    ]
+
+
+def _entry_name(doc: Dict[str, Any], used: set) -> str:
+    ext = os.path.splitext(doc["storage_key"] or "")[1]
+    base = _SAFE_NAME.sub("_", f"{doc['logical_code']}_v{doc['version']} - {doc['nombre']}").strip()
+    if ext and not base.lower().endswith(ext.lower()):
+        base += ext
+    name = f"{doc['section']}/{base}"
+    n = 2
+    while name in used:
+        stem, e = os.path.splitext(base)
+        name = f"{doc['section']}/{stem} ({n}){e}"
+        n += 1
+    used.add(name)
+    return name
+
+
+def iter_documents_zip(documents: List[Dict[str, Any]]) -> Iterator[bytes]:
+    """
+    Genera el ZIP por chunks. Los documentos sin archivo en storage (solo URL externa) o
+    cuyo objeto no existe se listan en FALTANTES.txt en lugar de abortar la descarga.
+    """
+    buf = _StreamBuffer()
+    used: set = set()
+    missing: List[str] = []
+
+    with zipfile.ZipFile(buf, mode="w", compression=zipfile.ZIP_DEFLATED,
+                         compresslevel=ZIP_COMPRESSLEVEL, allowZip64=True) as zf:
+        for doc in documents:
+            label = f"{doc['section']}\t{doc['logical_code']}\tv{doc['version']}\t{doc['nombre']}"
+            if not doc["storage_key"]:
+                # Solo URL externa: queda en el manifiesto para descargarla aparte
+                missing.append(f"{label}\tsin archivo en storage\t{doc['archivo_url'] or '-'}")
+                continue
+            try:
+                chunks = open_storage_chunks(doc["storage_key"], ZIP_READ_CHUNK)
+            except FileNotFoundError:
+                missing.append(f"{label}\tno encontrado")
+                continue
+            with zf.open(_entry_name(doc, used), mode="w", force_zip64=True) as dest:
+                for chunk in chunks:
+                    dest.write(chunk)
+                    out = buf.drain()
+                    if out:
+                        yield out
+
+        if missing:
+            zf.writestr("FALTANTES.txt", "\n".join(missing) + "\n")
+    # Directorio central (lo escribe close())
+    yield buf.drain()
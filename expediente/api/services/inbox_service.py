@@ -0,0 +1,107 @@
+# products-backend/expediente/api/services/inbox_service.py
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from django.db import connection
+
+from common.api.pagination import KeysetPagination, keyset_order, keyset_where
+
+# Bandeja de expedientes: más recientes primero. Respaldado por
+# core.product_case_created_id_idx / product_case_company_created_id_idx.
+INBOX_SORT_KEY = ("pc.created_at", "pc.id")
+
+# Una fila por expediente de la página. Los contadores y el último recibo se
+# calculan con LATERAL agrupados solo para las filas de la página (limit+1),
+# nunca para toda la tabla.
+_INBOX_SQL = """
+SELECT pc.id,
+       pc.status,
+       pc.sr_company_id,
+       pc.created_at,
+       p.id AS product_id,
+       p.nombre,
+       vp.id AS version_id,
+       vp.version,
+       vp.estado,
+       COALESCE(cnt.cg, 0), COALESCE(cnt.cp, 0), COALESCE(cnt.annex, 0), COALESCE(cnt.format, 0),
+       lr.last_receipt_at
+  FROM core.product_case pc
+  JOIN core.product p ON p.id = pc.product_id
+  LEFT JOIN LATERAL (
+    SELECT v.id, v.version, v.estado
+      FROM core.version_product v
+     WHERE v.idproduct = p.id
+     ORDER BY v.created_at DESC
+     LIMIT 1
+  ) vp ON TRUE
+  LEFT JOIN LATERAL (
+    SELECT count(*) FILTER (WHERE s.k = 'CG')     AS cg,
+           count(*) FILTER (WHERE s.k = 'CP')     AS cp,
+           count(*) FILTER (WHERE s.k = 'ANNEX')  AS annex,
+           count(*) FILTER (WHERE s.k = 'FORMAT') AS format
+      FROM (
+        SELECT 'CG' AS k FROM link.vp_to_cg WHERE idversionproduct = vp.id
+        UNION ALL
+        SELECT 'CP' FROM link.vp_to_cp WHERE idversionproduct = vp.id
+        UNION ALL
+        SELECT 'ANNEX' FROM link.vp_to_annex WHERE idversionproduct = vp.id
+        UNION ALL
+        SELECT 'FORMAT' FROM link.vp_to_format WHERE idversionproduct = vp.id
+      ) s
+  ) cnt ON TRUE
+  LEFT JOIN LATERAL (
+    SELECT max(r.created_at) AS last_receipt_at
+      FROM workflow.case wc
+      JOIN workflow.receipt r ON r.case_id = wc.id
+     WHERE wc.product_case_id = pc.id
+  ) lr ON TRUE
+ WHERE 1=1
+"""
+
+
+def _row_to_inbox_item(r) -> Dict[str, Any]:
+    return {
+        "product_case_id": r[0],
+        "status": r[1],
+        "company_id": r[2],
+        "created_at": r[3],
+        "product": {"id": r[4], "nombre": r[5]},
+        "latest_version": {"id": r[6], "nro_version": r[7], "estado": r[8]} if r[6] else None,
+        "counts": {"CG": r[9], "CP": r[10], "ANNEX": r[11], "FORMAT": r[12]},
+        "last_receipt_at": r[13],
+    }
+
+
+def list_case_inbox(
+    company_id: Optional[str] = None,
+    statuses: Optional[List[str]] = None,
+    limit: int = 50,
+    after: Optional[Sequence[Any]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[List[Any]]]:
+    """
+    Bandeja de expedientes con contadores por sección, última versión y último recibo.
+    Una sola consulta por página; keyset sobre (created_at DESC, id DESC).
+    """
+    conds: List[str] = []
+    params: List[Any] = []
+
+    if company_id:
+        conds.append("AND pc.sr_company_id = %s")
+        params.append(company_id)
+    if statuses:
+        conds.append("AND pc.status::text = ANY(%s)")
+        params.append(list(statuses))
+
+    where, where_params = keyset_where(INBOX_SORT_KEY, after, descending=True)
+    if where:
+        conds.append("AND " + where)
+        params.extend(where_params)
+
+    sql = _INBOX_SQL + "\n".join(conds) + "\n " + keyset_order(INBOX_SORT_KEY, descending=True) + " LIMIT %s"
+    params.append(limit + 1)
+
+    with connection.cursor() as cur:
+        cur.execute(sql, params)
+        rows = cur.fetchall()
+
+    page, next_key = KeysetPagination.slice_page(rows, limit, lambda r: (r[3], r[0]))
+    return [_row_to_inbox_item(r) for r in page], next_key
@@ -0,0 +1,79 @@
+# products-backend/expediente/api/services/timeline_service.py
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from django.db import connection
+
+from common.api.pagination import KeysetPagination, keyset_where
+
+# Orden del timeline: más reciente primero, id como desempate estable.
+# Respaldado por workflow.receipt_case_created_id_idx (case_id, created_at DESC, id DESC).
+TIMELINE_SORT_KEY = ("r.created_at", "r.id")
+
+
+def latest_receipts_sql(product_case: str, limit: str, after_cond: str = "") -> str:
+    """
+    SQL de los 'limit' recibos más recientes de todos los workflow.case de un expediente.
+
+    Cada caso se recorre con un LATERAL acotado (rango sobre el índice, a lo sumo 'limit'
+    filas por caso) y luego se mezclan: el costo no crece con el histórico del expediente.
+    'product_case', 'limit' y 'after_cond' son fragmentos SQL (placeholders o columnas).
+    """
+    return f"""
+    SELECT r.id, r.tipo, r.actor_id, r.created_at, r.doc_id, r.meta
+      FROM workflow.case wc
+      CROSS JOIN LATERAL (
+        SELECT r.id, r.tipo, r.actor_id, r.created_at, r.doc_id, r.meta
+          FROM workflow.receipt r
+         WHERE r.case_id = wc.id
+           {after_cond}
+         ORDER BY r.created_at DESC, r.id DESC
+         LIMIT {limit}
+      ) r
+     WHERE wc.product_case_id = {product_case}
+     ORDER BY r.created_at DESC, r.id DESC
+     LIMIT {limit}
+    """
+
+
+# Mismo token que common.api.pagination.encode_cursor (base64url de un array JSON, sin '='),
+# generado en SQL para poder embeberlo en JSON renderizado por Postgres.
+SQL_CURSOR_EXPR = (
+    "rtrim(translate(encode(convert_to(json_build_array({cols})::text, 'UTF8'), 'base64'), "
+    "E'+/\\n', '-_'), '=')"
+)
+
+
+def _row_to_receipt(r) -> Dict[str, Any]:
+    return {
+        "id": r[0],
+        "tipo": r[1],
+        "actor_id": r[2],
+        "created_at": r[3],
+        "doc_id": r[4],
+        "meta": r[5],
+    }
+
+
+def get_case_timeline_page(
+    product_case_id: str,
+    limit: int = 50,
+    after: Optional[Sequence[Any]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[List[Any]]]:
+    """
+    Página del timeline de un expediente (keyset sobre created_at DESC, id DESC).
+    Devuelve (items, next_key); next_key es None si no hay más recibos.
+    """
+    after_cond, params = keyset_where(TIMELINE_SORT_KEY, after, descending=True)
+    if after_cond:
+        after_cond = "AND " + after_cond
+
+    sql = latest_receipts_sql("%s", "%s", after_cond)
+    # Orden de placeholders: after (en el LATERAL), limit interno, product_case, limit externo
+    params = params + [limit + 1, str(product_case_id), limit + 1]
+
+    with connection.cursor() as cur:
+        cur.execute(sql, params)
+        rows = cur.fetchall()
+
+    page, next_key = KeysetPagination.slice_page(rows, limit, lambda r: (r[3], r[0]))
+    return [_row_to_receipt(r) for r in page], next_key
@@ -0,0 +1,266 @@
+# products-backend/expediente/api/services/upload_service.py
+import hashlib
+import mimetypes
+import os
+import re
+from contextlib import suppress
+from typing import Any, Dict, Iterator, Optional, Tuple
+from uuid import uuid4
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.utils import timezone
+
+# ---------------------------------------------------------------------------
+# Subidas directas a storage
+# ---------------------------------------------------------------------------
+# 1. POST /expediente/uploads → clave en storage + URL prefirmada (PUT o POST).
+# 2. El cliente sube los bytes directo a S3/MinIO: nunca pasan por los workers.
+# 3. El cliente referencia el archivo por 'key' (FileRefSer) al crear el documento,
+#    o llama /expediente/uploads/complete con el documento_id.
+# 4. Un job RQ lee el objeto por chunks y registra tamano, mime y sha256 en core.documento.
+#
+# core.documento guarda la clave (storage_key); archivo_url es la URL estable de la API
+# (/expediente/files/<key>), nunca una URL de storage: en S3 estas son prefirmadas y
+# expiran, y en local son relativas (/media/...). La URL de descarga real se genera
+# al leer (file_download_target).
+#
+# Lecturas: open_storage_chunks() recorre el objeto por chunks. En S3 lee el Body de
+# get_object: default_storage.open() (S3File) descarga el objeto completo a un
+# SpooledTemporaryFile en memoria antes de devolver el primer byte.
+#
+# Sin S3 (desarrollo), la URL apunta a /expediente/uploads/local/<token>: un PUT firmado
+# que escribe en el FileSystemStorage local por chunks.
+
+UPLOAD_PREFIX = "uploads"
+UPLOAD_SIGNING_SALT = "expediente.upload"
+METADATA_CHUNK_SIZE = 1024 * 1024
+
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9._-]+")
+
+# Firmas de archivo más comunes en el expediente (PDF, imágenes, ofimática)
+_MAGIC = (
+    (b"%PDF-", "application/pdf"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF8", "image/gif"),
+    (b"\xd0\xcf\x11\xe0", "application/x-ole-storage"),  # doc/xls antiguos
+)
+
+
+def user_upload_prefix(user_id) -> str:
+    return f"{UPLOAD_PREFIX}/u{user_id}/"
+
+
+def _is_s3() -> bool:
+    try:
+        from storages.backends.s3boto3 import S3Boto3Storage
+    except ImportError:
+        return False
+    return isinstance(default_storage, S3Boto3Storage)
+
+
+def _s3_not_found(error) -> bool:
+    return error.response.get("Error", {}).get("Code") in ("NoSuchKey", "404", "NotFound")
+
+
+def _s3_call(method: str, key: str) -> Dict[str, Any]:
+    """head_object/get_object sobre el bucket del storage; FileNotFoundError si la clave no existe."""
+    from botocore.exceptions import ClientError
+
+    client = default_storage.connection.meta.client
+    try:
+        return getattr(client, method)(Bucket=default_storage.bucket_name, Key=key)
+    except ClientError as e:
+        if _s3_not_found(e):
+            raise FileNotFoundError(key) from e
+        raise
+
+
+def _iter_s3_body(body, chunk_size: int) -> Iterator[bytes]:
+    try:
+        yield from body.iter_chunks(chunk_size)
+    finally:
+        body.close()
+
+
+def _iter_file(fh, chunk_size: int) -> Iterator[bytes]:
+    with fh:
+        yield from iter(lambda: fh.read(chunk_size), b"")
+
+
+def open_storage_chunks(key: str, chunk_size: int) -> Iterator[bytes]:
+    """
+    Iterador de chunks del objeto en storage, sin cargarlo completo en memoria.
+    El objeto se abre al llamar (FileNotFoundError si no existe), no al iterar.
+    """
+    if _is_s3():
+        return _iter_s3_body(_s3_call("get_object", key)["Body"], chunk_size)
+    return _iter_file(default_storage.open(key, "rb"), chunk_size)
+
+
+def build_upload_key(user_id, filename: str) -> str:
+    name = _SAFE_NAME.sub("_", filename).strip("._") or "archivo"
+    return f"{user_upload_prefix(user_id)}{timezone.now():%Y/%m}/{uuid4().hex}/{name[:120]}"
+
+
+def create_upload(user_id, filename: str, content_type: str, method: str = "post",
+                  local_url_builder=None, file_url_builder=None) -> Dict[str, Any]:
+    """
+    Reserva una clave y devuelve cómo subir el archivo:
+      {"key", "method", "url", "fields" (solo POST), "headers", "expires_in", "file_url"}
+    POST (presigned post) permite forzar el tamaño máximo en S3; PUT es más simple para el cliente.
+    'local_url_builder(token)' arma la URL absoluta del stand-in local y 'file_url_builder(key)'
+    la URL estable de descarga (file_url, la que se guarda como archivo_url).
+    """
+    key = build_upload_key(user_id, filename)
+    expires = settings.UPLOAD_URL_EXPIRES
+    max_bytes = settings.UPLOAD_MAX_BYTES
+    out: Dict[str, Any] = {"key": key, "expires_in": expires, "fields": None,
+                           "headers": {"Content-Type": content_type}}
+
+    if _is_s3():
+        client = default_storage.connection.meta.client
+        bucket = default_storage.bucket_name
+        if method == "put":
+            out["method"] = "PUT"
+            out["url"] = client.generate_presigned_url(
+                "put_object",
+                Params={"Bucket": bucket, "Key": key, "ContentType": content_type},
+                ExpiresIn=expires,
+            )
+        else:
+            post = client.generate_presigned_post(
+                bucket, key,
+                Fields={"Content-Type": content_type},
+                Conditions=[{"Content-Type": content_type}, ["content-length-range", 1, max_bytes]],
+                ExpiresIn=expires,
+            )
+            out.update(method="POST", url=post["url"], fields=post["fields"], headers={})
+    else:
+        token = signing.dumps({"k": key}, salt=UPLOAD_SIGNING_SALT, compress=True)
+        out["method"] = "PUT"
+        out["url"] = local_url_builder(token) if local_url_builder else token
+
+    out["file_url"] = file_url_builder(key) if file_url_builder else None
+    return out
+
+
+def resolve_local_upload(token: str) -> str:
+    """Clave de storage firmada en el token local; signing.BadSignature si es inválido o expiró."""
+    data = signing.loads(token, salt=UPLOAD_SIGNING_SALT, max_age=settings.UPLOAD_URL_EXPIRES)
+    return data["k"]
+
+
+def write_local_upload(key: str, stream, chunk_size: int = 64 * 1024) -> int:
+    """Escribe el cuerpo del PUT por chunks en el storage local. Lanza ValueError si excede el máximo."""
+    max_bytes = settings.UPLOAD_MAX_BYTES
+    path = default_storage.path(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    size = 0
+    try:
+        with open(path, "wb") as fh:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ValueError(f"El archivo excede el máximo de {max_bytes} bytes.")
+                fh.write(chunk)
+    except BaseException:
+        # Límite excedido, cliente que corta la conexión, worker cancelado: sin archivos a medias
+        with suppress(FileNotFoundError):
+            os.remove(path)
+        raise
+    return size
+
+
+def _sniff_mime(head: bytes, key: str, declared: Optional[str] = None) -> Optional[str]:
+    for magic, mime in _MAGIC:
+        if head.startswith(magic):
+            return mime
+    if head.startswith(b"PK\x03\x04"):
+        # docx/xlsx/zip comparten firma: la extensión decide
+        return mimetypes.guess_type(key)[0] or "application/zip"
+    if declared and declared != "application/octet-stream":
+        return declared
+    return mimetypes.guess_type(key)[0]
+
+
+def compute_file_metadata(key: str) -> Tuple[int, Optional[str], str]:
+    """
+    (tamano, mime, sha256) leyendo el objeto por chunks: nunca carga el archivo completo.
+    En S3 tamaño y Content-Type salen de head_object; el contenido solo se lee para el hash.
+    """
+    declared, size = None, None
+    if _is_s3():
+        head_obj = _s3_call("head_object", key)
+        declared, size = head_obj.get("ContentType"), head_obj["ContentLength"]
+
+    digest = hashlib.sha256()
+    read = 0
+    head = b""
+    for chunk in open_storage_chunks(key, METADATA_CHUNK_SIZE):
+        if not head:
+            head = chunk[:64]
+        digest.update(chunk)
+        read += len(chunk)
+    return (size if size is not None else read), _sniff_mime(head, key, declared), digest.hexdigest()
+
+
+def record_documento_metadata(documento_id: str) -> bool:
+    """Completa tamano/mime/sha256 de un core.documento con storage_key. False si no aplica."""
+    with connection.cursor() as cur:
+        cur.execute("SELECT storage_key FROM core.documento WHERE id = %s", [documento_id])
+        row = cur.fetchone()
+    if not row or not row[0]:
+        return False
+
+    size, mime, sha256 = compute_file_metadata(row[0])
+    with connection.cursor() as cur:
+        cur.execute("""
+            UPDATE core.documento
+               SET tamano = %s, mime = COALESCE(%s, mime), sha256 = %s
+             WHERE id = %s
+        """, [size, mime, sha256, documento_id])
+    return True
+
+
+def attach_upload(documento_id: str, key: str, file_url: str) -> bool:
+    """
+    Asocia una clave subida a un documento existente; archivo_url pasa a ser la URL estable
+    de la API (file_url). False si el documento no existe (o RLS).
+    """
+    with connection.cursor() as cur:
+        cur.execute("""
+            UPDATE core.documento
+               SET storage_key = %s, archivo_url = %s
+             WHERE id = %s
+        """, [key, file_url, documento_id])
+        return cur.rowcount > 0
+
+
+def can_read_file(user_id, key: str) -> bool:
+    """
+    Subidas propias (aún sin documento) o claves de un core.documento visible para el
+    usuario (la consulta corre con su contexto RLS).
+    """
+    if key.startswith(user_upload_prefix(user_id)):
+        return True
+    with connection.cursor() as cur:
+        cur.execute("SELECT EXISTS (SELECT 1 FROM core.documento WHERE storage_key = %s)", [key])
+        return cur.fetchone()[0]
+
+
+def file_download_target(key: str) -> Tuple[Optional[str], Optional[Iterator[bytes]]]:
+    """
+    (url, None) con una URL prefirmada recién generada en S3; (None, chunks) en storage
+    local, para servirlo en streaming. FileNotFoundError si la clave no existe.
+    """
+    if _is_s3():
+        _s3_call("head_object", key)
+        return default_storage.url(key), None
+    return None, open_storage_chunks(key, METADATA_CHUNK_SIZE)
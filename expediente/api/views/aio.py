@@ -0,0 +1,30 @@
+from common.api.params import date_param, versions_param
+from common.api.views.aio import AsyncReadView, bytes_response, error_response
+from expediente.api.services.case_tree_cache import aget_case_tree_cached
+from expediente.api.views.tree import timeline_limit_param
+
+
+class AsyncCaseTreeView(AsyncReadView):
+    """
+    Variante ASGI de CaseTreeView (mismos parámetros y mismo JSON).
+    En un miss de caché, las cuatro secciones y el timeline se consultan en paralelo.
+    """
+
+    async def get(self, request, product_case_id: str):
+        try:
+            timeline_limit = timeline_limit_param(request)
+            versions = versions_param(request)
+            as_of = date_param(request, "as_of")
+        except ValueError as e:
+            return error_response("400.PARAMS_INVALID", str(e), status=400)
+
+        body = await aget_case_tree_cached(
+            product_case_id,
+            user_id=request.user.id,
+            timeline_limit=timeline_limit,
+            versions=versions,
+            as_of=as_of,
+        )
+        if body is None:
+            return error_response("404.NOT_FOUND", "expediente no encontrado", status=404)
+        return bytes_response(body)
@@ -0,0 +1,45 @@
+from django.http import StreamingHttpResponse
+from drf_spectacular.utils import OpenApiResponse, extend_schema
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from common.api.params import VERSIONS_PARAM, date_param, versions_param
+from common.application.db import set_db_context_from_request
+from expediente.api.services.documents_zip_service import iter_documents_zip, list_case_documents
+from expediente.api.views.tree import AS_OF_PARAM
+
+
+@extend_schema(
+    tags=["Expediente"],
+    operation_id="expediente_documents_zip",
+    parameters=[VERSIONS_PARAM, AS_OF_PARAM],
+    responses={
+        (200, "application/zip"): OpenApiResponse(description="ZIP con CG/CP/ANNEX/FORMAT por carpeta"),
+        404: OpenApiResponse(description="Expediente no encontrado"),
+    },
+)
+class CaseDocumentsZipView(APIView):
+    """Descarga todos los documentos del expediente en un ZIP generado en streaming."""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, product_case_id: str):
+        try:
+            versions = versions_param(request)
+            as_of = date_param(request, "as_of")
+        except ValueError as e:
+            return Response({"code": "400.PARAMS_INVALID", "detail": str(e)}, status=400)
+
+        # La lista se resuelve antes de empezar a responder (404 posible);
+        # los archivos se leen del storage recién mientras se envía el ZIP.
+        set_db_context_from_request(request)
+        documents = list_case_documents(product_case_id, versions=versions, as_of=as_of)
+        if documents is None:
+            return Response({"detail": "expediente no encontrado"}, status=404)
+
+        response = StreamingHttpResponse(iter_documents_zip(documents), content_type="application/zip")
+        response["Content-Disposition"] = f'attachment; filename="expediente-{product_case_id}.zip"'
+        # nginx: no bufferizar el stream
+        response["X-Accel-Buffering"] = "no"
+        return response
@@ -0,0 +1,57 @@
+from uuid import UUID
+
+from drf_spectacular.utils import OpenApiParameter, OpenApiResponse, extend_schema
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from common.api.pagination import KeysetPagination
+from common.application.db import set_db_context_from_request
+from expediente.api.services.inbox_service import list_case_inbox
+
+
+@extend_schema(
+    tags=["Expediente"],
+    operation_id="expediente_inbox",
+    parameters=[
+        OpenApiParameter("company_id", str, required=False, description="Empresa (sr_company_id)"),
+        OpenApiParameter("status", str, required=False,
+                         description="Estado del expediente; admite varios separados por coma"),
+        OpenApiParameter("limit", int, required=False, description="Default 50, máx 200"),
+        OpenApiParameter("cursor", str, required=False, description="next_cursor de la página anterior"),
+    ],
+    responses={200: OpenApiResponse(description="{items: [expedientes con contadores], next_cursor}")},
+)
+class CaseInboxView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        pager = KeysetPagination(key_size=2)
+        try:
+            limit, after = pager.parse(request)
+        except ValueError as e:
+            return Response({"code": "400.PARAMS_INVALID", "detail": str(e)}, status=400)
+
+        # workflow.case no tiene (aún) una columna de asignación conocida: mejor rechazar el
+        # filtro que devolver la bandeja completa como si se hubiera aplicado
+        if request.GET.get("assignee"):
+            return Response({"code": "400.PARAMS_INVALID", "detail": "El filtro assignee no está disponible."},
+                            status=400)
+
+        company_id = request.GET.get("company_id") or None
+        try:
+            if company_id:
+                UUID(company_id)
+        except ValueError:
+            return Response({"code": "400.ID_INVALID", "detail": "company_id debe ser UUID."}, status=400)
+
+        statuses = [s.strip() for s in (request.GET.get("status") or "").split(",") if s.strip()]
+
+        set_db_context_from_request(request)
+        items, next_key = list_case_inbox(
+            company_id=company_id,
+            statuses=statuses or None,
+            limit=limit,
+            after=after,
+        )
+        return pager.get_paginated_response(items, next_key)
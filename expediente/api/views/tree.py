@@ -1,119 +1,136 @@
-from django.db import connection
+from uuid import UUID
+
+from django.http import HttpResponse
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, OpenApiResponse, extend_schema
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from common.api.pagination import KeysetPagination
+from common.api.params import VERSIONS_PARAM, date_param, int_param, versions_param
 from common.application.db import set_db_context_from_request
+from expediente.api.services.case_tree_cache import get_case_tree_cached
+from expediente.api.services.case_tree_service import TREE_TIMELINE_LIMIT, get_case_trees_json
+from expediente.api.services.timeline_service import get_case_timeline_page
+
+MAX_BATCH_CASES = 50
+MAX_TREE_TIMELINE_LIMIT = 100
+
+
+def timeline_limit_param(request) -> int:
+    return int_param(request, "timeline_limit", TREE_TIMELINE_LIMIT, 1, MAX_TREE_TIMELINE_LIMIT)
+
 
+AS_OF_PARAM = OpenApiParameter(
+    "as_of", OpenApiTypes.DATE, required=False,
+    description="Solo documentos cuyo vínculo estaba vigente en esa fecha (vigencia @> as_of)",
+)
 
+
+@extend_schema(
+    tags=["Expediente"],
+    operation_id="expediente_case_tree",
+    parameters=[
+        OpenApiParameter("timeline_limit", int, required=False,
+                         description=f"Recibos recientes embebidos (default {TREE_TIMELINE_LIMIT}); "
+                                     "el resto vía /timeline?cursor=timeline_next_cursor"),
+        VERSIONS_PARAM,
+        AS_OF_PARAM,
+    ],
+    responses={
+        200: OpenApiResponse(description="Árbol del expediente (header, secciones, timeline)"),
+        404: OpenApiResponse(description="Expediente no encontrado"),
+    },
+)
 class CaseTreeView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, product_case_id: str):
-        set_db_context_from_request(request)
+        try:
+            timeline_limit = timeline_limit_param(request)
+            versions = versions_param(request)
+            as_of = date_param(request, "as_of")
+        except ValueError as e:
+            return Response({"code": "400.PARAMS_INVALID", "detail": str(e)}, status=400)
 
-        with connection.cursor() as cur:
-            cur.execute(
-                """
-                SELECT p.id AS product_id, vp.id AS version_id, p.nombre, vp.estado, vp.version
-                FROM core.product_case pc
-                JOIN core.product p ON p.id = pc.product_id
-                LEFT JOIN core.version_product vp ON vp.idproduct = p.id
-                WHERE pc.id=%s
-                ORDER BY vp.created_at DESC
-                LIMIT 1
-            """,
-                [product_case_id],
-            )
-            header = cur.fetchone()
-            if not header:
-                return Response({"detail": "expediente no encontrado"}, status=404)
-            product_id, version_id, nombre, estado, nro_version = header
-
-            def fetch_docs(sql: str, params):
-                cur.execute(sql, params)
-                cols = [c[0] for c in cur.description]
-                return [dict(zip(cols, r)) for r in cur.fetchall()]
-
-            cg = fetch_docs(
-                """
-                SELECT l.id link_id, c.id cg_id, d.id doc_id, c.logical_code, c.version, l.estado, l.vigencia,
-                       d.nombre, d.mime, d.archivo_url, d.tamano, d.referencia_normativa
-                FROM link.vp_to_cg l
-                JOIN core.cg c ON c.id = l.idcg
-                JOIN core.documento d ON d.id = c.documento_id
-                WHERE l.idversionproduct=%s
-                ORDER BY c.logical_code, c.version
-            """,
-                [version_id],
-            )
-
-            cp = fetch_docs(
-                """
-                SELECT l.id link_id, c.id cp_id, d.id doc_id, c.logical_code, c.version, l.estado, l.vigencia,
-                       d.nombre, d.mime, d.archivo_url, d.tamano, c.genera_prima
-                FROM link.vp_to_cp l
-                JOIN core.cp c ON c.id = l.idcp
-                JOIN core.documento d ON d.id = c.documento_id
-                WHERE l.idversionproduct=%s
-                ORDER BY c.logical_code, c.version
-            """,
-                [version_id],
-            )
-
-            annex = fetch_docs(
-                """
-                SELECT l.id link_id, a.id annex_id, d.id doc_id, a.logical_code, a.version, l.estado, l.vigencia,
-                       d.nombre, d.mime, d.archivo_url, d.tamano, a.genera_prima, a.tipo
-                FROM link.vp_to_annex l
-                JOIN core.annex a ON a.id = l.idannex
-                JOIN core.documento d ON d.id = a.documento_id
-                WHERE l.idversionproduct=%s
-                ORDER BY a.logical_code, a.version
-            """,
-                [version_id],
-            )
-
-            fmt = fetch_docs(
-                """
-                SELECT l.id link_id, f.id format_id, d.id doc_id, f.logical_code, f.version, l.estado, l.vigencia,
-                       d.nombre, d.mime, d.archivo_url, d.tamano, f.tipo
-                FROM link.vp_to_format l
-                JOIN core.format f ON f.id = l.idformat
-                JOIN core.documento d ON d.id = f.documento_id
-                WHERE l.idversionproduct=%s
-                ORDER BY f.logical_code, f.version
-            """,
-                [version_id],
-            )
-
-            receipts = fetch_docs(
-                """
-                SELECT id, tipo, actor_id, created_at, doc_id, meta
-                FROM workflow.receipt
-                WHERE case_id IN (
-                    SELECT id FROM workflow.case WHERE product_case_id=%s
-                )
-                ORDER BY created_at DESC
-            """,
-                [product_case_id],
-            )
-
-        return Response(
-            {
-                "header": {
-                    "product_id": str(product_id),
-                    "version_id": str(version_id),
-                    "nombre": nombre,
-                    "estado": estado,
-                    "nro_version": nro_version,
-                },
-                "sections": {
-                    "CG": cg,
-                    "CP": cp,
-                    "ANNEX": annex,
-                    "FORMAT": fmt,
-                },
-                "timeline": receipts,
-            }
+        # Cacheado por (expediente, usuario); el contexto RLS solo se carga si hay que consultar
+        body = get_case_tree_cached(
+            product_case_id,
+            user_id=request.user.id,
+            timeline_limit=timeline_limit,
+            load_context=lambda: set_db_context_from_request(request),
+            versions=versions,
+            as_of=as_of,
         )
+        if body is None:
+            return Response({"code": "404.NOT_FOUND", "detail": "expediente no encontrado"}, status=404)
+        # JSON ya renderizado por Postgres: se envía sin pasar por el renderer de DRF
+        return HttpResponse(body, content_type="application/json")
+
+
+@extend_schema(
+    tags=["Expediente"],
+    operation_id="expediente_case_tree_batch",
+    request={
+        "application/json": {
+            "type": "object",
+            "properties": {
+                "ids": {"type": "array", "items": {"type": "string", "format": "uuid"},
+                        "minItems": 1, "maxItems": MAX_BATCH_CASES},
+            },
+            "required": ["ids"],
+        }
+    },
+    parameters=[OpenApiParameter("timeline_limit", int, required=False), VERSIONS_PARAM, AS_OF_PARAM],
+    responses={200: OpenApiResponse(description="{items: {product_case_id: árbol}}")},
+)
+class CaseTreeBatchView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        ids = (request.data or {}).get("ids")
+        if not isinstance(ids, list) or not ids:
+            return Response({"code": "400.MISSING", "detail": "ids requerido."}, status=400)
+        if len(ids) > MAX_BATCH_CASES:
+            return Response({"code": "400.TOO_MANY",
+                             "detail": f"Máximo {MAX_BATCH_CASES} expedientes por llamada."}, status=400)
+        try:
+            ids = [str(UUID(str(x))) for x in ids]
+        except ValueError:
+            return Response({"code": "400.ID_INVALID", "detail": "ids debe contener UUIDs."}, status=400)
+        try:
+            timeline_limit = timeline_limit_param(request)
+            versions = versions_param(request)
+            as_of = date_param(request, "as_of")
+        except ValueError as e:
+            return Response({"code": "400.PARAMS_INVALID", "detail": str(e)}, status=400)
+
+        set_db_context_from_request(request)
+        body = get_case_trees_json(ids, timeline_limit=timeline_limit, versions=versions, as_of=as_of)
+        return HttpResponse(body, content_type="application/json")
+
+
+@extend_schema(
+    tags=["Expediente"],
+    operation_id="expediente_case_timeline",
+    parameters=[
+        OpenApiParameter("limit", int, required=False, description="Default 50, máx 200"),
+        OpenApiParameter("cursor", str, required=False,
+                         description="next_cursor de la página anterior (o timeline_next_cursor del árbol)"),
+    ],
+    responses={200: OpenApiResponse(description="{items: [recibos], next_cursor}")},
+)
+class CaseTimelineView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, product_case_id: str):
+        pager = KeysetPagination(key_size=2)
+        try:
+            limit, after = pager.parse(request)
+        except ValueError as e:
+            return Response({"code": "400.PARAMS_INVALID", "detail": str(e)}, status=400)
+
+        set_db_context_from_request(request)
+        items, next_key = get_case_timeline_page(product_case_id, limit=limit, after=after)
+        return pager.get_paginated_response(items, next_key)
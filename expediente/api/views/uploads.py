@@ -0,0 +1,164 @@
+import mimetypes
+from uuid import UUID
+
+from django.core import signing
+from django.http import HttpResponseRedirect, StreamingHttpResponse
+from django.urls import reverse
+from drf_spectacular.utils import OpenApiResponse, extend_schema
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from common.application.db import set_db_context_from_request
+from expediente.api.services.upload_service import (
+    attach_upload,
+    can_read_file,
+    create_upload,
+    file_download_target,
+    resolve_local_upload,
+    user_upload_prefix,
+    write_local_upload,
+)
+from expediente.infrastructure.tasks import enqueue_documento_metadata
+
+
+def _file_url_builder(request):
+    """URL estable (absoluta) de descarga: la que se guarda en core.documento.archivo_url."""
+    return lambda key: request.build_absolute_uri(reverse("expediente-file", args=[key]))
+
+
+@extend_schema(
+    tags=["Expediente"],
+    operation_id="expediente_upload_create",
+    request={
+        "application/json": {
+            "type": "object",
+            "properties": {
+                "nombre": {"type": "string"},
+                "content_type": {"type": "string"},
+                "method": {"type": "string", "enum": ["post", "put"]},
+            },
+            "required": ["nombre"],
+        }
+    },
+    responses={201: OpenApiResponse(description="{key, method, url, fields, headers, expires_in, file_url}")},
+)
+class UploadCreateView(APIView):
+    """Reserva una clave en storage y devuelve la URL prefirmada para subir el archivo directo."""
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        data = request.data or {}
+        nombre = (data.get("nombre") or "").strip()
+        if not nombre:
+            return Response({"code": "400.MISSING", "detail": "nombre requerido."}, status=400)
+        method = (data.get("method") or "post").lower()
+        if method not in ("post", "put"):
+            return Response({"code": "400.PARAMS_INVALID", "detail": "method debe ser 'post' o 'put'."}, status=400)
+        content_type = (data.get("content_type") or "application/octet-stream").strip()
+
+        upload = create_upload(
+            request.user.id, nombre, content_type, method=method,
+            local_url_builder=lambda token: request.build_absolute_uri(
+                reverse("expediente-upload-local", args=[token])),
+            file_url_builder=_file_url_builder(request),
+        )
+        return Response(upload, status=201)
+
+
+@extend_schema(
+    tags=["Expediente"],
+    operation_id="expediente_upload_complete",
+    request={
+        "application/json": {
+            "type": "object",
+            "properties": {
+                "key": {"type": "string"},
+                "documento_id": {"type": "string", "format": "uuid"},
+            },
+            "required": ["key", "documento_id"],
+        }
+    },
+    responses={202: OpenApiResponse(description="Metadatos encolados"),
+               404: OpenApiResponse(description="Documento no encontrado")},
+)
+class UploadCompleteView(APIView):
+    """Asocia la clave subida a un core.documento y encola la captura de tamano/mime/sha256."""
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        data = request.data or {}
+        key = data.get("key") or ""
+        if not key.startswith(user_upload_prefix(request.user.id)):
+            return Response({"code": "400.KEY_INVALID", "detail": "key no pertenece al usuario."}, status=400)
+        try:
+            documento_id = str(UUID(str(data.get("documento_id"))))
+        except ValueError:
+            return Response({"code": "400.ID_INVALID", "detail": "documento_id debe ser UUID."}, status=400)
+
+        set_db_context_from_request(request)
+        if not attach_upload(documento_id, key, _file_url_builder(request)(key)):
+            return Response({"detail": "documento no encontrado"}, status=404)
+        enqueue_documento_metadata([documento_id], request.user.id)
+        return Response({"documento_id": documento_id, "status": "queued"}, status=202)
+
+
+@extend_schema(exclude=True)
+class LocalUploadView(APIView):
+    """
+    Stand-in local de la URL prefirmada (sin S3): PUT con el cuerpo crudo del archivo.
+    El token firmado es la autorización, igual que una URL prefirmada de S3.
+    """
+
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def put(self, request, token: str):
+        try:
+            key = resolve_local_upload(token)
+        except signing.BadSignature:
+            return Response({"code": "403.UPLOAD_TOKEN", "detail": "URL de subida inválida o expirada."},
+                            status=403)
+        try:
+            size = write_local_upload(key, request)
+        except ValueError as e:
+            return Response({"code": "413.TOO_LARGE", "detail": str(e)}, status=413)
+        return Response({"key": key, "size": size}, status=201)
+
+
+@extend_schema(
+    tags=["Expediente"],
+    operation_id="expediente_file",
+    responses={302: OpenApiResponse(description="Redirect a una URL prefirmada recién generada (S3)"),
+               200: OpenApiResponse(description="Contenido del archivo (storage local)"),
+               404: OpenApiResponse(description="Archivo no encontrado")},
+)
+class FileDownloadView(APIView):
+    """
+    URL estable de un archivo en storage (archivo_url): la URL firmada se genera en cada lectura.
+    Acceso: subidas propias o documentos visibles con el contexto RLS del usuario.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, key: str):
+        not_found = Response({"code": "404.NOT_FOUND", "detail": "archivo no encontrado"}, status=404)
+        if ".." in key.split("/"):
+            return not_found
+
+        set_db_context_from_request(request)
+        if not can_read_file(request.user.id, key):
+            return not_found
+        try:
+            url, chunks = file_download_target(key)
+        except FileNotFoundError:
+            return not_found
+        if url:
+            return HttpResponseRedirect(url)
+        filename = key.rsplit("/", 1)[-1]
+        response = StreamingHttpResponse(
+            chunks, content_type=mimetypes.guess_type(filename)[0] or "application/octet-stream")
+        response["Content-Disposition"] = f'inline; filename="{filename}"'
+        return response
@@ -1 +1,34 @@
-﻿# expediente infra tasks (stub)
+﻿# expediente infra tasks (RQ jobs)
+from typing import Iterable
+
+import django_rq
+from django.core.exceptions import SuspiciousFileOperation
+
+from common.application.db import set_db_context_for_user
+from expediente.api.services.upload_service import record_documento_metadata
+
+# Metadatos de archivos subidos: no bloquea al usuario, va a la cola 'low'
+METADATA_QUEUE = "low"
+METADATA_JOB_TIMEOUT = 60 * 10
+
+
+def capture_documento_metadata_job(documento_ids: list, user_id: int) -> dict:
+    """Registra tamano, mime y sha256 de cada documento leyendo su objeto en storage por chunks."""
+    set_db_context_for_user(user_id)
+    done, missing = [], []
+    for doc_id in documento_ids:
+        try:
+            ok = record_documento_metadata(doc_id)
+        except (FileNotFoundError, SuspiciousFileOperation):
+            ok = False
+        (done if ok else missing).append(str(doc_id))
+    return {"done": done, "missing": missing}
+
+
+def enqueue_documento_metadata(documento_ids: Iterable, user_id: int):
+    ids = [str(x) for x in documento_ids]
+    if not ids:
+        return None
+    return django_rq.get_queue(METADATA_QUEUE).enqueue(
+        capture_documento_metadata_job, ids, user_id, job_timeout=METADATA_JOB_TIMEOUT,
+    )
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from expediente.api.services.case_tree_cache import NOTIFY_CHANNEL, invalidate_case_tree
+
+
+class Command(BaseCommand):
+    help = (
+        "Escucha NOTIFY de Postgres (triggers en link.vp_to_*, core.documento, workflow.receipt) "
+        "e invalida la caché del árbol de los expedientes afectados."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--timeout", type=float, default=30.0,
+                            help="Segundos de espera por lote de notificaciones (keepalive).")
+
+    def handle(self, *args, **opts):
+        connection.ensure_connection()
+        connection.set_autocommit(True)
+        pg = connection.connection  # psycopg 3
+        pg.execute(f"LISTEN {NOTIFY_CHANNEL}")
+        self.stdout.write(self.style.SUCCESS(f"Escuchando '{NOTIFY_CHANNEL}'..."))
+
+        while True:
+            for n in pg.notifies(timeout=opts["timeout"]):
+                pc = (n.payload or "").strip()
+                if not pc:
+                    continue
+                invalidate_case_tree(pc)
+                self.stdout.write(f"invalidado {pc}")
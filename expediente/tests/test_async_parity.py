@@ -0,0 +1,39 @@
+# products-backend/expediente/tests/test_async_parity.py
+from unittest.mock import AsyncMock, patch
+
+from common.tests.parity import AsyncParityTestCase
+from expediente.api.views.aio import AsyncCaseTreeView
+from expediente.api.views.tree import CaseTreeView
+
+CASE_ID = "00000000-0000-4000-8000-0000000000a1"
+TREE = b'{"header": {"id": "00000000-0000-4000-8000-0000000000a1"}, "sections": {}}'
+
+
+class CaseTreeParityTests(AsyncParityTestCase):
+    def _both(self, params, body):
+        with patch("expediente.api.views.tree.get_case_tree_cached", return_value=body) as sync_fn, \
+                patch("expediente.api.views.aio.aget_case_tree_cached", new=AsyncMock(return_value=body)) as async_fn:
+            sync = self.sync_json(CaseTreeView, "get", f"/api/expediente/{CASE_ID}/tree", params,
+                                  product_case_id=CASE_ID)
+            aio = self.async_json(AsyncCaseTreeView, "get", f"/api/aio/expediente/{CASE_ID}/tree", params,
+                                  product_case_id=CASE_ID)
+        return sync, aio, sync_fn, async_fn
+
+    def test_mismos_argumentos_y_respuesta(self):
+        params = {"timeline_limit": "5", "versions": "current", "as_of": "2025-01-01"}
+        sync, aio, sync_fn, async_fn = self._both(params, TREE)
+        self.assertEqual(sync, aio)
+        sync_kwargs = dict(sync_fn.call_args.kwargs)
+        sync_kwargs.pop("load_context")
+        async_kwargs = dict(async_fn.await_args.kwargs)
+        self.assertEqual(str(sync_kwargs.pop("user_id")), str(async_kwargs.pop("user_id")))
+        self.assertEqual(sync_kwargs, async_kwargs)
+
+    def test_no_encontrado(self):
+        sync, aio, _, _ = self._both({}, None)
+        self.assertEqual(sync, aio)
+        self.assertEqual(sync[0], 404)
+
+    def test_parametros_invalidos(self):
+        sync, aio, _, _ = self._both({"versions": "x"}, TREE)
+        self.assertEqual(sync, aio)
@@ -0,0 +1,41 @@
+# products-backend/expediente/tests/test_documents_zip.py
+import io
+import zipfile
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from expediente.api.services.documents_zip_service import iter_documents_zip
+
+
+def _doc(logical_code, storage_key=None, archivo_url=None):
+    return {"section": "CP", "doc_id": logical_code, "logical_code": logical_code, "version": 1,
+            "nombre": logical_code, "storage_key": storage_key, "archivo_url": archivo_url}
+
+
+class DocumentsZipTests(SimpleTestCase):
+    def _zip(self, documents):
+        return zipfile.ZipFile(io.BytesIO(b"".join(iter_documents_zip(documents))))
+
+    @patch("expediente.api.services.documents_zip_service.open_storage_chunks")
+    def test_storage_por_chunks(self, chunks):
+        chunks.return_value = iter([b"sto", b"rage"])
+        zf = self._zip([_doc("A", storage_key="uploads/u5/x/a.pdf")])
+
+        self.assertEqual(zf.read("CP/A_v1 - A.pdf"), b"storage")
+        chunks.assert_called_once_with("uploads/u5/x/a.pdf", 256 * 1024)
+        self.assertNotIn("FALTANTES.txt", zf.namelist())
+
+    @patch("expediente.api.services.documents_zip_service.open_storage_chunks", side_effect=FileNotFoundError)
+    def test_faltantes(self, chunks):
+        zf = self._zip([
+            _doc("A", storage_key="uploads/u5/x/a.pdf"),
+            _doc("B", archivo_url="https://files.example.com/b.pdf"),
+            _doc("C"),
+        ])
+        faltantes = zf.read("FALTANTES.txt").decode()
+        self.assertIn("A\tv1\tA\tno encontrado", faltantes)
+        # La URL externa no se descarga: solo se lista
+        self.assertIn("B\tv1\tB\tsin archivo en storage\thttps://files.example.com/b.pdf", faltantes)
+        self.assertIn("C\tv1\tC\tsin archivo en storage\t-", faltantes)
+        chunks.assert_called_once_with("uploads/u5/x/a.pdf", 256 * 1024)
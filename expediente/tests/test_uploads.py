@@ -0,0 +1,119 @@
+# products-backend/expediente/tests/test_uploads.py
+import io
+import os
+import tempfile
+from unittest.mock import MagicMock, patch
+
+from botocore.exceptions import ClientError
+
+from django.test import SimpleTestCase, override_settings
+
+from expediente.api.services.upload_service import (
+    compute_file_metadata,
+    create_upload,
+    open_storage_chunks,
+    user_upload_prefix,
+    write_local_upload,
+)
+
+
+class BrokenStream(io.BytesIO):
+    """Cuerpo que se corta a mitad de la subida."""
+
+    def read(self, size=-1):
+        data = super().read(size)
+        if not data:
+            raise ConnectionResetError("cliente desconectado")
+        return data
+
+
+@override_settings(UPLOAD_MAX_BYTES=10)
+class WriteLocalUploadTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "uploads", "5", "a.pdf")
+        patcher = patch("expediente.api.services.upload_service.default_storage")
+        self.storage = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.storage.path.return_value = self.path
+
+    def test_ok(self):
+        self.assertEqual(write_local_upload("uploads/5/a.pdf", io.BytesIO(b"abc")), 3)
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_excede_maximo_no_deja_archivo(self):
+        with self.assertRaises(ValueError):
+            write_local_upload("uploads/5/a.pdf", io.BytesIO(b"x" * 20), chunk_size=4)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_conexion_cortada_no_deja_archivo(self):
+        with self.assertRaises(ConnectionResetError):
+            write_local_upload("uploads/5/a.pdf", BrokenStream(b"abc"))
+        self.assertFalse(os.path.exists(self.path))
+
+
+class CreateUploadTests(SimpleTestCase):
+    @patch("expediente.api.services.upload_service._is_s3", return_value=False)
+    def test_file_url_estable(self, _):
+        upload = create_upload(
+            5, "póliza final.pdf", "application/pdf", method="put",
+            local_url_builder=lambda token: f"http://testserver/up/{token}",
+            file_url_builder=lambda key: f"http://testserver/files/{key}",
+        )
+        self.assertTrue(upload["key"].startswith(user_upload_prefix(5)))
+        self.assertEqual(upload["file_url"], f"http://testserver/files/{upload['key']}")
+
+
+class FakeBody:
+    """StreamingBody mínimo: registra los chunks pedidos."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.chunk_sizes = []
+        self.closed = False
+
+    def iter_chunks(self, chunk_size):
+        self.chunk_sizes.append(chunk_size)
+        for i in range(0, len(self.data), chunk_size):
+            yield self.data[i:i + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+
+@patch("expediente.api.services.upload_service._is_s3", return_value=True)
+@patch("expediente.api.services.upload_service.default_storage")
+class S3StreamingTests(SimpleTestCase):
+    def _client(self, storage, data=b"%PDF-1.7 contenido", content_type="application/octet-stream"):
+        client = MagicMock()
+        client.head_object.return_value = {"ContentLength": len(data), "ContentType": content_type}
+        self.body = FakeBody(data)
+        client.get_object.return_value = {"Body": self.body}
+        storage.connection.meta.client = client
+        storage.bucket_name = "bucket"
+        return client
+
+    def test_metadata_sin_default_storage_open(self, storage, _):
+        client = self._client(storage)
+        size, mime, sha256 = compute_file_metadata("uploads/u5/a.pdf")
+        self.assertEqual((size, mime), (18, "application/pdf"))
+        self.assertEqual(len(sha256), 64)
+        storage.open.assert_not_called()
+        client.get_object.assert_called_once_with(Bucket="bucket", Key="uploads/u5/a.pdf")
+        self.assertTrue(self.body.closed)
+
+    def test_metadata_usa_content_type_declarado(self, storage, _):
+        self._client(storage, data=b"texto plano", content_type="text/csv")
+        self.assertEqual(compute_file_metadata("uploads/u5/a.bin")[1], "text/csv")
+
+    def test_chunks(self, storage, _):
+        self._client(storage, data=b"x" * 10)
+        self.assertEqual(list(open_storage_chunks("k", 4)), [b"xxxx", b"xxxx", b"xx"])
+        self.assertEqual(self.body.chunk_sizes, [4])
+
+    def test_clave_inexistente(self, storage, _):
+        client = self._client(storage)
+        client.get_object.side_effect = ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+        with self.assertRaises(FileNotFoundError):
+            open_storage_chunks("k", 4)
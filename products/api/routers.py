@@ -1,7 +1,18 @@
 ﻿from django.urls import path
-from .views.initial_product import InitialProductCreateAPIView
+from .views.initial_product import (InitialProductCreateAPIView,
+                                    InitialProductJobStatusAPIView,
+                                    InitialProductSubmitAsyncAPIView)
+from .views.links import RaLinksAPIView, VersionLinksAPIView
 
 urlpatterns = [
     path("wizard/products/initial", InitialProductCreateAPIView.as_view(),
          name="wizard-products-initial"),
+    path("wizard/products/initial/async", InitialProductSubmitAsyncAPIView.as_view(),
+         name="wizard-products-initial-async"),
+    path("wizard/products/initial/jobs/<str:job_id>", InitialProductJobStatusAPIView.as_view(),
+         name="wizard-products-initial-job"),
+    path("products/versions/<uuid:version_id>/links", VersionLinksAPIView.as_view(),
+         name="products-version-links"),
+    path("products/ra/<uuid:ra_id>/links", RaLinksAPIView.as_view(),
+         name="products-ra-links"),
 ]
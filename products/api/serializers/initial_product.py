@@ -1,9 +1,19 @@
 from rest_framework import serializers
 
+from expediente.api.services.upload_service import user_upload_prefix
+
 
 class FileRefSer(serializers.Serializer):
     nombre = serializers.CharField()
     url = serializers.URLField()
+    # Clave en storage devuelta por POST /expediente/uploads (subida prefirmada)
+    key = serializers.CharField(required=False)
+
+    def validate_key(self, value):
+        request = self.context.get("request")
+        if request is not None and not value.startswith(user_upload_prefix(request.user.id)):
+            raise serializers.ValidationError("key no pertenece al usuario.")
+        return value
 
 
 class ProductSer(serializers.Serializer):
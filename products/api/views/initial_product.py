@@ -1,14 +1,50 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.reverse import reverse
 from ..serializers.initial_product import InitialProductPayloadSer
+from common.application.idempotency import IdempotencyInFlight
 from products.application.use_cases.create_initial_product import create_initial_product
+from products.infrastructure.tasks import enqueue_initial_product, get_submission_status
 
 
 class InitialProductCreateAPIView(APIView):
     def post(self, request, *args, **kwargs):
-        ser = InitialProductPayloadSer(data=request.data)
+        ser = InitialProductPayloadSer(data=request.data, context={"request": request})
         ser.is_valid(raise_exception=True)
-        result = create_initial_product(
-            payload=ser.validated_data, user=request.user)
+        try:
+            result = create_initial_product(
+                payload=ser.validated_data, user=request.user)
+        except IdempotencyInFlight:
+            return Response({"code": "409.IDEMPOTENCY_IN_FLIGHT",
+                             "detail": "Ya hay un envío en curso con esta idempotency_key; reintente."},
+                            status=status.HTTP_409_CONFLICT)
         return Response(result, status=status.HTTP_201_CREATED)
+
+
+class InitialProductSubmitAsyncAPIView(APIView):
+    """
+    Envío asíncrono: valida el payload, encola la escritura en RQ ('high') y responde 202.
+    El avance y los ids resultantes se consultan en el endpoint de estado.
+    """
+
+    def post(self, request, *args, **kwargs):
+        ser = InitialProductPayloadSer(data=request.data, context={"request": request})
+        ser.is_valid(raise_exception=True)
+        job = enqueue_initial_product(dict(ser.validated_data), request.user.id)
+        return Response(
+            {
+                "job_id": job.id,
+                "status": "queued",
+                "status_url": reverse("wizard-products-initial-job", args=[job.id], request=request),
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+
+class InitialProductJobStatusAPIView(APIView):
+    def get(self, request, job_id: str, *args, **kwargs):
+        data = get_submission_status(job_id, request.user.id)
+        if data is None:
+            return Response({"detail": "job no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(data)
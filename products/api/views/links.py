@@ -0,0 +1,51 @@
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter, OpenApiResponse, extend_schema
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from common.api.params import VERSIONS_PARAM, date_param, versions_param
+from common.application.db import set_db_context_from_request
+from products.infrastructure.repositories import get_ra_links, get_version_links
+
+_AS_OF_PARAM = OpenApiParameter(
+    "as_of", OpenApiTypes.DATE, required=False,
+    description="Solo vínculos vigentes en esa fecha (vigencia @> as_of). Sin valor: todos.",
+)
+
+
+@extend_schema(
+    tags=["Products"],
+    operation_id="products_version_links",
+    parameters=[
+        _AS_OF_PARAM,
+        VERSIONS_PARAM,
+    ],
+    responses={200: OpenApiResponse(description="{CG: [...], CP: [...], ANNEX: [...], FORMAT: [...]}")},
+)
+class VersionLinksAPIView(APIView):
+    def get(self, request, version_id):
+        try:
+            versions = versions_param(request)
+            as_of = date_param(request, "as_of")
+        except ValueError as e:
+            return Response({"code": "400.PARAMS_INVALID", "detail": str(e)}, status=400)
+
+        set_db_context_from_request(request)
+        return Response(get_version_links(version_id, as_of=as_of, versions=versions))
+
+
+@extend_schema(
+    tags=["Products"],
+    operation_id="products_ra_links",
+    parameters=[_AS_OF_PARAM],
+    responses={200: OpenApiResponse(description="{CP: [{id, vigencia}], ANNEX: [{id, vigencia}]}")},
+)
+class RaLinksAPIView(APIView):
+    def get(self, request, ra_id):
+        try:
+            as_of = date_param(request, "as_of")
+        except ValueError as e:
+            return Response({"code": "400.PARAMS_INVALID", "detail": str(e)}, status=400)
+
+        set_db_context_from_request(request)
+        return Response(get_ra_links(ra_id, as_of=as_of))
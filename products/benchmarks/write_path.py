@@ -0,0 +1,185 @@
+# products-backend/products/benchmarks/write_path.py
+import re
+import uuid
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional
+
+from django.db import connection, transaction
+
+from products.application.use_cases.create_initial_product import _create_initial_product, create_initial_product
+
+# ---------------------------------------------------------------------------
+# Benchmark de escritura del wizard (create_initial_product)
+# ---------------------------------------------------------------------------
+# Payloads sintéticos con tamaño parametrizable (CPs, anexos, RAs; formatos fijos) sobre
+# la taxonomía cargada con `manage.py ramos_seed_dataset`. Los archivos van sin 'key'
+# (no pasan por expediente/uploads ni encolan metadata).
+#
+# Modos:
+#   - rollback (default): el plan de escritura de _create_initial_product en una
+#     transacción que se revierte; la base queda igual y las corridas son comparables.
+#     Igual que en producción, el atomic del caso de uso queda como SAVEPOINT dentro de
+#     la transacción externa.
+#   - commit: create_initial_product completo (idempotencia Redis + common.idempotency),
+#     confirma y deja los productos creados. Con duplicates=K, K submitters envían la
+#     misma idempotency_key a la vez: mide la espera del single-flight y debe dar un
+#     resultado distinto por grupo.
+
+_RE_SIZE = re.compile(r"^(\d+)x(\d+)x(\d+)$")
+
+_SQL_LEAVES = """
+    SELECT id FROM ramo.node
+    WHERE kind = 'OPTION' AND is_active
+    ORDER BY id LIMIT %s
+    """
+
+_SQL_CHAIN = """
+    WITH RECURSIVE chain AS (
+      SELECT id, parent_id, 0 AS lvl FROM ramo.node WHERE id = %s
+      UNION ALL
+      SELECT n.id, n.parent_id, c.lvl + 1 FROM ramo.node n JOIN chain c ON n.id = c.parent_id
+    )
+    SELECT id FROM chain ORDER BY lvl DESC
+    """
+
+_SQL_CATALOG_ITEM = """
+    SELECT id FROM catalog.item
+    WHERE item_type = %s AND is_active
+    ORDER BY id LIMIT 1
+    """
+
+
+@dataclass(frozen=True)
+class WizardSize:
+    cps: int
+    annexes: int
+    ras: int
+
+    @classmethod
+    def parse(cls, text: str) -> "WizardSize":
+        """'CPxANEXOSxRAS', p.ej. '5x5x2'."""
+        m = _RE_SIZE.match(text.strip())
+        if not m:
+            raise ValueError(f"Tamaño inválido '{text}': usar CPxANEXOSxRAS (p.ej. 5x5x2).")
+        size = cls(*(int(g) for g in m.groups()))
+        if size.cps < 1:
+            raise ValueError("Se necesita al menos una CP.")
+        return size
+
+    @property
+    def label(self) -> str:
+        return f"{self.cps}cp/{self.annexes}anx/{self.ras}ra"
+
+
+@dataclass
+class WizardSamples:
+    ramo_paths: List[List[str]]
+    moneda_id: Optional[str]
+    tipo_estudio_id: Optional[str]
+
+
+def _path_to(cur, node_id) -> List[str]:
+    cur.execute(_SQL_CHAIN, [node_id])
+    return [str(r[0]) for r in cur.fetchall()]
+
+
+def _catalog_item(cur, item_type: str) -> Optional[str]:
+    cur.execute(_SQL_CATALOG_ITEM, [item_type])
+    row = cur.fetchone()
+    return str(row[0]) if row else None
+
+
+def load_samples(paths: int = 20) -> WizardSamples:
+    with connection.cursor() as cur:
+        cur.execute(_SQL_LEAVES, [paths])
+        leaves = [r[0] for r in cur.fetchall()]
+        return WizardSamples(
+            ramo_paths=[_path_to(cur, leaf) for leaf in leaves],
+            moneda_id=_catalog_item(cur, "MONEDA"),
+            tipo_estudio_id=_catalog_item(cur, "TIPO_ESTUDIO_RA"),
+        )
+
+
+def _file(name: str) -> Dict[str, str]:
+    return {"nombre": f"{name}.pdf", "url": f"https://bench.invalid/{name}.pdf"}
+
+
+def build_payload(size: WizardSize, samples: WizardSamples, company_id: str, idempotency_key: str) -> Dict[str, Any]:
+    """Payload como el que deja InitialProductPayloadSer (validated_data)."""
+    if not samples.ramo_paths:
+        raise ValueError("ramo.node no tiene hojas: cargar un dataset con `manage.py ramos_seed_dataset`.")
+    if size.ras and not (samples.moneda_id and samples.tipo_estudio_id):
+        raise ValueError("Para RAs hacen falta items de catálogo MONEDA y TIPO_ESTUDIO_RA activos.")
+
+    paths = samples.ramo_paths
+    cps = [
+        {"key": f"cp{i}", "nombre": f"CP {i}", "file": _file(f"cp{i}"), "ramo": {"pathIds": paths[i % len(paths)]}}
+        for i in range(size.cps)
+    ]
+    annexes = [
+        {"key": f"anx{i}", "nombre": f"Anexo {i}", "parent_cp": f"cp{i % size.cps}",
+         "genera_prima": i % 2 == 0, "file": _file(f"anx{i}")}
+        for i in range(size.annexes)
+    ]
+    ras = [
+        {
+            "key": f"ra{i}",
+            "data": {
+                "idmoneda": samples.moneda_id,
+                "idtabla_mortalidad": None,
+                "idtipo_estudio": samples.tipo_estudio_id,
+                "ga": Decimal("0.1500"),
+                "it": Decimal("0.0350"),
+                "utilidad_lim": Decimal("0.0500"),
+                "tarifa_inmediata": i % 2 == 0,
+                "vigencia_desde": date(2025, 1, 1),
+                "vigencia_hasta": None,
+            },
+            "targets": {
+                "cp_keys": [c["key"] for c in cps],
+                "annex_keys": [a["key"] for a in annexes],
+            },
+            "files": [_file(f"ra{i}")],
+        }
+        for i in range(size.ras)
+    ]
+    return {
+        "idempotency_key": idempotency_key,
+        "product": {
+            "company_id": company_id,
+            "nombre_tecnico": f"Bench {idempotency_key}",
+            "nombre_comercial": f"Bench {idempotency_key}",
+        },
+        "ramos": [{"pathIds": paths[0]}],
+        "cg": {"uniform": True, "referencia_normativa": "Bench"},
+        "cp": cps,
+        "annexes": annexes,
+        "ra": ras,
+        "formats": {
+            "basicos": {"solicitud": _file("solicitud"), "cuadro": _file("cuadro")},
+            "otros": [_file("otro")],
+        },
+    }
+
+
+def wizard_op(size: WizardSize, samples: WizardSamples, company_id: str, user,
+              commit: bool, duplicates: int = 1) -> Callable[[int, int], Any]:
+    """op(worker, i) para common.benchmarks.concurrency.run_concurrent."""
+    run_id = uuid.uuid4().hex[:8]
+
+    def key(worker: int, i: int) -> str:
+        # Los submitters se agrupan de a 'duplicates': cada grupo comparte la clave de la ronda i
+        return f"bench-{run_id}-{size.cps}x{size.annexes}x{size.ras}-{i}-{worker // duplicates}"
+
+    def op(worker: int, i: int) -> Any:
+        payload = build_payload(size, samples, company_id, key(worker, i))
+        if commit:
+            return create_initial_product(payload, user)
+        with transaction.atomic():
+            result = _create_initial_product(payload, user.pk, lambda stage: None)
+            transaction.set_rollback(True)
+        return result
+
+    return op
@@ -1 +1,54 @@
-﻿# products infra repositories/selectors (stub)
+﻿# products infra repositories/selectors
+from datetime import date
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from django.db import connection
+
+from common.db.document_sections import SECTIONS, VERSIONS_ALL, section_sql
+
+# ---------------------------------------------------------------------------
+# Consultas "as-of" sobre vigencia (daterange) de los vínculos
+# ---------------------------------------------------------------------------
+# 'vigencia @> fecha' se resuelve con los índices GiST (padre, vigencia) de
+# common/migrations/0006: rango sobre el índice, sin recorrer la tabla link ni
+# filtrar en Python. Sin fecha se devuelven todos los vínculos.
+
+
+def get_version_links(version_id: UUID, as_of: Optional[date] = None,
+                      versions: str = VERSIONS_ALL) -> Dict[str, List[Dict[str, Any]]]:
+    """CG/CP/ANNEX/FORMAT vinculados a una versión de producto (opcionalmente a una fecha)."""
+    as_of_expr = "%(as_of)s::date" if as_of else None
+    parts = [
+        f"SELECT '{name}', COALESCE((SELECT json_agg(x) "
+        f"FROM ({section_sql(name, versions, '%(version_id)s', as_of_expr)}) x), '[]'::json)"
+        for name in SECTIONS
+    ]
+    with connection.cursor() as cur:
+        cur.execute("\nUNION ALL\n".join(parts), {"version_id": str(version_id), "as_of": as_of})
+        rows = cur.fetchall()
+    return {name: items for name, items in rows}
+
+
+_RA_LINKS_SQL = """
+SELECT 'CP' AS k, l.idcp AS target_id, l.vigencia::text
+  FROM link.ra_to_cp l
+ WHERE l.idra = %(ra_id)s {as_of}
+UNION ALL
+SELECT 'ANNEX', l.idannex, l.vigencia::text
+  FROM link.ra_to_annex l
+ WHERE l.idra = %(ra_id)s {as_of}
+"""
+
+
+def get_ra_links(ra_id: UUID, as_of: Optional[date] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """CP/ANNEX vinculados a una RA (opcionalmente solo los vigentes a una fecha)."""
+    sql = _RA_LINKS_SQL.format(as_of="AND l.vigencia @> %(as_of)s::date" if as_of else "")
+    with connection.cursor() as cur:
+        cur.execute(sql, {"ra_id": str(ra_id), "as_of": as_of})
+        rows = cur.fetchall()
+
+    out: Dict[str, List[Dict[str, Any]]] = {"CP": [], "ANNEX": []}
+    for k, target_id, vigencia in rows:
+        out[k].append({"id": target_id, "vigencia": vigencia})
+    return out
@@ -1 +1,82 @@
-﻿# products infra tasks (stub)
+﻿# products infra tasks (RQ jobs)
+from typing import Any, Dict, Optional
+
+import django_rq
+from django.contrib.auth import get_user_model
+from rq import get_current_job
+from rq.exceptions import NoSuchJobError
+from rq.job import Job
+
+from common.application.db import set_db_context_for_user
+from common.application.idempotency import IdempotencyInFlight
+from products.application.use_cases.create_initial_product import create_initial_product
+
+# Envío asíncrono del wizard: cola 'high' (interactivo, el usuario espera el resultado)
+SUBMIT_QUEUE = "high"
+SUBMIT_JOB_TIMEOUT = 60 * 5
+# Cuánto se conserva el resultado/error para el polling de estado
+SUBMIT_RESULT_TTL = 60 * 60 * 24
+
+
+def _set_progress(stage: str) -> None:
+    job = get_current_job()
+    if job is not None:
+        job.meta["progress"] = stage
+        job.save_meta()
+
+
+def submit_initial_product_job(payload: dict, user_id: int) -> Dict[str, Any]:
+    """Job RQ: mismo caso de uso que el alta síncrona, con el contexto RLS del usuario que envió."""
+    _set_progress("iniciado")
+    user = get_user_model().objects.get(pk=user_id)
+    # La conexión del worker se reutiliza entre jobs: el contexto se carga en cada uno
+    set_db_context_for_user(user_id)
+    try:
+        # El lock de idempotencia dura lo que el job: RQ lo mata antes de que expire
+        result = create_initial_product(payload=payload, user=user, on_progress=_set_progress,
+                                        lock_timeout=SUBMIT_JOB_TIMEOUT)
+    except (ValueError, IdempotencyInFlight) as e:
+        # Mensaje apto para el cliente; el traceback queda solo en el registro de RQ
+        job = get_current_job()
+        if job is not None:
+            job.meta["error"] = str(e) if isinstance(e, ValueError) else "Envío duplicado en curso."
+            job.save_meta()
+        raise
+    _set_progress("listo")
+    return result
+
+
+def enqueue_initial_product(payload: dict, user_id: int) -> Job:
+    return django_rq.get_queue(SUBMIT_QUEUE).enqueue(
+        submit_initial_product_job,
+        payload,
+        user_id,
+        job_timeout=SUBMIT_JOB_TIMEOUT,
+        result_ttl=SUBMIT_RESULT_TTL,
+        failure_ttl=SUBMIT_RESULT_TTL,
+        meta={"user_id": user_id, "progress": "en_cola"},
+    )
+
+
+def get_submission_status(job_id: str, user_id: int) -> Optional[Dict[str, Any]]:
+    """Estado del envío; None si no existe, expiró o pertenece a otro usuario."""
+    try:
+        job = Job.fetch(job_id, connection=django_rq.get_connection(SUBMIT_QUEUE))
+    except NoSuchJobError:
+        return None
+    if job.meta.get("user_id") != user_id:
+        return None
+
+    status = job.get_status(refresh=False)
+    out: Dict[str, Any] = {
+        "job_id": job.id,
+        "status": status,
+        "progress": job.meta.get("progress"),
+        "result": None,
+        "error": None,
+    }
+    if status == "finished":
+        out["result"] = job.result
+    elif status == "failed":
+        out["error"] = job.meta.get("error") or "Error interno al crear el producto."
+    return out
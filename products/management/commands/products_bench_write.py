@@ -0,0 +1,99 @@
+import json
+from dataclasses import asdict
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from common.application.db import set_db_context_for_user
+from common.benchmarks.concurrency import format_concurrent_table, run_concurrent
+from products.benchmarks.write_path import WizardSize, build_payload, load_samples, wizard_op
+from security.infrastructure.actor_cache import get_actor_context
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de escritura del wizard (create_initial_product) con payloads de tamaño "
+        "parametrizable y N submitters concurrentes: sentencias SQL, duración de la "
+        "transacción, esperas de lock y throughput. Por defecto revierte cada alta."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", nargs="+", default=["1x0x0", "5x5x2", "20x20x10"],
+                            help="Tamaños de payload CPxANEXOSxRAS (default: 1x0x0 5x5x2 20x20x10).")
+        parser.add_argument("--submitters", type=int, nargs="+", default=[1, 4],
+                            help="Submitters concurrentes; una corrida por valor (default: 1 4).")
+        parser.add_argument("--ops", type=int, default=10, help="Altas medidas por submitter.")
+        parser.add_argument("--warmup", type=int, default=1)
+        parser.add_argument("--user-id", type=int, required=True,
+                            help="Usuario que da de alta (contexto RLS e idempotency key).")
+        parser.add_argument("--company-id", help="Empresa del producto (default: la del actor del usuario).")
+        parser.add_argument("--commit", action="store_true",
+                            help="create_initial_product completo (idempotencia incluida); deja los productos.")
+        parser.add_argument("--duplicates", type=int, default=1,
+                            help="Con --commit: submitters que comparten cada idempotency_key (single-flight).")
+        parser.add_argument("--sample-interval-ms", type=int, default=10,
+                            help="Intervalo de muestreo de pg_stat_activity para esperas de lock.")
+        parser.add_argument("--json", action="store_true", help="Salida JSON.")
+
+    def handle(self, *args, **opts):
+        try:
+            sizes = [WizardSize.parse(s) for s in opts["size"]]
+        except ValueError as e:
+            raise CommandError(str(e))
+        if opts["duplicates"] < 1:
+            raise CommandError("--duplicates debe ser >= 1.")
+        if opts["duplicates"] > 1 and not opts["commit"]:
+            raise CommandError("--duplicates solo tiene sentido con --commit (pasa por la idempotencia).")
+
+        user_id = opts["user_id"]
+        user = get_user_model().objects.filter(pk=user_id).first()
+        if user is None:
+            raise CommandError(f"No existe el usuario {user_id}.")
+        company_id = opts["company_id"] or get_actor_context(user_id)[1]
+        if not company_id:
+            raise CommandError("El usuario no tiene empresa (actor): indicar --company-id.")
+
+        set_db_context_for_user(user_id)
+        samples = load_samples()
+        try:
+            for size in sizes:
+                build_payload(size, samples, company_id, "check")
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        def setup(worker: int) -> None:
+            set_db_context_for_user(user_id)
+
+        mode = "commit" if opts["commit"] else "rollback"
+        results = []
+        for size in sizes:
+            for submitters in opts["submitters"]:
+                name = f"wizard.{mode}.{size.label}"
+                if opts["duplicates"] > 1:
+                    name += f".dup{opts['duplicates']}"
+                op = wizard_op(size, samples, company_id, user, opts["commit"], opts["duplicates"])
+                results.append(run_concurrent(
+                    name, op, submitters=submitters, ops_per_submitter=opts["ops"], warmup=opts["warmup"],
+                    setup=setup, sample_interval=opts["sample_interval_ms"] / 1000,
+                ))
+                if not opts["json"]:
+                    r = results[-1]
+                    self.stdout.write(f"  {name} × {submitters}: {r.ops_per_s:.2f} ops/s, p95 {r.p95_ms:.2f} ms")
+
+        if opts["json"]:
+            self.stdout.write(json.dumps([asdict(r) for r in results], ensure_ascii=False, indent=2))
+            return
+
+        self.stdout.write("")
+        for line in format_concurrent_table(results):
+            self.stdout.write(line)
+        if opts["duplicates"] > 1:
+            self.stdout.write("")
+            for r in results:
+                # Cada grupo de 'duplicates' submitters comparte clave: un resultado por grupo y ronda
+                groups = -(-r.submitters // opts["duplicates"]) * opts["ops"]
+                line = f"{r.name} × {r.submitters}: {r.distinct_results} resultados distintos (esperados {groups})"
+                self.stdout.write(line if r.distinct_results == groups else self.style.ERROR(line))
+        if opts["commit"]:
+            self.stdout.write(self.style.WARNING(
+                "Modo --commit: los productos creados quedan en la base (nombre_tecnico 'Bench bench-…')."))
@@ -14,6 +14,9 @@ from ramos.api.views.public import (
     RamosContablesView,
 )
 
+# Async (ASGI)
+from ramos.api.views.aio import AsyncCommissionCapView, AsyncRamosTreeView
+
 # Admin · Contable
 from ramos.api.views.admin_contable import (
     AdminContableMappingListView,
@@ -38,6 +41,10 @@ urlpatterns = [
     path("commission/cap/", CommissionCapView.as_view(), name="commission-cap"),
     path("commission/validate/", CommissionValidateRAView.as_view(), name="commission-validate"),
 
+    # Async (ASGI): mismas respuestas, consultas independientes en paralelo
+    path("aio/ramos/tree/", AsyncRamosTreeView.as_view(), name="aio-ramos-tree"),
+    path("aio/commission/cap/", AsyncCommissionCapView.as_view(), name="aio-commission-cap"),
+
     # Admin · Contable
     path("admin/contable/mapping/", AdminContableMappingListView.as_view(), name="admin-contable-mapping-list"),
     path("admin/contable/mapping/create/", AdminContableMappingCreateView.as_view(), name="admin-contable-mapping-create"),
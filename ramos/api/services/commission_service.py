@@ -1,9 +1,14 @@
 # products-backend/ramos/api/services/commission_service.py
 from typing import Any, Dict, List, Optional, Tuple
-from django.db import connection
+from common.db.routers import read_connection
+import asyncio
 import re
+import uuid
 
-from ramos.api.services.ramos_flags_service import is_vida_by_path
+from common.db import aio
+from common.db.query_registry import register_query
+
+from ramos.api.services.ramos_flags_service import is_vida_chain
 
 UUID_RX = re.compile(r"^[0-9a-fA-F-]{32,36}$")
 
@@ -14,37 +19,22 @@ def _ensure_uuid(s: Any) -> str:
     return s.strip()
 
 
-def _fetch_nodes(ids: List[str]) -> Dict[str, Dict[str, Any]]:
-    """
-    Carga nodos por id → { id: {id, code, name, kind, parent_id} }
-    """
-    if not ids:
-        return {}
-    sql = """
-    SELECT id, code, name, kind, parent_id
-    FROM ramo.node
-    WHERE id = ANY(%s)
-    """
-    with connection.cursor() as cur:
-        cur.execute(sql, [ids])
-        rows = cur.fetchall()
-    out: Dict[str, Dict[str, Any]] = {}
-    for rid, code, name, kind, parent_id in rows:
-        out[str(rid)] = {
-            "id": str(rid),
-            "code": code,
-            "name": name,
-            "kind": kind,
-            "parent_id": str(parent_id) if parent_id else None
-        }
-    return out
+# Datos de ejemplo para `manage.py index_advisor` (ver common/db/query_registry.py)
+_SAMPLE_RULE_NODE = "SELECT node_id FROM ramo.commission_rule WHERE rule_type = 'FIXED_PERCENT' LIMIT 1"
+_SAMPLE_DEEPEST_NODE = "SELECT id FROM ramo.node ORDER BY level DESC NULLS LAST LIMIT 1"
 
 
 def _fetch_chain_up(leaf_id: str) -> List[Dict[str, Any]]:
     """
     Trae chain ascendente (leaf -> ... -> root) para un node_id.
     """
-    sql = """
+    with read_connection().cursor() as cur:
+        cur.execute(_SQL_CHAIN_UP, [leaf_id])
+        rows = cur.fetchall()
+    return _chain_from_rows(rows)
+
+
+_SQL_CHAIN_UP = register_query("ramos.commission.chain_up", """
     WITH RECURSIVE chain AS (
       SELECT n.id, n.code, n.name, n.kind, n.parent_id, 0::int AS lvl
       FROM ramo.node n
@@ -57,10 +47,10 @@ def _fetch_chain_up(leaf_id: str) -> List[Dict[str, Any]]:
     SELECT id, code, name, kind, parent_id, lvl
     FROM chain
     ORDER BY lvl ASC;
-    """
-    with connection.cursor() as cur:
-        cur.execute(sql, [leaf_id])
-        rows = cur.fetchall()
+    """, sample=lambda s: [s.scalar(_SAMPLE_DEEPEST_NODE)])
+
+
+def _chain_from_rows(rows) -> List[Dict[str, Any]]:
     out: List[Dict[str, Any]] = []
     for r in rows:
         out.append({
@@ -74,119 +64,97 @@ def _fetch_chain_up(leaf_id: str) -> List[Dict[str, Any]]:
     return out
 
 
-def _looks_like_vida(node: Dict[str, Any]) -> bool:
-    """
-    Heurística ligera para ancla 'VIDA':
-    - code == 'VID'
-    - CATEGORY con code que empieza 'VID'
-    - nombre exacto/leading 'Vida'
-    """
-    code = (node.get("code") or "").upper()
-    name = (node.get("name") or "").strip().lower()
-    kind = (node.get("kind") or "").upper()
-    if code == "VID":
-        return True
-    if kind == "CATEGORY" and code.startswith("VID"):
-        return True
-    if name == "vida" or name.startswith("vida "):
-        return True
-    return False
-
-
-def _is_vida_path(path_ids: List[str]) -> bool:
-    """
-    True si el path (tomando su leaf) pertenece al árbol de Vida.
-    """
-    if not path_ids:
-        return False
-    leaf_id = _ensure_uuid(path_ids[-1])
-    chain = _fetch_chain_up(leaf_id)
-    if not chain:
-        return False
-    return any(_looks_like_vida(n) for n in chain)
+# Reglas FIXED_PERCENT de todo el chain de búsqueda en una sola consulta
+_SQL_RULES_BY_NODES = register_query("ramos.commission.rules_by_nodes", """
+    SELECT node_id,
+           MIN((rule_value->>'percent')::numeric)
+             FILTER (WHERE UPPER(rule_value->>'modality') = UPPER(%(modality)s)) AS specific,
+           MIN((rule_value->>'percent')::numeric)
+             FILTER (WHERE rule_value->>'modality' IS NULL OR NOT (rule_value ? 'modality')) AS general
+    FROM ramo.commission_rule
+    WHERE node_id = ANY(%(ids)s::uuid[]) AND rule_type = 'FIXED_PERCENT'
+    GROUP BY node_id
+    """, sample=lambda s: {"ids": [s.scalar(_SAMPLE_RULE_NODE)], "modality": "INDIVIDUAL"})
 
 
-def _query_commission_percent_by_node(node_id: str, modality: Optional[str] = None) -> Optional[float]:
+def _pcts_from_rows(rows, modality: Optional[str]) -> Dict[str, Optional[float]]:
     """
-    Busca MIN(FIXED_PERCENT) para ese node_id, filtrando por modalidad si se provee.
-
-    Implementa fallback:
-    1. Busca regla con 'modality' específica.
-    2. Si no encuentra, busca regla 'general' (sin 'modality' o con 'modality' null).
+    % por nodo (texto canónico → MIN(FIXED_PERCENT)). Con modalidad se usa la regla
+    específica de esa modalidad y, si no hay, la general (sin 'modality' o null).
     """
+    out: Dict[str, Optional[float]] = {}
+    for node_id, specific, general in rows:
+        pct = specific if modality and specific is not None else general
+        out[str(node_id)] = float(pct) if pct is not None else None
+    return out
 
-    def fetch(specific_modality: Optional[str]) -> Optional[float]:
-        sql_parts = [
-            "SELECT MIN((rule_value->>'percent')::numeric) AS pct",
-            "FROM ramo.commission_rule",
-            "WHERE node_id = %s AND rule_type = 'FIXED_PERCENT'"
-        ]
-        params: List[Any] = [node_id]
-
-        if specific_modality:
-            # 1. Busca regla específica
-            # Asume que la modalidad está en el JSON: rule_value -> 'modality'
-            # Normalizamos a UPPER para consistencia
-            sql_parts.append("AND UPPER(rule_value->>'modality') = UPPER(%s)")
-            params.append(specific_modality)
-        else:
-            # 2. Busca regla general (sin clave 'modality' o con valor null)
-            sql_parts.append(
-                "AND (rule_value->>'modality' IS NULL OR NOT (rule_value ? 'modality'))")
-
-        sql = " ".join(sql_parts)
-
-        with connection.cursor() as cur:
-            cur.execute(sql, params)
-            row = cur.fetchone()
-
-        return float(row[0]) if row and row[0] is not None else None
-
-    pct = None
-    if modality:
-        # Intenta buscar la modalidad específica primero
-        pct = fetch(specific_modality=modality)
-
-    if pct is None:
-        # Si no se encontró (o no se proveyó modalidad), busca la general
-        pct = fetch(specific_modality=None)
 
-    return pct
+def _rules_by_node(node_ids: List[str], modality: Optional[str]) -> Dict[str, Optional[float]]:
+    with read_connection().cursor() as cur:
+        cur.execute(_SQL_RULES_BY_NODES, {"ids": node_ids, "modality": modality})
+        rows = cur.fetchall()
+    return _pcts_from_rows(rows, modality)
 
 
 def commission_percent_for_path(path_ids: List[str]) -> Dict[str, Any]:
     """
-    Unidad de trabajo (Ahora deriva 'modality' del path):
+    Unidad de trabajo (deriva 'modality' del path):
       - Valida path
-      - Usa is_vida_by_path() -> si es VIDA: skip
+      - Trae el chain del leaf (leaf→root): si hay ancla de VIDA (is_vida_chain): skip
       - Revisa el LEAF para derivar la modalidad (ej: "Individual", "Colectivo").
       - Si es un leaf de modalidad, la búsqueda de comisión EMPIEZA en el PADRE (el Ramo).
-      - Consulta % en el nodo de inicio. Si no hay, sube por la cadena (leaf→root)
-        probando cada node_id hasta encontrar un FIXED_PERCENT (filtrando por la modalidad derivada).
+      - Toma el primer nodo del chain de búsqueda con FIXED_PERCENT (filtrando por la
+        modalidad derivada, con fallback a la regla general).
+    Mismas reglas y mismas consultas que acommission_percent_for_path().
     """
     if not path_ids or not isinstance(path_ids, list):
         return {"pathIds": path_ids, "percent": None, "skipped": "PATH_EMPTY"}
 
-    # --- 1. Chequeo de VIDA (usa el leaf original) ---
-    leaf_id = _ensure_uuid(path_ids[-1])
-    try:
-        is_vida, _ramo_hint = is_vida_by_path(path_ids)
-    except ValueError as e:
-        return {"pathIds": path_ids, "percent": None, "error": str(e)}
+    chain = _fetch_chain_up(_ensure_uuid(path_ids[-1]))
+    done, modality, search = _plan_path(path_ids, chain)
+    if done is not None:
+        return done
+    return _pick_percent(path_ids, modality, search, _rules_by_node([n["id"] for n in search], modality))
+
 
-    if is_vida:
+def _plan_path(path_ids: List[str], chain: List[Dict[str, Any]]
+               ) -> Tuple[Optional[Dict[str, Any]], Optional[str], List[Dict[str, Any]]]:
+    """
+    Reglas comunes a la ruta sync y async sobre el chain del leaf:
+    (resultado final si no hay que buscar reglas, modalidad, nodos donde buscar en orden).
+    """
+    if not chain:
+        return {"pathIds": path_ids, "percent": None, "error": f"node_id no encontrado: {path_ids[-1]}"}, None, []
+    if is_vida_chain(chain):
         # La regla de negocio de 'main' omite VIDA
-        return {"pathIds": path_ids, "percent": None, "skipped": "VIDA"}
+        return {"pathIds": path_ids, "percent": None, "skipped": "VIDA"}, None, []
+
+    leaf = chain[0]
+    modality, node_to_start_search = _derive_modality(leaf["id"], leaf)
+    # chain va leaf → root: si la búsqueda empieza en el padre, se salta el leaf
+    search = chain if node_to_start_search == leaf["id"] else chain[1:]
+    return None, modality, search
+
+
+def _pick_percent(path_ids: List[str], modality: Optional[str], search: List[Dict[str, Any]],
+                  pcts: Dict[str, Optional[float]]) -> Dict[str, Any]:
+    """Primer nodo del chain de búsqueda con regla; node_id siempre en texto canónico (del chain)."""
+    for n in search:
+        pct = pcts.get(n["id"])
+        if pct is not None:
+            return {"pathIds": path_ids, "percent": pct, "node_id": n["id"], "modality_derived": modality}
+    # No hay regla en ningún nivel
+    return {"pathIds": path_ids, "percent": None, "modality_derived": modality}
+
 
-    # --- 2. Derivación de Modalidad (Heurística del Frontend) ---
+def _derive_modality(leaf_id: str, leaf_node_data: Optional[Dict[str, Any]]) -> Tuple[Optional[str], str]:
+    """
+    (modalidad, nodo de inicio de la búsqueda) a partir del leaf.
+    Si el leaf es una OPTION modal, la regla se busca desde el PADRE (el Ramo).
+    """
     modality: Optional[str] = None
-    modality_derived_from = None
     node_to_start_search = leaf_id  # Por defecto, buscamos desde el leaf
 
-    # Necesitamos los datos del leaf (name, kind, parent_id)
-    # _fetch_nodes es ligero y ya lo tenemos en este servicio.
-    leaf_node_data = _fetch_nodes([leaf_id]).get(leaf_id)
-
     if leaf_node_data:
         leaf_name = (leaf_node_data.get('name') or '').strip().upper()
         leaf_kind = (leaf_node_data.get('kind') or '').upper()
@@ -202,47 +170,13 @@ def commission_percent_for_path(path_ids: List[str]) -> Dict[str, Any]:
             # ... (puedes añadir más mapeos si es necesario)
 
         # Si encontramos una modalidad, la regla se aplica en el PADRE (el Ramo)
+        # (una OPTION modal sin padre es rara: se sigue buscando desde el leaf, con la modalidad)
         if modality:
             parent_id = leaf_node_data.get('parent_id')
             if parent_id:
                 node_to_start_search = parent_id  # Empezar a buscar desde el Ramo
-                modality_derived_from = f"leaf_option:{leaf_id}"
-            else:
-                # Es un nodo 'OPTION' modal pero sin padre? Raro, pero seguimos
-                # buscando desde el leaf, pero con la modalidad.
-                modality_derived_from = f"leaf_option_no_parent:{leaf_id}"
-
-    # --- 3. Búsqueda de Comisión (con modalidad y nodo de inicio correctos) ---
-
-    # 3a) Intento en el NODO DE INICIO (sea el leaf, o el padre si era modal)
-    pct = _query_commission_percent_by_node(
-        node_to_start_search, modality=modality)
-    if isinstance(pct, (int, float)):
-        return {
-            "pathIds": path_ids,
-            "percent": pct,
-            "node_id": node_to_start_search,
-            "modality_derived": modality
-        }
-
-    # 3b) Si no hay, subimos por el chain (desde el nodo de inicio)
-    chain = _fetch_chain_up(node_to_start_search)
 
-    # El 'chain[0]' ya lo probamos arriba (node_to_start_search).
-    # Empezamos desde el 'chain[1]' (el padre del nodo de inicio).
-    for n in chain[1:]:
-        nid = str(n["id"])
-        pct_up = _query_commission_percent_by_node(nid, modality=modality)
-        if isinstance(pct_up, (int, float)):
-            return {
-                "pathIds": path_ids,
-                "percent": pct_up,
-                "node_id": nid,
-                "modality_derived": modality
-            }
-
-    # 3c) No hay regla en ningún nivel
-    return {"pathIds": path_ids, "percent": None, "modality_derived": modality}
+    return modality, node_to_start_search
 
 # ---------------- NUEVO (por trayectorias) ----------------
 
@@ -332,19 +266,30 @@ def compute_commission_from_paths(body: Dict[str, Any]) -> Dict[str, Any]:
        actúa como TOPE MÁXIMO para CADA anexo individual.
     """
     main_paths, annex_paths = _normalize_paths_payload(body)
+    return _commission_summary(
+        [commission_percent_for_path(p) for p in main_paths],
+        [commission_percent_for_path(p) for p in annex_paths],
+    )
+
+
+def _commission_summary(main_results: List[Dict[str, Any]],
+                        annex_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Aplica las reglas de topes sobre los resultados por path
+    (uno de commission_percent_for_path por trayectoria, en el orden recibido).
+    """
 
     # --- Función de evaluación (sin cambios) ---
-    def eval_block(paths: List[List[str]], omit_vida: bool) -> Tuple[Optional[float], List[Dict[str, Any]]]:
+    def eval_block(results: List[Dict[str, Any]], omit_vida: bool) -> Tuple[Optional[float], List[Dict[str, Any]]]:
         """
-        Evalúa una lista de paths y devuelve el CAP (min) y los items detallados.
+        Evalúa los resultados de una lista de paths y devuelve el CAP (min) y los items detallados.
         'res' (resultado de commission_percent_for_path) es un dict:
         {"pathIds": ..., "percent": 0.X, "skipped": ..., "node_id": ...}
         """
         percs: List[float] = []
         items: List[Dict[str, Any]] = []
-        for p in paths:
-            # 1. Busca la comisión para este path específico
-            res = commission_percent_for_path(p)
+        for res in results:
+            # 1. (la comisión de cada path ya viene calculada)
 
             # 2. Manejo de 'Vida' (si aplica)
             if omit_vida and res.get("skipped") == "VIDA":
@@ -367,13 +312,13 @@ def compute_commission_from_paths(body: Dict[str, Any]) -> Dict[str, Any]:
 
     # PASO 1: Evaluar MAIN primero. Este es el que define el TOPE.
     # (Regla: "El Combinado... comisión máxima será la menor de los ramos")
-    main_cap, main_items_raw = eval_block(main_paths, omit_vida=True)
+    main_cap, main_items_raw = eval_block(main_results, omit_vida=True)
 
     # PASO 2: Evaluar ANNEX (pero aún no aplicamos el tope)
     # (Asumimos que los anexos SÍ deben calcular comisión para VIDA,
     # por eso 'omit_vida=False'. Si no, cambia a True)
     _annex_cap_temp, annex_items_raw = eval_block(
-        annex_paths, omit_vida=False) if annex_paths else (None, [])
+        annex_results, omit_vida=False) if annex_results else (None, [])
 
     # PASO 3: APLICAR LÓGICA DE NEGOCIO (EL TOPE DE MAIN)
     # (Regla: "En cuanto a los anexos, la comisión máxima será a lo sumo la [de las CP]")
@@ -561,10 +506,15 @@ def get_commission_cap(ramo_ids, modalidad_id=None):
         raise ValueError("ramo_ids debe ser array no vacío.")
     ramo_ids = [_ensure_uuid(x) for x in ramo_ids]
 
+    return _commission_cap_summary(ramo_ids, _rules_by_node(ramo_ids, None))
+
+
+def _commission_cap_summary(ramo_ids: List[str], pcts: Dict[str, Optional[float]]) -> Dict[str, Any]:
     percs: List[float] = []
     detail: List[Dict[str, Any]] = []
     for rid in ramo_ids:
-        pct = _query_commission_percent_by_node(rid)
+        # Las claves vienen normalizadas por Postgres (uuid → texto canónico)
+        pct = pcts.get(str(uuid.UUID(rid)))
         detail.append({"node_id": rid, "commission_percent": pct,
                       "source": "NODE_ONLY" if pct is not None else "NONE"})
         if pct is not None:
@@ -575,3 +525,46 @@ def get_commission_cap(ramo_ids, modalidad_id=None):
         "per_ramo_detail": detail,
         "without_rule": [d for d in detail if d["commission_percent"] is None],
     }
+
+
+# ---------------- Async (vistas ASGI) ----------------
+# Mismas consultas y mismas reglas (_plan_path/_pick_percent/_commission_summary) que la ruta sync:
+#   1) chain leaf → root; 2) reglas del chain de búsqueda en una consulta.
+# Los paths son independientes entre sí y se evalúan en paralelo.
+
+
+async def _arules_by_node(node_ids: List[str], modality: Optional[str],
+                          user_id: Optional[int]) -> Dict[str, Optional[float]]:
+    rows = await aio.fetch(_SQL_RULES_BY_NODES, {"ids": node_ids, "modality": modality}, user_id=user_id)
+    return _pcts_from_rows(rows, modality)
+
+
+async def acommission_percent_for_path(path_ids: List[str], user_id: Optional[int]) -> Dict[str, Any]:
+    """Versión async de commission_percent_for_path(): mismo resultado."""
+    if not path_ids or not isinstance(path_ids, list):
+        return {"pathIds": path_ids, "percent": None, "skipped": "PATH_EMPTY"}
+
+    chain = _chain_from_rows(await aio.fetch(_SQL_CHAIN_UP, [_ensure_uuid(path_ids[-1])], user_id=user_id))
+    done, modality, search = _plan_path(path_ids, chain)
+    if done is not None:
+        return done
+    return _pick_percent(path_ids, modality, search,
+                         await _arules_by_node([n["id"] for n in search], modality, user_id))
+
+
+async def acompute_commission_from_paths(body: Dict[str, Any], user_id: Optional[int]) -> Dict[str, Any]:
+    """Versión async de compute_commission_from_paths(): todos los paths (main y annex) en paralelo."""
+    main_paths, annex_paths = _normalize_paths_payload(body)
+    results = await asyncio.gather(
+        *(acommission_percent_for_path(p, user_id) for p in main_paths + annex_paths)
+    )
+    return _commission_summary(list(results[:len(main_paths)]), list(results[len(main_paths):]))
+
+
+async def aget_commission_cap(ramo_ids, user_id: Optional[int], modalidad_id=None):
+    """Versión async de get_commission_cap(): las reglas de todos los ramos en una consulta."""
+    if not isinstance(ramo_ids, list) or not ramo_ids:
+        raise ValueError("ramo_ids debe ser array no vacío.")
+    ramo_ids = [_ensure_uuid(x) for x in ramo_ids]
+    return _commission_cap_summary(ramo_ids, await _arules_by_node(ramo_ids, None, user_id))
+
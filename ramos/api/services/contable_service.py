@@ -4,6 +4,8 @@ from django.db import connection
 import re
 import uuid
 
+from common.db.query_registry import register_query
+
 # Acepta UUID con o sin guiones
 UUID_RX = re.compile(r"^[0-9a-fA-F-]{32,36}$")
 
@@ -19,6 +21,10 @@ def _ensure_uuid(u: Any) -> str:
     return u.strip()
 
 
+# Datos de ejemplo para `manage.py index_advisor` (ver common/db/query_registry.py)
+_SAMPLE_MAPPED_NODE = "SELECT node_id FROM accounting.ramo_to_contable LIMIT 1"
+
+
 def _fetch_node_by_id(node_id: Any) -> Dict[str, Any]:
     node_id = _ensure_uuid(node_id)
     sql = "SELECT id, code, name, parent_id, kind, is_active FROM ramo.node WHERE id=%s"
@@ -237,6 +243,15 @@ def _ascend_path(node_id: Any) -> List[str]:
     return chain  # leaf -> root
 
 
+_SQL_CONTABLES_BY_NODE = register_query("ramos.contable.by_node", """
+    SELECT rc.id, rc.code, rc.name
+    FROM accounting.ramo_to_contable rtc
+    JOIN accounting.ramo_contable rc ON rc.id = rtc.idramo_contable
+    WHERE rtc.node_id = %s
+    ORDER BY rc.code;
+    """, sample=lambda s: [s.scalar(_SAMPLE_MAPPED_NODE)])
+
+
 def resolve_contables_for_node(node_id: Any) -> Dict[str, Any]:
     node_id = _ensure_uuid(node_id)
     node = _fetch_node_by_id(node_id)
@@ -245,17 +260,9 @@ def resolve_contables_for_node(node_id: Any) -> Dict[str, Any]:
     seen = set()
     contables: List[Dict[str, Any]] = []
 
-    sql = """
-    SELECT rc.id, rc.code, rc.name
-    FROM accounting.ramo_to_contable rtc
-    JOIN accounting.ramo_contable rc ON rc.id = rtc.idramo_contable
-    WHERE rtc.node_id = %s
-    ORDER BY rc.code;
-    """
-
     with connection.cursor() as cur:
         for nid in chain:  # leaf->...->root
-            cur.execute(sql, [nid])
+            cur.execute(_SQL_CONTABLES_BY_NODE, [nid])
             rows = cur.fetchall()
             for r in rows:
                 code = r[1]
@@ -271,6 +278,28 @@ def resolve_contables_for_node(node_id: Any) -> Dict[str, Any]:
     }
 
 
+_SQL_LEAVES = register_query("ramos.contable.leaves", """
+        WITH leaves AS (
+          SELECT n.id, n.code, n.name, n.kind, n.parent_id, n.level
+          FROM ramo.node n
+          WHERE NOT EXISTS (SELECT 1 FROM ramo.node ch WHERE ch.parent_id = n.id)
+        )
+        SELECT id, code, name, kind, parent_id, level FROM leaves;
+        """, sample=lambda s: None)
+
+_SQL_NODES_BY_KIND = register_query(
+    "ramos.contable.nodes_by_kind",
+    "SELECT id, code, name, kind, parent_id, level FROM ramo.node WHERE kind=%s;",
+    sample=lambda s: ["RAMO"],
+)
+
+_SQL_HAS_CONTABLE = register_query(
+    "ramos.contable.has_contable",
+    "SELECT 1 FROM accounting.ramo_to_contable WHERE node_id = %s LIMIT 1",
+    sample=lambda s: [s.scalar(_SAMPLE_MAPPED_NODE)],
+)
+
+
 def audit_unmapped_by_scope(scope: str) -> List[Dict[str, Any]]:
     """
     Detecta nodos sin ningún contable en su cadena ascendente.
@@ -279,22 +308,11 @@ def audit_unmapped_by_scope(scope: str) -> List[Dict[str, Any]]:
       - ramo     → kind='RAMO'
       - category → kind='CATEGORY'
     """
-    if scope == "leaf":
-        base_sql = """
-        WITH leaves AS (
-          SELECT n.id, n.code, n.name, n.kind, n.parent_id, n.level
-          FROM ramo.node n
-          WHERE NOT EXISTS (SELECT 1 FROM ramo.node ch WHERE ch.parent_id = n.id)
-        )
-        SELECT id, code, name, kind, parent_id, level FROM leaves;
-        """
-    elif scope == "ramo":
-        base_sql = "SELECT id, code, name, kind, parent_id, level FROM ramo.node WHERE kind='RAMO';"
-    else:  # category
-        base_sql = "SELECT id, code, name, kind, parent_id, level FROM ramo.node WHERE kind='CATEGORY';"
-
     with connection.cursor() as cur:
-        cur.execute(base_sql)
+        if scope == "leaf":
+            cur.execute(_SQL_LEAVES)
+        else:  # ramo | category
+            cur.execute(_SQL_NODES_BY_KIND, [scope.upper()])
         nodes = cur.fetchall()
 
     out: List[Dict[str, Any]] = []
@@ -302,10 +320,9 @@ def audit_unmapped_by_scope(scope: str) -> List[Dict[str, Any]]:
         chain = _ascend_path(str(nid))
         # ¿algún contable en la cadena?
         has_any = False
-        sql_has = "SELECT 1 FROM accounting.ramo_to_contable WHERE node_id = %s LIMIT 1"
         with connection.cursor() as cur:
             for x in chain:
-                cur.execute(sql_has, [x])
+                cur.execute(_SQL_HAS_CONTABLE, [x])
                 if cur.fetchone():
                     has_any = True
                     break
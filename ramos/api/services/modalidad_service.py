@@ -4,6 +4,8 @@ from django.db import connection
 import re
 import uuid
 
+from common.db.query_registry import register_query
+
 UUID_RX = re.compile(r"^[0-9a-fA-F-]{36}$")
 
 
@@ -29,20 +31,22 @@ def _fetch_node(node_id: Any) -> Dict[str, Any]:
     return {"id": row[0], "code": row[1], "name": row[2]}
 
 
-def list_modalidades_for_node(node_id: Any) -> Dict[str, Any]:
-    node_id = _ensure_uuid(node_id)
-    ramo = _fetch_node(node_id)
-
-    sql = """
+_SQL_MODALIDADES_BY_NODE = register_query("ramos.modalidad.by_node", """
     SELECT m.id, m.code, m.name, nm.attrs
     FROM ramo.node_modalidad nm
     JOIN ramo.modalidad m ON m.id = nm.modalidad_id
     WHERE nm.node_id = %s AND nm.is_enabled = true
       AND m.code IN ('IND','COL')
     ORDER BY COALESCE((nm.attrs->>'ord')::int, 999), m.name;
-    """
+    """, sample=lambda s: [s.scalar("SELECT node_id FROM ramo.node_modalidad WHERE is_enabled LIMIT 1")])
+
+
+def list_modalidades_for_node(node_id: Any) -> Dict[str, Any]:
+    node_id = _ensure_uuid(node_id)
+    ramo = _fetch_node(node_id)
+
     with connection.cursor() as cur:
-        cur.execute(sql, [node_id])
+        cur.execute(_SQL_MODALIDADES_BY_NODE, [node_id])
         rows = cur.fetchall()
 
     modalidades: List[Dict[str, Any]] = []
@@ -76,6 +76,14 @@ def _looks_like_vida(node: Dict[str, Any]) -> bool:
     return False
 
 
+def is_vida_chain(chain: List[Dict[str, Any]]) -> bool:
+    """
+    True si en el chain (leaf -> root) hay un ancla de VIDA. Lo comparten is_vida_by_path()
+    y el cálculo de comisión (sync y async), que ya traen su propio chain.
+    """
+    return any(_looks_like_vida(n) for n in chain)
+
+
 def _pick_ramo_in_chain(chain: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
     """
     Devuelve el nodo tipo RAMO más cercano al leaf (si existe).
@@ -110,7 +118,7 @@ def is_vida_by_path(path_ids: List[str]) -> Tuple[bool, Optional[Dict[str, Any]]
         raise ValueError(f"node_id no encontrado: {leaf_id}")
 
     # ¿Hay ancla 'VIDA' en el chain?
-    is_vida = any(_looks_like_vida(n) for n in chain)
+    is_vida = is_vida_chain(chain)
 
     # ¿Cuál es el RAMO más cercano al leaf?
     ramo = _pick_ramo_in_chain(chain)
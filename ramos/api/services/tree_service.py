@@ -1,9 +1,13 @@
 # products-backend/ramos/api/services/tree_service.py
-from typing import List, Dict, Any, Optional, Set
-from django.db import connection
+from typing import List, Dict, Any, Optional, Sequence, Set
+from common.db.routers import read_connection
+import asyncio
 import re
 import uuid
 
+from common.db import aio
+from common.db.query_registry import register_query
+
 # Acepta UUID con o sin guiones
 UUID_RX = re.compile(r"^[0-9a-fA-F-]{32,36}$")
 
@@ -16,10 +20,41 @@ def _ensure_uuid(u: Any) -> str:
     return u.strip()
 
 
+# Datos de ejemplo para `manage.py index_advisor` (ver common/db/query_registry.py):
+# el padre con más hijos y una raíz, los peores casos para los recorridos por parent_id
+_SAMPLE_BUSIEST_PARENT = """
+    SELECT parent_id FROM ramo.node WHERE parent_id IS NOT NULL
+    GROUP BY parent_id ORDER BY count(*) DESC LIMIT 1
+    """
+_SAMPLE_ROOT = "SELECT id FROM ramo.node WHERE parent_id IS NULL ORDER BY id LIMIT 1"
+_SAMPLE_COMPANY = "SELECT company_id FROM ramo.sr_approval LIMIT 1"
+
+_SQL_ID_BY_CODE = register_query(
+    "ramos.tree.id_by_code",
+    "SELECT id FROM ramo.node WHERE code=%s",
+    sample=lambda s: ["GEN"],
+)
+
+# hijos directos de GENERALES
+_SQL_GEN_CHILDREN = register_query("ramos.tree.gen_children", """
+    SELECT id, code
+    FROM ramo.node
+    WHERE parent_id = %s AND code IN ('GEN_OBL','GEN_PATR','GEN_PNV')
+    """, sample=lambda s: [s.scalar(_SAMPLE_BUSIEST_PARENT)])
+
+# fallback clásico: parent_id IS NULL
+_SQL_NULL_PARENT_ROOTS = register_query("ramos.tree.null_parent_roots", """
+        SELECT id
+        FROM ramo.node
+        WHERE parent_id IS NULL
+        ORDER BY COALESCE((attrs->>'ord')::int, 999), name
+        LIMIT %s
+        """, sample=lambda s: [50])
+
+
 def _fetch_id_by_code(code: str) -> Optional[str]:
-    sql = "SELECT id FROM ramo.node WHERE code=%s"
-    with connection.cursor() as cur:
-        cur.execute(sql, [code])
+    with read_connection().cursor() as cur:
+        cur.execute(_SQL_ID_BY_CODE, [code])
         row = cur.fetchone()
     return str(row[0]) if row else None
 
@@ -35,21 +70,23 @@ def _presented_roots_ids() -> List[str]:
     # padre GENERALES
     gen_id = _fetch_id_by_code("GEN")
     vid_id = _fetch_id_by_code("VID")
+    _check_presented_anchors(gen_id, vid_id)
+
+    with read_connection().cursor() as cur:
+        cur.execute(_SQL_GEN_CHILDREN, [gen_id])
+        rows = cur.fetchall()
+    return _presented_order(rows, vid_id)
+
+
+def _check_presented_anchors(gen_id: Optional[str], vid_id: Optional[str]) -> None:
     if not vid_id:
         raise ValueError("Nodo 'VID' no encontrado.")
     if not gen_id:
         raise ValueError("Nodo 'GEN' no encontrado.")
 
-    # hijos directos de GENERALES
-    sql = """
-    SELECT id, code
-    FROM ramo.node
-    WHERE parent_id = %s AND code IN ('GEN_OBL','GEN_PATR','GEN_PNV')
-    """
-    with connection.cursor() as cur:
-        cur.execute(sql, [gen_id])
-        rows = cur.fetchall()
-    by_code = {r[1]: str(r[0]) for r in rows}
+
+def _presented_order(gen_children: Sequence[Sequence[Any]], vid_id: str) -> List[str]:
+    by_code = {r[1]: str(r[0]) for r in gen_children}
 
     for need in ("GEN_OBL", "GEN_PATR", "GEN_PNV"):
         if need not in by_code:
@@ -70,36 +107,29 @@ def _sr_allowed_ids(company_id: Optional[str]) -> Optional[Set[str]]:
 
     company_id = _ensure_uuid(company_id)
 
-    # 1) IDs aprobados explícitamente
-    sql_approved = """
-    SELECT n.id
-    FROM ramo.sr_approval a
-    JOIN ramo.node n ON n.id = a.node_id
-    WHERE a.company_id = %s
-    """
-    with connection.cursor() as cur:
-        cur.execute(sql_approved, [company_id])
-        approved = [str(r[0]) for r in cur.fetchall()]
+    with read_connection().cursor() as cur:
+        cur.execute(_SQL_SR_ALLOWED, [company_id])
+        rows = cur.fetchall()
+
+    # set() si no hay aprobaciones: nada visible
+    return {str(r[0]) for r in rows}
 
-    if not approved:
-        return set()  # nada visible
 
-    # 2) Expandir descendientes (aprobación en L3 propaga a L4)
-    sql_desc = """
+# IDs aprobados explícitamente + sus descendientes (aprobación en L3 propaga a L4),
+# en un solo roundtrip
+_SQL_SR_ALLOWED = register_query("ramos.tree.sr_allowed", """
     WITH RECURSIVE t AS (
-      SELECT id FROM ramo.node WHERE id = ANY(%s)
+      SELECT n.id
+      FROM ramo.sr_approval a
+      JOIN ramo.node n ON n.id = a.node_id
+      WHERE a.company_id = %s
       UNION ALL
       SELECT n.id
       FROM ramo.node n
       JOIN t ON n.parent_id = t.id
     )
     SELECT id FROM t;
-    """
-    with connection.cursor() as cur:
-        cur.execute(sql_desc, [approved])
-        rows = cur.fetchall()
-
-    return {str(r[0]) for r in rows}
+    """, sample=lambda s: [s.scalar(_SAMPLE_COMPANY)])
 
 
 def _build_subtree(root_id: str, depth: int) -> Dict[str, Any]:
@@ -108,7 +138,13 @@ def _build_subtree(root_id: str, depth: int) -> Dict[str, Any]:
     - attrs (jsonb) del nodo
     - uniformDocs: ['CG','CP','RA', ...] donde is_uniform = true
     """
-    sql_cte = """
+    with read_connection().cursor() as cur:
+        cur.execute(_SQL_SUBTREE, [root_id, depth])
+        rows = cur.fetchall()
+    return _subtree_from_rows(root_id, rows)
+
+
+_SQL_SUBTREE = register_query("ramos.tree.subtree", """
     WITH RECURSIVE t AS (
       SELECT id, code, name, level, kind, parent_id, attrs, 1 AS d
       FROM ramo.node WHERE id = %s
@@ -129,12 +165,10 @@ def _build_subtree(root_id: str, depth: int) -> Dict[str, Any]:
       COALESCE((SELECT (attrs->>'ord')::int FROM ramo.node x WHERE x.id=t.id), 999) AS ord
     FROM t
     ORDER BY d, ord, name;
-    """
+    """, sample=lambda s: [s.scalar(_SAMPLE_ROOT), 4])
 
-    with connection.cursor() as cur:
-        cur.execute(sql_cte, [root_id, depth])
-        rows = cur.fetchall()
 
+def _subtree_from_rows(root_id: str, rows: Sequence[Sequence[Any]]) -> Dict[str, Any]:
     by_id: Dict[str, Dict[str, Any]] = {}
     children_map: Dict[str, List[Dict[str, Any]]] = {}
 
@@ -206,7 +240,7 @@ def get_roots_presented() -> List[Dict[str, Any]]:
     FROM ramo.node
     WHERE id = ANY(%s)
     """
-    with connection.cursor() as cur:
+    with read_connection().cursor() as cur:
         cur.execute(sql, [root_ids])
         rows = cur.fetchall()
 
@@ -245,7 +279,7 @@ def get_roots(presented: bool = True, limit: int = 50) -> List[Dict[str, Any]]:
     ORDER BY COALESCE((attrs->>'ord')::int, 999), name
     LIMIT %s;
     """
-    with connection.cursor() as cur:
+    with read_connection().cursor() as cur:
         cur.execute(sql, [limit])
         rows = cur.fetchall()
     return [
@@ -255,19 +289,21 @@ def get_roots(presented: bool = True, limit: int = 50) -> List[Dict[str, Any]]:
     ]
 
 
-def get_children(parent_id: Any) -> List[Dict[str, Any]]:
-    """
-    Compat: hijos directos de un nodo (N+1).
-    """
-    pid = _ensure_uuid(parent_id)
-    sql = """
+_SQL_CHILDREN = register_query("ramos.tree.children", """
     SELECT id, code, name, level, kind
     FROM ramo.node
     WHERE parent_id = %s
     ORDER BY COALESCE((attrs->>'ord')::int, 999), name;
+    """, sample=lambda s: [s.scalar(_SAMPLE_BUSIEST_PARENT)])
+
+
+def get_children(parent_id: Any) -> List[Dict[str, Any]]:
+    """
+    Compat: hijos directos de un nodo (N+1).
     """
-    with connection.cursor() as cur:
-        cur.execute(sql, [pid])
+    pid = _ensure_uuid(parent_id)
+    with read_connection().cursor() as cur:
+        cur.execute(_SQL_CHILDREN, [pid])
         rows = cur.fetchall()
     return [
         {"id": r[0], "code": r[1], "name": r[2],
@@ -290,29 +326,70 @@ def get_tree(
     if presented:
         root_ids = _presented_roots_ids()
     else:
-        # fallback clásico: parent_id IS NULL
-        sql = """
-        SELECT id
-        FROM ramo.node
-        WHERE parent_id IS NULL
-        ORDER BY COALESCE((attrs->>'ord')::int, 999), name
-        LIMIT %s
-        """
-        with connection.cursor() as cur:
-            cur.execute(sql, [limit])
+        with read_connection().cursor() as cur:
+            cur.execute(_SQL_NULL_PARENT_ROOTS, [limit])
             root_ids = [str(r[0]) for r in cur.fetchall()]
 
     # None (sin filtro) | set() (nada) | set(ids)
     allowed = _sr_allowed_ids(company_id)
 
+    return _visible_subtrees([_build_subtree(rid, depth) for rid in root_ids], allowed)
+
+
+def _visible_subtrees(subtrees: List[Dict[str, Any]], allowed: Optional[Set[str]]) -> List[Dict[str, Any]]:
     out: List[Dict[str, Any]] = []
-    for rid in root_ids:
-        subtree = _build_subtree(rid, depth)
+    for subtree in subtrees:
         if allowed is not None:
             filtered = _filter_tree_by_allowed_ids(subtree, allowed)
             if filtered:
                 out.append(filtered)
         else:
             out.append(subtree)
-
     return out
+
+
+# ---------------- Async (vistas ASGI) ----------------
+# Mismo SQL y mismo armado que get_tree(), sobre common.db.aio: las raíces, el filtro SR
+# y cada subárbol son consultas independientes y corren en paralelo.
+
+
+async def _apresented_roots_ids(user_id: Optional[int]) -> List[str]:
+    gen, vid = await asyncio.gather(
+        aio.fetchone(_SQL_ID_BY_CODE, ["GEN"], user_id=user_id),
+        aio.fetchone(_SQL_ID_BY_CODE, ["VID"], user_id=user_id),
+    )
+    gen_id, vid_id = (str(gen[0]) if gen else None), (str(vid[0]) if vid else None)
+    _check_presented_anchors(gen_id, vid_id)
+    rows = await aio.fetch(_SQL_GEN_CHILDREN, [gen_id], user_id=user_id)
+    return _presented_order(rows, vid_id)
+
+
+async def _asr_allowed_ids(company_id: Optional[str], user_id: Optional[int]) -> Optional[Set[str]]:
+    if not company_id:
+        return None
+    rows = await aio.fetch(_SQL_SR_ALLOWED, [_ensure_uuid(company_id)], user_id=user_id)
+    return {str(r[0]) for r in rows}
+
+
+async def aget_tree(
+    user_id: Optional[int],
+    depth: int = 4,
+    limit: int = 50,
+    company_id: Optional[str] = None,
+    presented: bool = True
+) -> List[Dict[str, Any]]:
+    """Versión async de get_tree(): mismo resultado, consultas independientes en paralelo."""
+    if presented:
+        roots = _apresented_roots_ids(user_id)
+    else:
+        roots = aio.fetch(_SQL_NULL_PARENT_ROOTS, [limit], user_id=user_id)
+    root_ids, allowed = await asyncio.gather(roots, _asr_allowed_ids(company_id, user_id))
+    if not presented:
+        root_ids = [str(r[0]) for r in root_ids]
+
+    row_sets = await asyncio.gather(
+        *(aio.fetch(_SQL_SUBTREE, [rid, depth], user_id=user_id) for rid in root_ids)
+    )
+    return _visible_subtrees(
+        [_subtree_from_rows(rid, rows) for rid, rows in zip(root_ids, row_sets)], allowed
+    )
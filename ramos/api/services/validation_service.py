@@ -4,6 +4,8 @@ from django.db import connection
 import re
 import uuid
 
+from common.db.query_registry import register_query
+
 # Acepta UUID con o sin guiones
 UUID_RX = re.compile(r"^[0-9a-fA-F-]{32,36}$")
 
@@ -122,18 +124,20 @@ def _leaf_requires_modalities(node_id: Any) -> bool:
     return int(n or 0) > 0
 
 
-def _allowed_modalities(node_id: Any) -> List[str]:
-    node_id = _ensure_uuid(node_id)
-    sql = """
+_SQL_ALLOWED_MODALITIES = register_query("ramos.validation.allowed_modalities", """
     SELECT UPPER(m.code)
     FROM ramo.node_modalidad nm
     JOIN ramo.modalidad m ON m.id = nm.modalidad_id
     WHERE nm.node_id = %s AND nm.is_enabled = true
       AND m.code IN ('IND','COL')
     ORDER BY m.code;
-    """
+    """, sample=lambda s: [s.scalar("SELECT node_id FROM ramo.node_modalidad WHERE is_enabled LIMIT 1")])
+
+
+def _allowed_modalities(node_id: Any) -> List[str]:
+    node_id = _ensure_uuid(node_id)
     with connection.cursor() as cur:
-        cur.execute(sql, [node_id])
+        cur.execute(_SQL_ALLOWED_MODALITIES, [node_id])
         rows = cur.fetchall()
     return [r[0] for r in rows]
 
@@ -0,0 +1,54 @@
+# products-backend/ramos/api/views/aio.py
+from common.api.views.aio import AsyncReadView, error_response, json_response
+from ramos.api.services.commission_service import acompute_commission_from_paths, aget_commission_cap
+from ramos.api.services.tree_service import aget_tree
+
+
+class AsyncRamosTreeView(AsyncReadView):
+    """Variante ASGI de RamosTreeView: raíces, filtro SR y subárboles en paralelo."""
+
+    async def get(self, request):
+        try:
+            depth = int(request.GET.get("depth") or 4)
+            limit = int(request.GET.get("limit") or 50)
+            presented = (str(request.GET.get("presented")
+                         or "true").lower() != "false")
+        except Exception:
+            return error_response("400.PARAMS_INVALID", "depth/limit deben ser enteros.", status=400)
+
+        if depth < 1 or depth > 6:
+            return error_response("400.DEPTH_RANGE", "depth debe estar entre 1 y 6.", status=400)
+
+        # Igual que RamosTreeView: sin filtro SR. El TokenUser trae company_id del claim,
+        # pero la vista sync nunca filtró por empresa y ambas deben responder lo mismo.
+        data = await aget_tree(request.user.id, depth=depth, limit=limit, presented=presented)
+        return json_response({"roots": data})
+
+
+class AsyncCommissionCapView(AsyncReadView):
+    """Variante ASGI de CommissionCapView: cada trayectoria se evalúa en paralelo."""
+
+    async def post(self, request):
+        try:
+            body = self.json_body(request) or {}
+        except ValueError as e:
+            return error_response("400.PARAMS_INVALID", str(e), status=400)
+
+        # Nuevo: trayectorias
+        if "main" in body or "annex" in body:
+            try:
+                result = await acompute_commission_from_paths(body, request.user.id)
+            except ValueError as e:
+                return error_response("400.VALIDATION", str(e), status=400)
+            return json_response(result)
+
+        # Legacy:
+        ramo_ids = body.get("ramo_ids")
+        if not isinstance(ramo_ids, list) or len(ramo_ids) == 0:
+            return error_response("400.MISSING", "ramo_ids requerido.", status=400)
+
+        try:
+            commission_data = await aget_commission_cap(ramo_ids, request.user.id, body.get("modalidad_id"))
+        except ValueError as e:
+            return error_response("400.VALIDATION", str(e), status=400)
+        return json_response(commission_data)
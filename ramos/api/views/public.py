@@ -89,9 +89,9 @@ class RamosTreeView(APIView):
         if depth < 1 or depth > 6:
             return Response({"code": "400.DEPTH_RANGE", "detail": "depth debe estar entre 1 y 6."}, status=400)
 
-        company_id = getattr(request.user, "company_id", None)
-        data = get_tree(depth=depth, limit=limit,
-                        company_id=company_id, presented=presented)
+        # Sin filtro SR: el árbol público es el mismo para todas las empresas
+        # (AsyncRamosTreeView debe responder igual)
+        data = get_tree(depth=depth, limit=limit, presented=presented)
         return Response({"roots": data})
 
 
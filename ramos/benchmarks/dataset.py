@@ -0,0 +1,266 @@
+# products-backend/ramos/benchmarks/dataset.py
+import random
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.db import connection, transaction
+
+# ---------------------------------------------------------------------------
+# Taxonomía sintética de ramos para benchmarks
+# ---------------------------------------------------------------------------
+# Genera de forma determinista (misma semilla → mismos ids) una taxonomía con la forma
+# que esperan los servicios:
+#
+#   GEN (CATEGORY, L1) ─┬─ GEN_OBL / GEN_PATR / GEN_PNV (CATEGORY, L2) ─┐
+#   VID (CATEGORY, L1) ─┴───────────────────────────────────────────────┴─ subcategorías
+#     (CATEGORY) → RAMO → OPTION (hojas; en los ramos con modalidades, INDIVIDUAL/COLECTIVO)
+#
+# con el fan-out ajustado para llegar a 'size' filas de ramo.node (1k a 1M), más:
+#   - ramo.node_modalidad IND/COL en una fracción de los ramos;
+#   - ramo.commission_rule FIXED_PERCENT generales y por modalidad (ramos y subcategorías,
+#     para ejercitar la subida por el chain);
+#   - accounting.ramo_contable + ramo_to_contable en subcategorías y algunos ramos (el
+#     resto hereda o queda sin contable, para audit_unmapped_by_scope);
+#   - ramo.sr_approval de varias empresas sobre subcategorías;
+#   - ramo.doc_requirement (uniformDocs) en los ramos.
+#
+# Las filas se cargan con COPY. Pensado para una base de benchmark: reset=True vacía
+# las tablas de la taxonomía antes de cargar.
+
+MIN_SIZE = 1_000
+MAX_SIZE = 1_000_000
+
+MODALITY_OPTIONS = (("IND", "INDIVIDUAL"), ("COL", "COLECTIVO"))
+
+TAXONOMY_TABLES = (
+    "ramo.doc_requirement",
+    "ramo.sr_approval",
+    "ramo.commission_rule",
+    "ramo.node_modalidad",
+    "accounting.ramo_to_contable",
+    "accounting.ramo_contable",
+    "ramo.node",
+)
+
+
+@dataclass
+class DatasetSpec:
+    size: int = 10_000
+    seed: int = 42
+    companies: int = 5
+    contables: int = 50
+    modal_ramo_ratio: float = 0.3       # ramos con modalidades IND/COL
+    ramo_rule_ratio: float = 0.5        # ramos con regla propia
+    category_rule_ratio: float = 0.5    # subcategorías con regla (heredable)
+    category_contable_ratio: float = 0.6
+    ramo_contable_ratio: float = 0.1
+    sr_ratio: float = 0.3               # subcategorías aprobadas por empresa
+
+    def validate(self) -> None:
+        if not MIN_SIZE <= self.size <= MAX_SIZE:
+            raise ValueError(f"size debe estar entre {MIN_SIZE} y {MAX_SIZE}.")
+
+
+@dataclass
+class DatasetSummary:
+    nodes: int = 0
+    categories: int = 0
+    ramos: int = 0
+    options: int = 0
+    node_modalidades: int = 0
+    commission_rules: int = 0
+    contables: int = 0
+    contable_mappings: int = 0
+    sr_approvals: int = 0
+    doc_requirements: int = 0
+    companies: List[str] = field(default_factory=list)
+
+
+class _Builder:
+    def __init__(self, spec: DatasetSpec):
+        self.spec = spec
+        self.rng = random.Random(spec.seed)
+        self.nodes: List[Tuple] = []
+        self.levels: Dict[uuid.UUID, int] = {}
+        self.limit = spec.size
+        self.subcategories: List[uuid.UUID] = []
+        self.ramos: List[Tuple[uuid.UUID, str, bool]] = []   # (id, code, modal)
+
+    def new_id(self) -> uuid.UUID:
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def node(self, code: str, name: str, level: int, kind: str, parent: Optional[uuid.UUID], ord_: int) -> uuid.UUID:
+        nid = self.new_id()
+        self.nodes.append((nid, code, name, level, kind, parent, {"ord": ord_}, True))
+        self.levels[nid] = level
+        return nid
+
+    def fanout(self, mean: float) -> int:
+        return max(1, int(round(self.rng.uniform(0.5, 1.5) * mean)))
+
+    def build(self) -> None:
+        size = self.spec.size
+        gen = self.node("GEN", "Generales", 1, "CATEGORY", None, 1)
+        vid = self.node("VID", "Vida", 1, "CATEGORY", None, 2)
+        anchors = [
+            (self.node(code, name, 2, "CATEGORY", gen, i), code, 2)
+            for i, (code, name) in enumerate(
+                (("GEN_OBL", "Obligacionales"), ("GEN_PATR", "Patrimoniales"), ("GEN_PNV", "Personas no Vida")),
+                start=1,
+            )
+        ] + [(vid, "VID", 1)]
+
+        # Bajo cada ancla: subcategoría → ramo → opción; f + f² + f³ ≈ filas por ancla.
+        # Cada ancla tiene su cupo para que el fan-out aleatorio no deje vacías a las últimas.
+        per_anchor = (size - len(self.nodes)) / len(anchors)
+        f = max(2.0, _solve_fanout(per_anchor))
+
+        for n, (anchor_id, anchor_code, anchor_level) in enumerate(anchors, start=1):
+            self.limit = min(size, int(len(anchors) + 2 + per_anchor * n))
+            for i in range(1, self.fanout(f) + 1):
+                if len(self.nodes) >= self.limit:
+                    break
+                sub_code = f"{anchor_code}_S{i}"
+                sub = self.node(sub_code, f"Subcategoría {anchor_code} {i}", anchor_level + 1, "CATEGORY", anchor_id, i)
+                self.subcategories.append(sub)
+                for j in range(1, self.fanout(f) + 1):
+                    if len(self.nodes) >= self.limit:
+                        break
+                    self._ramo(sub, f"{sub_code}_R{j}", anchor_level + 2, j, f)
+
+        # El fan-out aleatorio puede quedarse corto: completar con ramos en subcategorías al azar
+        self.limit = size
+        while len(self.nodes) < size and self.subcategories:
+            sub = self.rng.choice(self.subcategories)
+            self._ramo(sub, f"X{len(self.nodes)}", self.levels[sub] + 1, len(self.nodes), f)
+
+    def _ramo(self, parent: uuid.UUID, code: str, level: int, ord_: int, f: float) -> None:
+        modal = self.rng.random() < self.spec.modal_ramo_ratio
+        ramo = self.node(code, f"Ramo {code}", level, "RAMO", parent, ord_)
+        self.ramos.append((ramo, code, modal))
+        if modal:
+            for k, (mcode, mname) in enumerate(MODALITY_OPTIONS, start=1):
+                self.node(f"{code}_{mcode}", mname, level + 1, "OPTION", ramo, k)
+            return
+        for k in range(1, self.fanout(f) + 1):
+            if len(self.nodes) >= self.limit:
+                return
+            self.node(f"{code}_O{k}", f"Opción {k}", level + 1, "OPTION", ramo, k)
+
+
+def _solve_fanout(rows: float) -> float:
+    """f tal que f + f² + f³ ≈ rows."""
+    lo, hi = 1.0, max(2.0, rows ** (1 / 3) + 1)
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        if mid + mid ** 2 + mid ** 3 < rows:
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+def _copy(cur, table: str, columns: Tuple[str, ...], rows) -> int:
+    n = 0
+    with cur.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+        for row in rows:
+            copy.write_row(row)
+            n += 1
+    return n
+
+
+def _modalidad_ids(cur) -> Dict[str, Any]:
+    ids = {}
+    for code, name in MODALITY_OPTIONS:
+        cur.execute("SELECT id FROM ramo.modalidad WHERE code = %s", [code])
+        row = cur.fetchone()
+        if row is None:
+            cur.execute("INSERT INTO ramo.modalidad (id, code, name) VALUES (%s, %s, %s) RETURNING id",
+                        [uuid.uuid4(), code, name.title()])
+            row = cur.fetchone()
+        ids[code] = row[0]
+    return ids
+
+
+def _company_ids(cur, rng: random.Random, n: int) -> List[Any]:
+    """Empresas reales si las hay (security.actor); si no, ids sintéticos."""
+    cur.execute('SELECT DISTINCT company_id FROM "security".actor WHERE company_id IS NOT NULL ORDER BY 1 LIMIT %s', [n])
+    found = [r[0] for r in cur.fetchall()]
+    while len(found) < n:
+        found.append(uuid.UUID(int=rng.getrandbits(128), version=4))
+    return found
+
+
+def seed_dataset(spec: DatasetSpec, reset: bool = False) -> DatasetSummary:
+    """Carga la taxonomía sintética en una transacción. Sin reset, exige ramo.node vacía."""
+    from psycopg.types.json import Jsonb
+
+    spec.validate()
+    b = _Builder(spec)
+    b.build()
+    rng = b.rng
+    summary = DatasetSummary()
+
+    with transaction.atomic(), connection.cursor() as cur:
+        if reset:
+            cur.execute(f"TRUNCATE {', '.join(TAXONOMY_TABLES)} CASCADE")
+        else:
+            cur.execute("SELECT EXISTS (SELECT 1 FROM ramo.node)")
+            if cur.fetchone()[0]:
+                raise ValueError("ramo.node no está vacía: usar reset para reemplazar la taxonomía.")
+
+        summary.nodes = _copy(
+            cur, "ramo.node", ("id", "code", "name", "level", "kind", "parent_id", "attrs", "is_active"),
+            ((nid, code, name, level, kind, parent, Jsonb(attrs), active)
+             for nid, code, name, level, kind, parent, attrs, active in b.nodes),
+        )
+        kinds = [row[4] for row in b.nodes]
+        summary.categories, summary.ramos, summary.options = (
+            kinds.count("CATEGORY"), kinds.count("RAMO"), kinds.count("OPTION"))
+
+        modalidades = _modalidad_ids(cur)
+        summary.node_modalidades = _copy(
+            cur, "ramo.node_modalidad", ("id", "node_id", "modalidad_id", "is_enabled", "attrs"),
+            ((b.new_id(), ramo, modalidades[mcode], True, Jsonb({"ord": k}))
+             for ramo, _code, modal in b.ramos if modal
+             for k, (mcode, _name) in enumerate(MODALITY_OPTIONS, start=1)),
+        )
+
+        rules = []
+        for ramo, _code, modal in b.ramos:
+            if rng.random() < spec.ramo_rule_ratio:
+                rules.append((ramo, "FIXED_PERCENT", Jsonb({"percent": rng.randint(5, 30)})))
+                if modal:
+                    rules.append((ramo, "FIXED_PERCENT",
+                                  Jsonb({"percent": rng.randint(5, 30), "modality": "INDIVIDUAL"})))
+        for sub in b.subcategories:
+            if rng.random() < spec.category_rule_ratio:
+                rules.append((sub, "FIXED_PERCENT", Jsonb({"percent": rng.randint(5, 30)})))
+        summary.commission_rules = _copy(cur, "ramo.commission_rule", ("node_id", "rule_type", "rule_value"), rules)
+
+        contables = [(b.new_id(), f"C{i:03d}", f"Contable {i:03d}") for i in range(1, spec.contables + 1)]
+        summary.contables = _copy(cur, "accounting.ramo_contable", ("id", "code", "name"), contables)
+        mapped = [s for s in b.subcategories if rng.random() < spec.category_contable_ratio]
+        mapped += [r[0] for r in b.ramos if rng.random() < spec.ramo_contable_ratio]
+        summary.contable_mappings = _copy(
+            cur, "accounting.ramo_to_contable", ("node_id", "idramo_contable"),
+            ((nid, rng.choice(contables)[0]) for nid in mapped),
+        )
+
+        companies = _company_ids(cur, rng, spec.companies)
+        summary.companies = [str(c) for c in companies]
+        summary.sr_approvals = _copy(
+            cur, "ramo.sr_approval", ("company_id", "node_id"),
+            ((company, sub) for company in companies for sub in b.subcategories if rng.random() < spec.sr_ratio),
+        )
+
+        summary.doc_requirements = _copy(
+            cur, "ramo.doc_requirement", ("node_id", "doc_type", "is_uniform"),
+            ((ramo, doc, rng.random() < 0.5) for ramo, _code, _modal in b.ramos for doc in ("CG", "CP", "RA")),
+        )
+
+    with connection.cursor() as cur:
+        for table in TAXONOMY_TABLES:
+            cur.execute(f"ANALYZE {table}")
+    return summary
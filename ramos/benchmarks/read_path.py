@@ -0,0 +1,140 @@
+# products-backend/ramos/benchmarks/read_path.py
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+from django.db import connection
+
+from ramos.api.services.commission_service import compute_commission_from_paths
+from ramos.api.services.contable_service import audit_unmapped_by_scope, resolve_contables_for_node
+from ramos.api.services.tree_service import get_tree
+from ramos.api.services.validation_service import validate_path_and_modalidades
+
+# ---------------------------------------------------------------------------
+# Benchmark de lectura de ramos
+# ---------------------------------------------------------------------------
+# Casos sobre la taxonomía cargada (ver ramos/benchmarks/dataset.py). Las entradas se
+# eligen de la base de forma determinista (ORDER BY id), así dos corridas sobre el mismo
+# dataset (misma semilla) miden lo mismo y son comparables con la baseline.
+#
+# Los casos de auditoría recorren todos los nodos del scope con N+1 consultas: se marcan
+# 'slow' (1 iteración) y por encima de SLOW_CASES_MAX_NODES solo corren con include_slow.
+#
+# Baselines: baselines/read_path.json, escrito por `manage.py ramos_bench_read --save-baseline`
+# en el host de benchmarks; una entrada por dataset de BASELINE_SIZES (seed 42: el generador
+# deja exactamente 'size' nodos, clave "nodes=<size>"). Sin entrada, --check falla.
+
+BASELINES_PATH = Path(__file__).with_name("baselines") / "read_path.json"
+SLOW_CASES_MAX_NODES = 50_000
+BASELINE_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+COMMISSION_PATHS = 10
+
+_SQL_CHAIN = """
+    WITH RECURSIVE chain AS (
+      SELECT id, parent_id, 0 AS lvl FROM ramo.node WHERE id = %s
+      UNION ALL
+      SELECT n.id, n.parent_id, c.lvl + 1 FROM ramo.node n JOIN chain c ON n.id = c.parent_id
+    )
+    SELECT id FROM chain ORDER BY lvl DESC
+    """
+
+
+@dataclass
+class ReadCase:
+    name: str
+    fn: Callable[[], Any]
+    slow: bool = False
+
+
+@dataclass
+class ReadSamples:
+    nodes: int
+    company_id: Optional[str]
+    commission_paths: List[List[str]]
+    modal_ramo_path: Optional[List[str]]
+    deep_leaf: Optional[str]
+
+
+def _ids(cur, sql: str, params: Optional[list] = None) -> List[str]:
+    cur.execute(sql, params or [])
+    return [str(r[0]) for r in cur.fetchall()]
+
+
+def _path_to(cur, node_id: str) -> List[str]:
+    """Path raíz → nodo, como lo envía el front."""
+    return _ids(cur, _SQL_CHAIN, [node_id])
+
+
+def load_samples() -> ReadSamples:
+    with connection.cursor() as cur:
+        cur.execute("SELECT count(*) FROM ramo.node")
+        nodes = cur.fetchone()[0]
+        company = _ids(cur, "SELECT company_id FROM ramo.sr_approval ORDER BY company_id LIMIT 1")
+
+        # Mitad hojas modales (la regla se busca desde el ramo con modalidad), mitad genéricas
+        half = COMMISSION_PATHS // 2
+        leaves = _ids(cur, """
+            SELECT id FROM ramo.node
+            WHERE kind = 'OPTION' AND name IN ('INDIVIDUAL', 'COLECTIVO')
+            ORDER BY id LIMIT %s
+            """, [half])
+        leaves += _ids(cur, """
+            SELECT id FROM ramo.node
+            WHERE kind = 'OPTION' AND name NOT IN ('INDIVIDUAL', 'COLECTIVO')
+            ORDER BY id LIMIT %s
+            """, [COMMISSION_PATHS - len(leaves)])
+        modal_ramo = _ids(cur, """
+            SELECT nm.node_id FROM ramo.node_modalidad nm
+            WHERE nm.is_enabled ORDER BY nm.node_id LIMIT 1
+            """)
+        deep_leaf = _ids(cur, "SELECT id FROM ramo.node ORDER BY level DESC, id LIMIT 1")
+
+        return ReadSamples(
+            nodes=nodes,
+            company_id=company[0] if company else None,
+            commission_paths=[_path_to(cur, leaf) for leaf in leaves],
+            modal_ramo_path=_path_to(cur, modal_ramo[0]) if modal_ramo else None,
+            deep_leaf=deep_leaf[0] if deep_leaf else None,
+        )
+
+
+def read_cases(s: ReadSamples) -> List[ReadCase]:
+    cases = [
+        ReadCase("tree.presented.depth4", lambda: get_tree(depth=4, presented=True)),
+        ReadCase("tree.presented.depth2", lambda: get_tree(depth=2, presented=True)),
+    ]
+    if s.company_id:
+        cases.append(ReadCase("tree.presented.sr_filter",
+                              lambda: get_tree(depth=4, presented=True, company_id=s.company_id)))
+    if s.commission_paths:
+        body = {"main": s.commission_paths, "annex": s.commission_paths[:2]}
+        cases.append(ReadCase(f"commission.paths.{len(s.commission_paths)}+2",
+                              lambda: compute_commission_from_paths(body)))
+    if s.modal_ramo_path:
+        cases.append(ReadCase("validation.modal_ramo",
+                              lambda: validate_path_and_modalidades(s.modal_ramo_path, ["IND"])))
+    if s.deep_leaf:
+        cases.append(ReadCase("contables.resolve.deep_leaf", lambda: resolve_contables_for_node(s.deep_leaf)))
+    cases += [
+        ReadCase("audit.unmapped.category", lambda: audit_unmapped_by_scope("category"), slow=True),
+        ReadCase("audit.unmapped.ramo", lambda: audit_unmapped_by_scope("ramo"), slow=True),
+        ReadCase("audit.unmapped.leaf", lambda: audit_unmapped_by_scope("leaf"), slow=True),
+    ]
+    return cases
+
+
+def dataset_key(s: ReadSamples) -> str:
+    return f"nodes={s.nodes}"
+
+
+def select_cases(s: ReadSamples, only: Optional[str], include_slow: bool) -> Tuple[List[ReadCase], List[str]]:
+    """(casos a correr, nombres omitidos por lentos)."""
+    chosen, skipped = [], []
+    for case in read_cases(s):
+        if only and not case.name.startswith(only):
+            continue
+        if case.slow and s.nodes > SLOW_CASES_MAX_NODES and not include_slow:
+            skipped.append(case.name)
+            continue
+        chosen.append(case)
+    return chosen, skipped
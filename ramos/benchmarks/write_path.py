@@ -0,0 +1,126 @@
+# products-backend/ramos/benchmarks/write_path.py
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.db import connection, transaction
+
+from ramos.api.services.contable_service import bulk_insert_mappings, bulk_replace_mappings, bulk_upsert_mappings
+
+# ---------------------------------------------------------------------------
+# Benchmark de escritura: mapeos ramo → contable en bloque
+# ---------------------------------------------------------------------------
+# Los modos de AdminContableMappingBulkView (insert, upsert, replace) sobre 'rows' filas
+# de ramos del dataset sintético. Cada submitter trabaja sobre su propio bloque de ramos
+# salvo con overlap=True, donde todos envían el mismo bloque (contención por las mismas
+# filas: duplicados concurrentes, esperas de lock).
+#
+# Estado de partida, preparado antes de cada operación y fuera de la medición (con
+# overlap, una sola vez antes de la corrida):
+#   - insert:  los ramos del bloque sin vínculos (todas las filas insertan);
+#   - upsert:  la mitad de las filas ya existe (se omiten como duplicadas);
+#   - replace: cada ramo con un vínculo a otra contable (se borra y se reinserta).
+# Como la vista, los servicios corren en autocommit; atomic=True los envuelve en una
+# transacción. MappingFixture.restore() deja los vínculos de los ramos usados como
+# estaban antes de la corrida.
+
+MODES: Dict[str, Callable[[List[Dict[str, str]]], Dict[str, Any]]] = {
+    "insert": bulk_insert_mappings,
+    "upsert": bulk_upsert_mappings,
+    "replace": bulk_replace_mappings,
+}
+
+_SQL_RAMOS = "SELECT id, code FROM ramo.node WHERE kind = 'RAMO' ORDER BY id LIMIT %s"
+_SQL_CONTABLES = "SELECT id, code FROM accounting.ramo_contable ORDER BY code"
+_SQL_MAPPINGS = "SELECT node_id, idramo_contable FROM accounting.ramo_to_contable WHERE node_id = ANY(%s)"
+_SQL_DELETE = "DELETE FROM accounting.ramo_to_contable WHERE node_id = ANY(%s)"
+_SQL_INSERT = "INSERT INTO accounting.ramo_to_contable (node_id, idramo_contable) SELECT * FROM unnest(%s::uuid[], %s::uuid[])"
+
+
+@dataclass
+class BulkSamples:
+    ramos: List[Tuple[Any, str]]         # (id, code)
+    contables: List[Tuple[Any, str]]     # (id, code)
+
+
+def load_samples(ramos: int) -> BulkSamples:
+    with connection.cursor() as cur:
+        cur.execute(_SQL_RAMOS, [ramos])
+        nodes = cur.fetchall()
+        cur.execute(_SQL_CONTABLES)
+        return BulkSamples(ramos=nodes, contables=cur.fetchall())
+
+
+class MappingFixture:
+    def __init__(self, samples: BulkSamples, mode: str, rows: int, overlap: bool):
+        if len(samples.contables) < 2:
+            raise ValueError("Se necesitan al menos 2 contables: cargar un dataset con `manage.py ramos_seed_dataset`.")
+        self.samples, self.mode, self.rows, self.overlap = samples, mode, rows, overlap
+        self.snapshot: List[Tuple[Any, Any]] = []
+        self.node_ids: List[Any] = []
+
+    def block(self, worker: int) -> List[Tuple[Any, str]]:
+        start = 0 if self.overlap else worker * self.rows
+        return self.samples.ramos[start:start + self.rows]
+
+    def rows_for(self, worker: int) -> List[Dict[str, str]]:
+        contables = self.samples.contables
+        return [{"nodeCode": code, "contCode": contables[k % len(contables)][1]}
+                for k, (_id, code) in enumerate(self.block(worker))]
+
+    def _pairs(self, worker: int) -> List[Tuple[Any, Any]]:
+        """Vínculos de partida del bloque según el modo."""
+        contables = self.samples.contables
+        block = self.block(worker)
+        if self.mode == "upsert":
+            return [(nid, contables[k % len(contables)][0]) for k, (nid, _code) in enumerate(block) if k % 2 == 0]
+        if self.mode == "replace":
+            return [(nid, contables[(k + 1) % len(contables)][0]) for k, (nid, _code) in enumerate(block)]
+        return []
+
+    def save(self, submitters: int) -> None:
+        """Guarda los vínculos actuales de todos los ramos que tocará la corrida."""
+        self.node_ids = [nid for nid, _code in self.samples.ramos[:required_ramos(self.rows, submitters, self.overlap)]]
+        with connection.cursor() as cur:
+            cur.execute(_SQL_MAPPINGS, [self.node_ids])
+            self.snapshot = cur.fetchall()
+
+    def prepare(self, worker: int, i: int = 0) -> None:
+        pairs = self._pairs(worker)
+        with transaction.atomic(), connection.cursor() as cur:
+            cur.execute(_SQL_DELETE, [[nid for nid, _code in self.block(worker)]])
+            if pairs:
+                cur.execute(_SQL_INSERT, [[p[0] for p in pairs], [p[1] for p in pairs]])
+
+    def restore(self) -> None:
+        with transaction.atomic(), connection.cursor() as cur:
+            cur.execute(_SQL_DELETE, [self.node_ids])
+            if self.snapshot:
+                cur.execute(_SQL_INSERT, [[p[0] for p in self.snapshot], [p[1] for p in self.snapshot]])
+
+
+def bulk_op(fixture: MappingFixture, atomic: bool) -> Callable[[int, int], Any]:
+    """op(worker, i) para common.benchmarks.concurrency.run_concurrent."""
+    fn = MODES[fixture.mode]
+
+    def op(worker: int, i: int) -> Any:
+        rows = fixture.rows_for(worker)
+        if not atomic:
+            result = fn(rows)
+        else:
+            with transaction.atomic():
+                result = fn(rows)
+        # El resultado trae ids nuevos en cada corrida: solo los conteos
+        return {k: len(v) for k, v in result.items() if isinstance(v, list)}
+
+    return op
+
+
+def required_ramos(rows: int, submitters: int, overlap: bool) -> int:
+    return rows * (1 if overlap else submitters)
+
+
+def check_samples(samples: BulkSamples, rows: int, submitters: int, overlap: bool) -> Optional[str]:
+    needed = required_ramos(rows, submitters, overlap)
+    if len(samples.ramos) < needed:
+        return f"El dataset tiene {len(samples.ramos)} ramos y la corrida necesita {needed} (rows × submitters)."
+    return None
@@ -0,0 +1,83 @@
+import json
+from dataclasses import asdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from common.application.db import set_db_context_for_user
+from common.benchmarks.concurrency import format_concurrent_table, run_concurrent
+from ramos.benchmarks.write_path import MODES, MappingFixture, bulk_op, check_samples, load_samples, required_ramos
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de escritura de los mapeos ramo → contable en bloque (modos insert, upsert "
+        "y replace de AdminContableMappingBulkView) con N submitters concurrentes: sentencias "
+        "SQL, duración de la transacción, esperas de lock y throughput. Al terminar restaura "
+        "los vínculos de los ramos usados."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mode", nargs="+", choices=sorted(MODES), default=["insert", "upsert", "replace"])
+        parser.add_argument("--rows", type=int, nargs="+", default=[10, 100],
+                            help="Filas por envío; una corrida por valor (default: 10 100).")
+        parser.add_argument("--submitters", type=int, nargs="+", default=[1, 4],
+                            help="Submitters concurrentes; una corrida por valor (default: 1 4).")
+        parser.add_argument("--ops", type=int, default=5, help="Envíos medidos por submitter.")
+        parser.add_argument("--warmup", type=int, default=1)
+        parser.add_argument("--overlap", action="store_true",
+                            help="Todos los submitters envían las mismas filas (contención).")
+        parser.add_argument("--atomic", action="store_true",
+                            help="Envolver cada envío en una transacción (la vista corre en autocommit).")
+        parser.add_argument("--user-id", type=int, help="Ejecutar con el contexto RLS de este usuario.")
+        parser.add_argument("--sample-interval-ms", type=int, default=10,
+                            help="Intervalo de muestreo de pg_stat_activity para esperas de lock.")
+        parser.add_argument("--json", action="store_true", help="Salida JSON.")
+
+    def handle(self, *args, **opts):
+        user_id = opts["user_id"]
+
+        def setup(worker: int) -> None:
+            if user_id is not None:
+                set_db_context_for_user(user_id)
+
+        setup(-1)
+        samples = load_samples(required_ramos(max(opts["rows"]), max(opts["submitters"]), opts["overlap"]))
+        problem = check_samples(samples, max(opts["rows"]), max(opts["submitters"]), opts["overlap"])
+        if problem:
+            raise CommandError(problem + " Cargar un dataset mayor con `manage.py ramos_seed_dataset`.")
+
+        results = []
+        for mode in opts["mode"]:
+            for rows in opts["rows"]:
+                for submitters in opts["submitters"]:
+                    try:
+                        fixture = MappingFixture(samples, mode, rows, opts["overlap"])
+                    except ValueError as e:
+                        raise CommandError(str(e))
+                    name = f"bulk.{mode}.rows{rows}" + (".overlap" if opts["overlap"] else "") + (
+                        ".atomic" if opts["atomic"] else "")
+                    fixture.save(submitters)
+                    try:
+                        if opts["overlap"]:
+                            fixture.prepare(0)
+                        results.append(run_concurrent(
+                            name, bulk_op(fixture, opts["atomic"]), submitters=submitters,
+                            ops_per_submitter=opts["ops"], warmup=opts["warmup"], setup=setup,
+                            prepare=None if opts["overlap"] else fixture.prepare,
+                            sample_interval=opts["sample_interval_ms"] / 1000,
+                        ))
+                    finally:
+                        fixture.restore()
+                    if not opts["json"]:
+                        r = results[-1]
+                        self.stdout.write(f"  {name} × {submitters}: {r.ops_per_s:.2f} ops/s, p95 {r.p95_ms:.2f} ms")
+
+        if opts["json"]:
+            self.stdout.write(json.dumps([asdict(r) for r in results], ensure_ascii=False, indent=2))
+            return
+
+        self.stdout.write("")
+        for line in format_concurrent_table(results):
+            self.stdout.write(line)
+        if not opts["atomic"]:
+            self.stdout.write("txn: '-' = autocommit (cada sentencia es su propia transacción, como en la vista).")
@@ -0,0 +1,84 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from common.application.db import set_db_context_for_user
+from common.benchmarks.harness import (
+    compare,
+    format_table,
+    load_baselines,
+    measure,
+    missing_from_baseline,
+    save_baseline,
+)
+from ramos.benchmarks.read_path import BASELINES_PATH, dataset_key, load_samples, select_cases
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de lectura de ramos (get_tree, compute_commission_from_paths, "
+        "validate_path_and_modalidades, resolve_contables_for_node, audit_unmapped_by_scope): "
+        "latencia y sentencias SQL por llamada, comparadas con la baseline del dataset."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--only", help="Solo casos cuyo nombre empieza así (p.ej. 'tree.').")
+        parser.add_argument("--include-slow", action="store_true",
+                            help="Correr las auditorías también en datasets grandes.")
+        parser.add_argument("--user-id", type=int, help="Ejecutar con el contexto RLS de este usuario.")
+        parser.add_argument("--baseline-file", default=str(BASELINES_PATH))
+        parser.add_argument("--save-baseline", action="store_true",
+                            help="Guardar los resultados como baseline del dataset actual.")
+        parser.add_argument("--tolerance", type=float, default=0.20,
+                            help="Regresión si p95 supera la baseline en más de esta fracción (default 0.20).")
+        parser.add_argument("--check", action="store_true",
+                            help="Terminar con error si hay regresiones o casos sin baseline para el dataset.")
+
+    def handle(self, *args, **opts):
+        if opts["user_id"] is not None:
+            set_db_context_for_user(opts["user_id"])
+
+        samples = load_samples()
+        if samples.nodes == 0:
+            raise CommandError("ramo.node está vacía: cargar un dataset con `manage.py ramos_seed_dataset`.")
+        cases, skipped = select_cases(samples, opts["only"], opts["include_slow"])
+        key = dataset_key(samples)
+        self.stdout.write(f"Dataset {key}: {len(cases)} casos")
+
+        results = []
+        for case in cases:
+            iterations, warmup = (1, 0) if case.slow else (opts["iterations"], opts["warmup"])
+            results.append(measure(case.name, case.fn, iterations=iterations, warmup=warmup))
+            self.stdout.write(f"  {case.name}: p95 {results[-1].p95_ms:.2f} ms")
+
+        path = Path(opts["baseline_file"])
+        baseline = load_baselines(path).get(key)
+        self.stdout.write("")
+        for line in format_table(results, baseline):
+            self.stdout.write(line)
+        for name in skipped:
+            self.stdout.write(f"{name:40} omitido (dataset > umbral; usar --include-slow)")
+
+        if opts["save_baseline"]:
+            save_baseline(path, key, results)
+            self.stdout.write(self.style.SUCCESS(f"Baseline '{key}' guardada en {path}."))
+            return
+
+        regressions = compare(results, baseline, tolerance=opts["tolerance"])
+        missing = missing_from_baseline(results, baseline)
+        if baseline is None:
+            self.stdout.write(f"Sin baseline para '{key}' (usar --save-baseline).")
+        elif missing:
+            self.stdout.write(f"Casos sin baseline medida en '{key}': {', '.join(missing)} (usar --save-baseline).")
+        if regressions:
+            self.stdout.write(self.style.ERROR("Regresiones:"))
+            for r in regressions:
+                self.stdout.write(f"  {r}")
+        elif not missing:
+            self.stdout.write(self.style.SUCCESS("Sin regresiones frente a la baseline."))
+
+        if opts["check"] and (regressions or missing):
+            # Un dataset o caso sin baseline no puede pasar el check en silencio
+            raise CommandError(f"{len(regressions)} regresiones, {len(missing)} casos sin baseline para '{key}'.")
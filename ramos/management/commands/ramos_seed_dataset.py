@@ -0,0 +1,35 @@
+from dataclasses import asdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ramos.benchmarks.dataset import MAX_SIZE, MIN_SIZE, DatasetSpec, seed_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Carga una taxonomía sintética de ramos (nodos, modalidades, reglas de comisión, contables, "
+        "aprobaciones SR) para benchmarks e index_advisor. Solo para bases de benchmark."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=10_000,
+                            help=f"Filas de ramo.node ({MIN_SIZE} a {MAX_SIZE}, default 10000).")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--companies", type=int, default=5, help="Empresas con aprobaciones SR.")
+        parser.add_argument("--reset", action="store_true",
+                            help="Vaciar (TRUNCATE) las tablas de la taxonomía antes de cargar.")
+        parser.add_argument("--yes", action="store_true", help="Confirmar --reset sin preguntar.")
+
+    def handle(self, *args, **opts):
+        if opts["reset"] and not opts["yes"]:
+            raise CommandError("--reset borra toda la taxonomía de ramos: confirmar con --yes.")
+
+        spec = DatasetSpec(size=opts["size"], seed=opts["seed"], companies=opts["companies"])
+        try:
+            summary = seed_dataset(spec, reset=opts["reset"])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for key, value in asdict(summary).items():
+            self.stdout.write(f"{key:20} {value}")
+        self.stdout.write(self.style.SUCCESS(f"Dataset cargado (size={spec.size}, seed={spec.seed})."))
@@ -0,0 +1,62 @@
+# products-backend/ramos/tests/test_async_parity.py
+from unittest.mock import AsyncMock, patch
+
+from common.tests.parity import AsyncParityTestCase
+from ramos.api.views.aio import AsyncCommissionCapView, AsyncRamosTreeView
+from ramos.api.views.public import CommissionCapView, RamosTreeView
+
+TREE = [{"id": "n1", "code": "GEN", "children": []}]
+CAP = {"cap": 12.5}
+
+
+class RamosTreeParityTests(AsyncParityTestCase):
+    def test_mismos_argumentos_y_respuesta(self):
+        params = {"depth": "3", "limit": "10"}
+        with patch("ramos.api.views.public.get_tree", return_value=TREE) as sync_tree, \
+                patch("ramos.api.views.aio.aget_tree", new=AsyncMock(return_value=TREE)) as async_tree:
+            sync = self.sync_json(RamosTreeView, "get", "/api/ramos/tree/", params)
+            aio = self.async_json(AsyncRamosTreeView, "get", "/api/aio/ramos/tree/", params)
+
+        self.assertEqual(sync, aio)
+        # TokenUser.id sale del claim (texto)
+        self.assertEqual([str(a) for a in async_tree.await_args.args], [str(self.user.pk)])
+        self.assertEqual(sync_tree.call_args.kwargs, async_tree.await_args.kwargs)
+        # Ninguna variante filtra por la empresa del claim
+        self.assertIsNone(async_tree.await_args.kwargs.get("company_id"))
+
+    def test_errores_de_parametros(self):
+        for params in ({"depth": "x"}, {"depth": "9"}):
+            with self.subTest(params=params):
+                sync = self.sync_json(RamosTreeView, "get", "/api/ramos/tree/", params)
+                aio = self.async_json(AsyncRamosTreeView, "get", "/api/aio/ramos/tree/", params)
+                self.assertEqual(sync, aio)
+
+
+class CommissionCapParityTests(AsyncParityTestCase):
+    def test_trayectorias(self):
+        body = {"main": [["a", "b"]], "annex": []}
+        with patch("ramos.api.views.public.compute_commission_from_paths", return_value=CAP) as sync_fn, \
+                patch("ramos.api.views.aio.acompute_commission_from_paths",
+                      new=AsyncMock(return_value=CAP)) as async_fn:
+            sync = self.sync_json(CommissionCapView, "post", "/api/commission/cap/", body)
+            aio = self.async_json(AsyncCommissionCapView, "post", "/api/aio/commission/cap/", body)
+
+        self.assertEqual(sync, aio)
+        self.assertEqual(sync_fn.call_args.args[0], async_fn.await_args.args[0])
+
+    def test_legacy(self):
+        body = {"ramo_ids": ["r1"], "modalidad_id": "m1"}
+        with patch("ramos.api.views.public.get_commission_cap", return_value=CAP) as sync_fn, \
+                patch("ramos.api.views.aio.aget_commission_cap", new=AsyncMock(return_value=CAP)) as async_fn:
+            sync = self.sync_json(CommissionCapView, "post", "/api/commission/cap/", body)
+            aio = self.async_json(AsyncCommissionCapView, "post", "/api/aio/commission/cap/", body)
+
+        self.assertEqual(sync, aio)
+        self.assertEqual(sync_fn.call_args.args, (["r1"], "m1"))
+        ramo_ids, user_id, modalidad_id = async_fn.await_args.args
+        self.assertEqual((ramo_ids, str(user_id), modalidad_id), (["r1"], str(self.user.pk), "m1"))
+
+    def test_legacy_sin_ramos(self):
+        sync = self.sync_json(CommissionCapView, "post", "/api/commission/cap/", {"ramo_ids": []})
+        aio = self.async_json(AsyncCommissionCapView, "post", "/api/aio/commission/cap/", {"ramo_ids": []})
+        self.assertEqual(sync, aio)
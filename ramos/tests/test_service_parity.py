@@ -0,0 +1,208 @@
+# products-backend/ramos/tests/test_service_parity.py
+import uuid
+from contextlib import contextmanager
+from decimal import Decimal
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase
+
+from common.db import aio
+from ramos.api.services import commission_service as commission
+from ramos.api.services import tree_service as tree
+
+
+def _id(n: int) -> uuid.UUID:
+    return uuid.UUID(f"00000000-0000-4000-8000-{n:012d}")
+
+
+# id, code, name, kind, parent_id, ord
+NODES = [
+    (_id(1), "GEN", "Generales", "CATEGORY", None, 1),
+    (_id(2), "GEN_OBL", "Obligacionales", "CATEGORY", _id(1), 1),
+    (_id(3), "GEN_PATR", "Patrimoniales", "CATEGORY", _id(1), 2),
+    (_id(4), "GEN_PNV", "Personas no Vida", "CATEGORY", _id(1), 3),
+    (_id(5), "VID", "Vida", "CATEGORY", None, 2),
+    (_id(6), "INC", "Incendio", "RAMO", _id(3), 1),
+    (_id(7), "INC_IND", "Individual", "OPTION", _id(6), 1),
+    (_id(8), "INC_COL", "Colectivo", "OPTION", _id(6), 2),
+    (_id(9), "RC", "Responsabilidad civil", "RAMO", _id(2), 1),
+    (_id(10), "VID_IND", "Vida individual", "RAMO", _id(5), 1),
+]
+# node_id, modality, percent
+RULES = [
+    (_id(6), None, Decimal("0.15")),
+    (_id(6), "Individual", Decimal("0.12")),
+    (_id(3), None, Decimal("0.20")),
+    (_id(1), None, Decimal("0.30")),
+    (_id(10), None, Decimal("0.05")),
+]
+COMPANY = "00000000-0000-4000-8000-0000000000c1"
+APPROVALS = {COMPANY: [_id(6)]}
+
+
+class FakeRamoDb:
+    """ramo.node / commission_rule / sr_approval en memoria, respondiendo al SQL registrado."""
+
+    def __init__(self):
+        self.by_id = {n[0]: n for n in NODES}
+
+    def children(self, parent_id):
+        kids = [n for n in NODES if n[4] == parent_id]
+        return sorted(kids, key=lambda n: (n[5], n[2]))
+
+    def run(self, sql, params):
+        if sql is commission._SQL_CHAIN_UP:
+            rows, node, lvl = [], self.by_id.get(uuid.UUID(params[0])), 0
+            while node is not None:
+                rows.append((node[0], node[1], node[2], node[3], node[4], lvl))
+                node, lvl = self.by_id.get(node[4]), lvl + 1
+            return rows
+        if sql is commission._SQL_RULES_BY_NODES:
+            return self.rules(params["ids"], params["modality"])
+        if sql is tree._SQL_ID_BY_CODE:
+            return [(n[0],) for n in NODES if n[1] == params[0]]
+        if sql is tree._SQL_GEN_CHILDREN:
+            codes = ("GEN_OBL", "GEN_PATR", "GEN_PNV")
+            return [(n[0], n[1]) for n in NODES if str(n[4]) == params[0] and n[1] in codes]
+        if sql is tree._SQL_NULL_PARENT_ROOTS:
+            return [(n[0],) for n in self.children(None)][:params[0]]
+        if sql is tree._SQL_SR_ALLOWED:
+            return [(i,) for i in self.descendants(APPROVALS.get(params[0], []))]
+        if sql is tree._SQL_SUBTREE:
+            return self.subtree(uuid.UUID(params[0]), params[1])
+        raise AssertionError(f"SQL inesperado: {sql[:60]}")
+
+    def rules(self, ids, modality):
+        rows = []
+        for node_id in {uuid.UUID(i) for i in ids}:
+            mine = [r for r in RULES if r[0] == node_id]
+            if not mine:
+                continue
+            specific = [r[2] for r in mine if modality and r[1] and r[1].upper() == modality.upper()]
+            general = [r[2] for r in mine if r[1] is None]
+            rows.append((node_id, min(specific, default=None), min(general, default=None)))
+        return rows
+
+    def descendants(self, ids):
+        out, todo = [], list(ids)
+        while todo:
+            node_id = todo.pop()
+            out.append(node_id)
+            todo.extend(n[0] for n in self.children(node_id))
+        return out
+
+    def subtree(self, root_id, depth):
+        rows, level = [], [self.by_id[root_id]]
+        for d in range(1, depth + 1):
+            for n in sorted(level, key=lambda n: (n[5], n[2])):
+                rows.append((n[0], n[1], n[2], d, n[3], n[4], d, {"ord": n[5]},
+                             ["CG"] if n[3] == "RAMO" else [], n[5]))
+            level = [k for n in level for k in self.children(n[0])]
+        return rows
+
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        self.rows = []
+
+    def execute(self, sql, params=None):
+        self.rows = self.db.run(sql, params)
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db = db
+
+    @contextmanager
+    def cursor(self):
+        yield FakeCursor(self.db)
+
+
+class ServiceParityTestCase(SimpleTestCase):
+    """Funciones de servicio sync y async reales sobre las mismas filas."""
+
+    def setUp(self):
+        db = FakeRamoDb()
+
+        async def fetch(sql, params=None, *, user_id, alias=None):
+            return db.run(sql, params)
+
+        async def fetchone(sql, params=None, *, user_id, alias=None):
+            rows = db.run(sql, params)
+            return rows[0] if rows else None
+
+        for target in (
+            patch.object(commission, "read_connection", lambda: FakeConnection(db)),
+            patch.object(tree, "read_connection", lambda: FakeConnection(db)),
+            patch.object(aio, "fetch", fetch),
+            patch.object(aio, "fetchone", fetchone),
+        ):
+            target.start()
+            self.addCleanup(target.stop)
+
+
+class CommissionServiceParityTests(ServiceParityTestCase):
+    def test_por_path(self):
+        cases = {
+            # Leaf modal en mayúsculas: la regla específica está en el padre (INC)
+            "modal": ([str(_id(1)), str(_id(3)), str(_id(6)), str(_id(7)).upper()], 0.12, str(_id(6))),
+            # Sin regla de la modalidad: general del padre
+            "modal_general": ([str(_id(6)), str(_id(8))], 0.15, str(_id(6))),
+            # Sube por el chain hasta la raíz
+            "ancestro": ([str(_id(1)), str(_id(2)), str(_id(9))], 0.30, str(_id(1))),
+            "leaf_con_regla": ([str(_id(6)).upper()], 0.15, str(_id(6))),
+            "vida": ([str(_id(5)), str(_id(10))], None, None),
+            "inexistente": ([str(_id(99))], None, None),
+        }
+        for name, (path, percent, node_id) in cases.items():
+            with self.subTest(name):
+                sync = commission.commission_percent_for_path(path)
+                async_ = async_to_sync(commission.acommission_percent_for_path)(path, 5)
+                self.assertEqual(sync, async_)
+                self.assertEqual(sync.get("percent"), percent)
+                self.assertEqual(sync.get("node_id"), node_id)
+        self.assertEqual(commission.commission_percent_for_path([str(_id(10))])["skipped"], "VIDA")
+
+    def test_trayectorias(self):
+        body = {
+            "main": [[str(_id(6)), str(_id(7))], [str(_id(2)), str(_id(9))], [str(_id(5)), str(_id(10))]],
+            "annex": [[{"pathIds": [str(_id(3)), str(_id(6))]}]],
+        }
+        sync = commission.compute_commission_from_paths(body)
+        async_ = async_to_sync(commission.acompute_commission_from_paths)(body, 5)
+        self.assertEqual(sync, async_)
+        self.assertEqual(sync["main"]["cap_percent"], 0.12)
+        self.assertTrue(sync["annex"]["items"][0]["capped_by_main"])
+
+    def test_legacy(self):
+        ramo_ids = [str(_id(6)).replace("-", ""), str(_id(9))]
+        sync = commission.get_commission_cap(ramo_ids)
+        async_ = async_to_sync(commission.aget_commission_cap)(ramo_ids, 5)
+        self.assertEqual(sync, async_)
+        self.assertEqual(sync["commission_cap_percent"], 0.15)
+        self.assertEqual([d["node_id"] for d in sync["without_rule"]], [str(_id(9))])
+
+
+class TreeServiceParityTests(ServiceParityTestCase):
+    def test_arbol(self):
+        for kwargs in ({}, {"presented": False, "limit": 1}, {"depth": 2}, {"company_id": COMPANY},
+                       {"company_id": "00000000-0000-4000-8000-0000000000c2"}):
+            with self.subTest(**kwargs):
+                sync = tree.get_tree(**kwargs)
+                async_ = async_to_sync(tree.aget_tree)(5, **kwargs)
+                self.assertEqual(sync, async_)
+
+        presented = tree.get_tree()
+        self.assertEqual([n["code"] for n in presented], ["GEN_OBL", "GEN_PATR", "GEN_PNV", "VID"])
+        # El filtro SR deja solo la rama aprobada (y sus descendientes)
+        filtered = tree.get_tree(company_id=COMPANY)
+        self.assertEqual([n["code"] for n in filtered], ["GEN_PATR"])
+        self.assertEqual([k["code"] for k in filtered[0]["children"][0]["children"]], ["INC_IND", "INC_COL"])
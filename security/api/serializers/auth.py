@@ -2,6 +2,11 @@
 from typing import Any, Dict
 from django.contrib.auth import authenticate, get_user_model
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from security.infrastructure.actor_cache import stamp_actor_claims
 
 User = get_user_model()
 
@@ -34,8 +39,15 @@ class SignInSerializer(serializers.Serializer):
         return attrs
 
 
-class RefreshSerializer(serializers.Serializer):
-    refresh = serializers.CharField()
+class RefreshSerializer(TokenRefreshSerializer):
+    """Refresh estándar; el access nuevo lleva actor_id/company_id vigentes (no los del sign-in)."""
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        access = AccessToken(data["access"])
+        stamp_actor_claims(access, access[api_settings.USER_ID_CLAIM])
+        data["access"] = str(access)
+        return data
 
 
 class UserMeSerializer(serializers.Serializer):
@@ -1,5 +1,4 @@
 # security/api/views/auth.py
-from django.db import connection
 from django.contrib.auth import get_user_model
 from rest_framework import status, permissions
 from rest_framework.response import Response
@@ -9,6 +8,7 @@ from rest_framework_simplejwt.views import TokenRefreshView
 
 from security.api.serializers.auth import SignInSerializer, RefreshSerializer, UserMeSerializer
 from security.application.use_cases.resolve_user_actor import resolve_user_actor, ResolveActorError
+from security.infrastructure.actor_cache import stamp_actor_claims
 
 User = get_user_model()
 
@@ -44,17 +44,12 @@ class SignInView(APIView):
         except ResolveActorError as e:
             return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        # 2) (opcional) setear contexto YA en este mismo request
-        try:
-            with connection.cursor() as cur:
-                cur.execute(
-                    'SELECT "security".set_context_from_user(%s);', [user.id])
-        except Exception:
-            # no detengas el login por esto; el middleware lo aplicará desde el siguiente request
-            pass
-
-        # 3) emitir tokens
+        # 2) contexto RLS: lo aplica RlsContext (middleware) con la próxima sentencia SQL
+        #    que lo necesite; no hace falta un roundtrip aquí.
+
+        # 3) emitir tokens con actor/compañía como claims firmados (el middleware no consulta la BD)
         refresh = RefreshToken.for_user(user)
+        stamp_actor_claims(refresh, user.id)
         access = refresh.access_token
 
         data = {
@@ -4,6 +4,9 @@ from dataclasses import dataclass
 from django.contrib.auth.models import User
 from django.db import connection, transaction
 
+from common.application.db import forget_rls_state, set_db_context_for_user
+from security.infrastructure.actor_cache import invalidate_actor_context
+
 
 @dataclass
 class LinkUserActorInput:
@@ -93,8 +96,10 @@ def link_user_actor(inp: LinkUserActorInput) -> str:
                 'INSERT INTO "security".user_link (user_id, actor_id) VALUES (%s,%s)',
                 [inp.user.id, actor_id],
             )
+            transaction.on_commit(lambda: invalidate_actor_context([inp.user.id]))
 
-            # 4) Cargar contexto de sesión (RLS)
-            cur.execute('SELECT "security".set_context_from_user(%s)', [inp.user.id])
+            # 4) Cargar contexto de sesión (RLS) con el actor recién vinculado
+            forget_rls_state()
+            set_db_context_for_user(inp.user.id)
 
             return actor_id
@@ -2,6 +2,8 @@
 from typing import Optional, Dict, Any
 from django.db import connection, transaction
 
+from security.infrastructure.actor_cache import invalidate_actor_context
+
 
 class ResolveActorError(Exception):
     pass
@@ -99,6 +101,8 @@ def resolve_user_actor(*, user_id: int, source: str = "LOCAL",
                 'INSERT INTO "security".user_link (user_id, actor_id, created_at) VALUES (%s, %s, NOW());',
                 [user_id, actor_id]
             )
+        # El usuario pudo quedar cacheado "sin vínculo"
+        transaction.on_commit(lambda: invalidate_actor_context([user_id]))
 
     return actor_id
 
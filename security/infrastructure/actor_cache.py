@@ -0,0 +1,65 @@
+# security/infrastructure/actor_cache.py
+from typing import Iterable, Optional, Tuple
+
+from django.core.cache import cache
+from django.db import connection
+
+# ---------------------------------------------------------------------------
+# Actor/compañía por usuario, cacheado
+# ---------------------------------------------------------------------------
+# Se resuelve una vez (sign-in o primer request) y se reutiliza: el middleware no
+# consulta security.user_link ⋈ security.actor en cada request.
+# Invalidación:
+#   - Triggers en security.user_link / security.actor → NOTIFY 'security_actor_changed'
+#     → manage.py listen_actor_changes → invalidate_actor_context().
+#   - Casos de uso que crean el vínculo llaman invalidate_actor_context() al confirmar.
+# El TTL acota la desactualización si el listener no está corriendo.
+
+# Claims del JWT con el mismo dato (se firman al emitir/refrescar el token)
+CLAIM_ACTOR_ID = "actor_id"
+CLAIM_COMPANY_ID = "company_id"
+
+ACTOR_CACHE_KEY = "security:actor_ctx:u{user_id}"
+ACTOR_CACHE_TTL = 60 * 60
+NOTIFY_CHANNEL = "security_actor_changed"
+
+# Marca de "usuario sin vínculo" (para no repetir la consulta en cada miss)
+_NO_LINK = ("", "")
+
+
+def load_actor_context(user_id: int) -> Tuple[Optional[str], Optional[str]]:
+    with connection.cursor() as cur:
+        cur.execute(
+            """
+            SELECT a.id::text, a.company_id::text
+            FROM "security".user_link ul
+            JOIN "security".actor a ON a.id = ul.actor_id
+            WHERE ul.user_id = %s
+            LIMIT 1
+        """,
+            [user_id],
+        )
+        row = cur.fetchone()
+    return (row[0], row[1]) if row else (None, None)
+
+
+def get_actor_context(user_id: int) -> Tuple[Optional[str], Optional[str]]:
+    """(actor_id, company_id) del usuario; SQL solo en un miss de caché."""
+    key = ACTOR_CACHE_KEY.format(user_id=user_id)
+    cached = cache.get(key)
+    if cached is None:
+        actor_id, company_id = load_actor_context(user_id)
+        cached = (actor_id or "", company_id or "") if actor_id else _NO_LINK
+        cache.set(key, cached, ACTOR_CACHE_TTL)
+    return cached[0] or None, cached[1] or None
+
+
+def invalidate_actor_context(user_ids: Iterable[int]) -> None:
+    cache.delete_many([ACTOR_CACHE_KEY.format(user_id=u) for u in set(user_ids)])
+
+
+def stamp_actor_claims(token, user_id: int) -> None:
+    """Agrega actor_id/company_id al token (RefreshToken/AccessToken de simplejwt)."""
+    actor_id, company_id = get_actor_context(user_id)
+    token[CLAIM_ACTOR_ID] = actor_id
+    token[CLAIM_COMPANY_ID] = company_id
@@ -1,23 +1,20 @@
 # security/infrastructure/auth_signals.py
 from django.contrib.auth.models import User
 from django.contrib.auth.signals import user_logged_in
-from django.db import connection
 from django.dispatch import receiver
 
 from security.application.use_cases.link_user_actor import (LinkUserActorInput,
                                                             link_user_actor)
+from security.infrastructure.actor_cache import get_actor_context
 
 
 @receiver(user_logged_in)
 def ensure_actor_and_context(sender, user: User, request, **kwargs):
-    # 1) Cargar contexto de sesión (si ya existe user_link, esto basta)
-    with connection.cursor() as cur:
-        cur.execute('SELECT "security".set_context_from_user(%s)', [user.id])
-        cur.execute('SELECT "security".get_actor_id_for_user(%s)', [user.id])
-        row = cur.fetchone()
-
-    if row and row[0]:
-        return  # ya tiene actor vinculado
+    # 1) ¿Ya tiene actor vinculado? (caché por usuario; el contexto RLS lo aplica
+    #    RlsContext con la primera sentencia que lo necesite)
+    actor_id, _ = get_actor_context(user.id)
+    if actor_id:
+        return
 
     # 2) (Opcional) Autoprovisión LOCAL si no existe user_link y política lo permite
     # Puedes condicionar por ruta de login o header X-Auth-Source
@@ -32,6 +29,3 @@ def ensure_actor_and_context(sender, user: User, request, **kwargs):
                 email=user.email,
             )
         )
-        # Re-cargar contexto
-        with connection.cursor() as cur:
-            cur.execute('SELECT "security".set_context_from_user(%s)', [user.id])
@@ -3,6 +3,8 @@ from django.contrib.auth.models import User
 from django.core.management.base import BaseCommand, CommandError
 from django.db import connection, transaction
 
+from common.application.db import forget_rls_state, set_db_context_for_user
+
 
 class Command(BaseCommand):
     help = "Vincula un user existente con un actor existente (no re-apunta si ya hay link)."
@@ -30,5 +32,6 @@ class Command(BaseCommand):
                 'INSERT INTO "security".user_link (user_id, actor_id) VALUES (%s,%s)',
                 [user.id, actor_id],
             )
-            cur.execute('SELECT "security".set_context_from_user(%s)', [user.id])
+            forget_rls_state()
+            set_db_context_for_user(user.id)
         self.stdout.write(self.style.SUCCESS("OK, vinculado y contexto listo."))
@@ -0,0 +1,31 @@
+# security/management/commands/listen_actor_changes.py
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from security.infrastructure.actor_cache import NOTIFY_CHANNEL, invalidate_actor_context
+
+
+class Command(BaseCommand):
+    help = (
+        "Escucha NOTIFY de Postgres (triggers en security.user_link / security.actor) "
+        "e invalida el actor/compañía cacheado de los usuarios afectados."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--timeout", type=float, default=30.0,
+                            help="Segundos de espera por lote de notificaciones (keepalive).")
+
+    def handle(self, *args, **opts):
+        connection.ensure_connection()
+        connection.set_autocommit(True)
+        pg = connection.connection  # psycopg 3
+        pg.execute(f"LISTEN {NOTIFY_CHANNEL}")
+        self.stdout.write(self.style.SUCCESS(f"Escuchando '{NOTIFY_CHANNEL}'..."))
+
+        while True:
+            for n in pg.notifies(timeout=opts["timeout"]):
+                payload = (n.payload or "").strip()
+                if not payload.isdigit():
+                    continue
+                invalidate_actor_context([int(payload)])
+                self.stdout.write(f"invalidado user {payload}")